@@ -4,6 +4,7 @@ from flask import Flask, jsonify, request, send_from_directory
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from dotenv import load_dotenv
+from api.utils.responses import FastJSONProvider
 
 def create_app():
     load_dotenv()
@@ -27,6 +28,8 @@ def create_app():
     app.config["JWT_HEADER_NAME"] = "Authorization"
     app.config["JWT_HEADER_TYPE"] = "Bearer"
     app.config["JSON_SORT_KEYS"] = False  # Mantener orden del payload
+    # JSON con orjson (jsonify y los ok()/err() de los blueprints); sin ordenar claves
+    app.json = FastJSONProvider(app)
 
     # Evitar 308 por barras finales
     app.url_map.strict_slashes = False
@@ -36,7 +39,7 @@ def create_app():
         app,
         resources={
             # Módulos principales (API y vistas servidas por Flask)
-            r"/(products|categories|orders|reports|suppliers|users|dashboard|security|static)/*": {
+            r"/(products|categories|orders|reports|suppliers|users|dashboard|exports|security|static)/*": {
                 "origins": [r"http://localhost(:\d+)?", r"http://127\.0\.0\.1(:\d+)?"],
                 "supports_credentials": False,
                 "allow_headers": ["Content-Type", "Authorization"],
@@ -53,6 +56,20 @@ def create_app():
         },
     )
 
+    # ---- Base de datos (pool + conexión por request) ----
+    from api.db.db_config import init_app as init_db
+    init_db(app)
+
+    # ---- Métricas (/metrics, hooks de request y de cursores) ----
+    from api.utils.metrics import init_app as init_metrics
+    init_metrics(app)
+    from api.utils.query_stats import init_app as init_query_stats
+    init_query_stats(app)
+    from api.utils.compression import init_app as init_compression
+    init_compression(app)
+    from api.utils.assets import init_app as init_assets
+    init_assets(app)
+
     # ---- JWT ----
     jwt = JWTManager(app)
 
@@ -81,6 +98,7 @@ def create_app():
     from api.routes.users import users_bp
     from api.routes.auth import auth_bp
     from api.routes.dashboard import dashboard_bp
+    from api.routes.exports import exports_bp
     from api.routes.web import web_bp
 
     app.register_blueprint(products_bp,   url_prefix="/products")
@@ -91,6 +109,7 @@ def create_app():
     app.register_blueprint(users_bp,      url_prefix="/users")
     app.register_blueprint(auth_bp,       url_prefix="/auth")
     app.register_blueprint(dashboard_bp,  url_prefix="/dashboard")
+    app.register_blueprint(exports_bp,    url_prefix="/exports")
     
     app.register_blueprint(web_bp)  # sin prefijo (sirve HTML)
 
@@ -99,6 +118,10 @@ def create_app():
     def health():
         return jsonify({"ok": True, "service": "api", "path": "/health"})
 
+    # ---- Comandos CLI (flask summaries ...) ----
+    from api.commands import register_commands
+    register_commands(app)
+
     # ⬇️ Registrá manejadores centrales (api/errors.py)
     from api.errors import register_error_handlers
     register_error_handlers(app)
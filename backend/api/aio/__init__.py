@@ -0,0 +1,275 @@
+# api/aio/__init__.py
+"""
+Camino de lectura asíncrono (ASGI) montado junto a la app Flask.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 4
+
+GET /products, /orders, /orders/<id>, /reports/stock-by-category|orders-history|low-stock y
+/dashboard/metrics se atienden con corrutinas y aiomysql: mientras MySQL responde no se ocupa
+ningún hilo. Todo lo demás (escrituras, exportaciones, HTML, /metrics...) cae en la app Flask
+de siempre, montada con a2wsgi en un pool de AIO_WSGI_THREADS hilos.
+
+Las respuestas son las mismas que en Flask: mismo SQL (los helpers de api/routes), mismo JSON
+(el provider JSON de la app), mismas reglas de JWT y los mismos ETag/304 (utils/versions.py).
+Con DB_REPLICAS leen de las réplicas con las mismas reglas que Flask (api/aio/db.py). Los
+listados sin paginar (/orders, /products?all=1) se envían en streaming desde un cursor sin
+buffer (db.stream), de a FETCH_BATCH filas, como ok(cursor) en Flask.
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Mount, Route
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import parse_etags
+
+from api.aio import db
+from api.aio.auth import AuthFailed, authenticate
+from api.db.db_config import LAST_WRITE_COOKIE, DBError, get_replicas, parse_last_write
+from api.errors import APIError, DatabaseError
+from api.utils import compression, export_jobs, metrics, versions
+from api.utils.responses import aiter_json_ok
+
+
+def create_asgi_app(flask_app=None):
+    if flask_app is None:
+        from api import create_app
+        flask_app = create_app()
+
+    from api.models.order_rollup import OrderRollup
+    from api.routes import dashboard, orders, products, reports
+    from api.routes.reports import _history_params
+    from api.utils.pagination import page_params, page_payload, wants_all
+
+    def json_response(payload, status=200, headers=None):
+        body = flask_app.json.response(payload).get_data()
+        return Response(body, status_code=status, headers=headers, media_type="application/json")
+
+    def ok(data=None, status=200):
+        payload = {"ok": True}
+        if data is not None:
+            payload["data"] = data
+        return json_response(payload, status)
+
+    def err(message="Error interno del servidor", code="INTERNAL_ERROR", status=500, details=None):
+        return json_response({"ok": False, "error": message, "code": code, "details": details or {}}, status)
+
+    def stream_ok(batches):
+        """{"ok":true,"data":[...]} en streaming desde db.stream(), un chunk por lote (como ok(cursor))."""
+        async def body():
+            try:
+                async for chunk in aiter_json_ok(batches):
+                    yield chunk
+            finally:
+                # Si el cliente corta, la conexión se cierra sin leer el resto del resultado
+                await batches.aclose()
+        return StreamingResponse(body(), media_type=flask_app.json.mimetype)
+
+    async def compressed_chunks(chunks, encoding):
+        comp = compression.stream_compressor(encoding)
+        async for chunk in chunks:
+            out = comp.process(chunk)
+            if out:
+                yield out
+        yield comp.finish()
+
+    def compress(request, resp, etag):
+        """Misma negociación y mismo cache (ETag, encoding) que utils/compression.py en Flask."""
+        resp.headers["Vary"] = "Accept-Encoding"
+        if isinstance(resp, StreamingResponse):
+            # Chunk por chunk, con flush por chunk (como los streams de Flask)
+            encoding = compression.choose(request.headers.get("Accept-Encoding"), resp.media_type)
+            if encoding is not None:
+                resp.body_iterator = compressed_chunks(resp.body_iterator, encoding)
+                resp.headers["Content-Encoding"] = encoding
+            return
+        encoding = compression.choose(request.headers.get("Accept-Encoding"), resp.media_type, len(resp.body))
+        if encoding is not None:
+            resp.body = compression.compress_cached(resp.body, encoding, etag)
+            resp.headers["Content-Length"] = str(len(resp.body))
+            resp.headers["Content-Encoding"] = encoding
+
+    async def measured_chunks(chunks, stats, status):
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            metrics.request_finished(stats, status)
+
+    def flask_endpoint(path):
+        """Nombre de la vista Flask de la misma ruta: las métricas de los dos caminos se suman."""
+        try:
+            return flask_app.url_map.bind("").match(path, "GET")[0]
+        except HTTPException:
+            return "unmatched"
+
+    def endpoint(auth, *resources):
+        """
+        Auth (jwt | token) y después GET condicional, en el mismo orden que los decoradores Flask.
+        Registra duración, status y tiempo en MySQL en utils/metrics.py, como los hooks de Flask.
+        """
+        def decorator(handler):
+            name = None
+
+            async def handle(request):
+                try:
+                    authenticate(flask_app, request.headers, auth)
+                except AuthFailed as e:
+                    return json_response(e.payload, e.status)
+                full_path = f"{request.url.path}?{request.url.query}"
+                etag = versions.etag_for(resources, full_path)
+                cache_headers = {"ETag": f'W/"{etag}"', "Cache-Control": "private, no-cache"}
+                if parse_etags(request.headers.get("If-None-Match")).contains_weak(etag):
+                    return Response(status_code=304, headers=cache_headers)
+                # Read-your-writes de la sesión y último bump de los recursos del ETag
+                last_write = parse_last_write(request.cookies.get(LAST_WRITE_COOKIE)) or 0
+                db.set_read_since(max(last_write, versions.bumped_at(*resources)))
+                try:
+                    resp = await handler(request)
+                except APIError as e:
+                    resp = json_response({"ok": False, "error": e.message, "code": e.code,
+                                          "details": e.details}, e.status_code)
+                if resp.status_code == 200:
+                    resp.headers.update(cache_headers)
+                    compress(request, resp, etag)
+                return resp
+
+            async def wrapper(request):
+                nonlocal name
+                if name is None:
+                    name = flask_endpoint(request.url.path)
+                stats = metrics.request_started(name, request.method)
+                resp = None
+                try:
+                    resp = await handle(request)
+                finally:
+                    if not isinstance(resp, StreamingResponse):
+                        metrics.request_finished(stats, resp.status_code if resp is not None else 500)
+                if isinstance(resp, StreamingResponse) and stats is not None:
+                    # Un listado en streaming se mide hasta el último chunk
+                    resp.body_iterator = measured_chunks(resp.body_iterator, stats, resp.status_code)
+                return resp
+            return wrapper
+        return decorator
+
+    # ---------- /products ----------
+    @endpoint("jwt", "products", "categories")
+    async def list_products(request):
+        args = request.query_params
+        unpaged = wants_all(args)
+        limit, after_id = (None, None) if unpaged else page_params(args=args)
+        sql, params = products._products_list_query(limit, after_id, args=args)
+        try:
+            if unpaged:
+                # Listado completo en streaming, de a FETCH_BATCH filas
+                return stream_ok(await db.stream(sql, params))
+            items = await db.fetch(sql, params)
+        except DBError as e:
+            raise DatabaseError("No se pudieron obtener los productos", details={"db": str(e)})
+        return json_response(page_payload(items, limit))
+
+    # ---------- /orders ----------
+    @endpoint("token", "orders", "products")
+    async def list_orders(request):
+        try:
+            sql, params = orders._orders_list_query(request.query_params)
+            # Sin paginación: en streaming, igual que en Flask
+            return stream_ok(await db.stream(sql, params))
+        except DBError as e:
+            return err("No se pudieron listar las órdenes", details={"db": str(e)})
+        except Exception as e:
+            return err(str(e))
+
+    @endpoint("token", "orders", "products")
+    async def get_order(request):
+        try:
+            row = await db.fetch(orders.ORDER_DETAIL_SQL, (request.path_params["order_id"],), one=True)
+        except DBError as e:
+            return err("No se pudo obtener la orden", details={"db": str(e)})
+        if not row:
+            return err("Orden no encontrada", code="NOT_FOUND", status=404)
+        return ok(row)
+
+    # ---------- /reports ----------
+    @endpoint("token", "products", "categories")
+    async def stock_by_category(request):
+        try:
+            return ok(await db.fetch(reports.STOCK_BY_CATEGORY_SQL))
+        except DBError as e:
+            return err("No se pudo obtener stock por categoría", details={"db": str(e)})
+        except Exception as e:
+            return err(str(e))
+
+    @endpoint("token", "orders")
+    async def orders_history(request):
+        try:
+            d_from, d_to, granularity, status = _history_params(request.query_params)
+            buckets, sql, params = OrderRollup.history_query(d_from, d_to, granularity, status)
+            rows = await db.fetch(sql, params, dictionary=False)
+            return ok(OrderRollup.history_rows(buckets, rows, granularity))
+        except ValueError as e:
+            return err(str(e), code="VALIDATION_ERROR", status=400)
+        except DBError as e:
+            return err("No se pudo obtener historial de órdenes", details={"db": str(e)})
+        except Exception as e:
+            return err(str(e))
+
+    @endpoint("token", "products", "categories")
+    async def low_stock(request):
+        try:
+            threshold = reports._low_stock_threshold(request.query_params)
+            return ok(await db.fetch(reports.LOW_STOCK_SQL, (threshold,)))
+        except DBError as e:
+            return err("No se pudo obtener bajo stock", details={"db": str(e)})
+        except Exception as e:
+            return err(str(e))
+
+    # ---------- /dashboard/metrics ----------
+    @endpoint("token", "products", "categories", "suppliers", "orders")
+    async def dashboard_metrics(request):
+        # Comparte el cache (y su invalidación) con el endpoint Flask del mismo proceso
+        key = date.today().isoformat()
+        tokens = dashboard._metrics_cache.tokens()
+        data = dashboard._metrics_cache.get(key, tokens)
+        cached = data is not None
+        if not cached:
+            try:
+                row = await db.fetch(dashboard.METRICS_SQL, one=True) or {}
+            except DBError as e:
+                return err("No se pudieron obtener métricas", details={"db": str(e)})
+            data = {k: int(row.get(k) or 0) for k in dashboard.METRICS_KEYS}
+            data["generated_at"] = datetime.now().isoformat(timespec="seconds")
+            dashboard._metrics_cache.set(key, data, tokens)
+        return ok({**data, "cached": cached, "cache": dashboard._metrics_cache.stats()})
+
+    @asynccontextmanager
+    async def lifespan(app):
+        try:
+            await db.init_pool()
+        except DBError as e:
+            # Sin MySQL al arrancar se reintenta en el primer request (igual que el pool Flask)
+            flask_app.logger.warning("Pool async no inicializado: %s", e)
+        if export_jobs.warmup_enabled():
+            export_jobs.warm_up()
+        checks = asyncio.create_task(db.replica_checks()) if get_replicas() else None
+        yield
+        if checks is not None:
+            checks.cancel()
+        await db.close_pool()
+
+    routes = [
+        Route("/products", list_products, methods=["GET"]),
+        Route("/orders", list_orders, methods=["GET"]),
+        Route("/orders/{order_id:int}", get_order, methods=["GET"]),
+        Route("/reports/stock-by-category", stock_by_category, methods=["GET"]),
+        Route("/reports/orders-history", orders_history, methods=["GET"]),
+        Route("/reports/low-stock", low_stock, methods=["GET"]),
+        Route("/dashboard/metrics", dashboard_metrics, methods=["GET"]),
+        # Todo lo demás (y otros métodos sobre las mismas rutas) lo atiende Flask
+        Mount("/", app=WSGIMiddleware(flask_app, workers=int(os.getenv("AIO_WSGI_THREADS", 10)))),
+    ]
+    return Starlette(routes=routes, lifespan=lifespan)
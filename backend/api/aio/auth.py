@@ -0,0 +1,76 @@
+# api/aio/auth.py
+"""
+Las mismas reglas de JWT que el camino Flask, sin bloquear el event loop.
+
+- "jwt": como @jwt_required(): header ausente o mal formado -> AUTH_ERROR (api/errors.py),
+  token inválido/expirado -> INVALID_TOKEN / TOKEN_EXPIRED (loaders de create_app).
+- "token": como @token_required (cualquier falla -> 401 AUTH_ERROR "No autorizado: ...").
+El token se decodifica con flask_jwt_extended.decode_token dentro de un app context, así
+se respetan secreto, algoritmo, leeway y claim de identidad configurados en la app.
+"""
+import re
+
+from flask_jwt_extended import decode_token
+from flask_jwt_extended.exceptions import (
+    InvalidHeaderError, NoAuthorizationError, WrongTokenError,
+)
+from jwt import ExpiredSignatureError
+
+from api.utils.security import parse_identity
+
+
+class AuthFailed(Exception):
+    def __init__(self, payload, status=401):
+        super().__init__(payload.get("error"))
+        self.payload = payload
+        self.status = status
+
+
+def _encoded_token(headers, config):
+    """Copia de la lectura del header de flask_jwt_extended (mismos mensajes de error)."""
+    header_name = config.get("JWT_HEADER_NAME", "Authorization")
+    header_type = config.get("JWT_HEADER_TYPE", "Bearer")
+    auth_header = (headers.get(header_name) or "").strip().strip(",")
+    if not auth_header:
+        raise NoAuthorizationError(f"Missing {header_name} Header")
+    if header_type:
+        jwt_headers = [s for s in re.split(r",\s*", auth_header) if s.split()[0] == header_type]
+        if len(jwt_headers) != 1:
+            raise NoAuthorizationError(
+                f"Missing '{header_type}' type in '{header_name}' header. "
+                f"Expected '{header_name}: {header_type} <JWT>'"
+            )
+        parts = jwt_headers[0].split()
+        if len(parts) != 2:
+            raise InvalidHeaderError(f"Bad {header_name} header. Expected '{header_name}: {header_type} <JWT>'")
+        return parts[1]
+    parts = auth_header.split()
+    if len(parts) != 1:
+        raise InvalidHeaderError(f"Bad {header_name} header. Expected '{header_name}: <JWT>'")
+    return parts[0]
+
+
+def _decode(flask_app, headers):
+    with flask_app.app_context():
+        token = _encoded_token(headers, flask_app.config)
+        data = decode_token(token)
+        if data.get("type") != "access":
+            raise WrongTokenError("Only non-refresh tokens are allowed")
+        return data[flask_app.config.get("JWT_IDENTITY_CLAIM", "sub")]
+
+
+def authenticate(flask_app, headers, mode):
+    """Devuelve (user_id, role) o levanta AuthFailed con el mismo JSON que el camino Flask."""
+    try:
+        ident = _decode(flask_app, headers)
+        if mode == "token":
+            return parse_identity(ident)
+        return ident, None
+    except Exception as e:
+        if mode == "token":
+            raise AuthFailed({"ok": False, "error": f"No autorizado: {str(e)}", "code": "AUTH_ERROR", "details": {}})
+        if isinstance(e, (NoAuthorizationError, InvalidHeaderError)):
+            raise AuthFailed({"ok": False, "error": str(e), "code": "AUTH_ERROR"})
+        if isinstance(e, ExpiredSignatureError):
+            raise AuthFailed({"ok": False, "code": "TOKEN_EXPIRED", "error": "El token expiró"})
+        raise AuthFailed({"ok": False, "code": "INVALID_TOKEN", "error": f"Token inválido: {str(e)}"})
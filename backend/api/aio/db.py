@@ -0,0 +1,183 @@
+# api/aio/db.py
+"""
+Pool asíncrono de MySQL (aiomysql) para el camino de lectura async.
+
+Mismas variables DB_* que api/db/db_config.py. Tamaño con AIO_DB_POOL_SIZE (default 20):
+los requests que esperan conexión son corrutinas en espera, no hilos, así que miles de
+requests lentos caben en un proceso con pocas conexiones reales. La espera está acotada
+por DB_POOL_TIMEOUT, como en el pool sincrónico.
+
+Con DB_REPLICAS todas las lecturas de este camino van a una réplica al día (un pool aiomysql
+por réplica) con las mismas reglas que get_db_connection(): retraso máximo, read-your-writes
+por la cookie de última escritura y el último bump de los recursos del ETag (set_read_since).
+El estado de las réplicas lo actualiza una tarea de fondo (replica_checks), nunca el request.
+"""
+import asyncio
+import contextvars
+import os
+import time
+
+import aiomysql
+
+from api.db.db_config import DBError, _notify_query, check_interval, check_replicas, choose_replica, get_replicas
+from api.utils.streaming import FETCH_BATCH
+
+_pool = None
+_replica_pools = {}
+_read_since = contextvars.ContextVar("aio_db_read_since", default=None)
+
+
+def _pool_kwargs():
+    return dict(
+        user=os.getenv("DB_USER", "root"),
+        password=os.getenv("DB_PASSWORD", ""),
+        db=os.getenv("DB_NAME", "mi_inventario"),
+        charset="utf8mb4",
+        autocommit=True,
+        minsize=int(os.getenv("AIO_DB_POOL_MIN", 1)),
+        maxsize=int(os.getenv("AIO_DB_POOL_SIZE", 20)),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", 3600)),
+    )
+
+
+async def init_pool():
+    global _pool
+    if _pool is not None:
+        return _pool
+    try:
+        _pool = await aiomysql.create_pool(
+            host=os.getenv("DB_HOST", "localhost"),
+            port=int(os.getenv("DB_PORT", 3306)),
+            **_pool_kwargs(),
+        )
+    except Exception as e:
+        raise DBError(f"Error conectando a la base de datos: {str(e)}")
+    return _pool
+
+
+async def _replica_pool(replica):
+    pool = _replica_pools.get(replica.name)
+    if pool is None:
+        config = replica.pool.config
+        kwargs = {**_pool_kwargs(), "user": config["user"], "password": config["password"],
+                  "connect_timeout": config["connection_timeout"]}
+        created = await aiomysql.create_pool(host=config["host"], port=config["port"], **kwargs)
+        pool = _replica_pools.setdefault(replica.name, created)
+        if pool is not created:
+            # Otra corrutina lo creó mientras se conectaba este
+            created.close()
+    return pool
+
+
+async def close_pool():
+    global _pool
+    pools = list(_replica_pools.values())
+    _replica_pools.clear()
+    if _pool is not None:
+        pools.append(_pool)
+        _pool = None
+    for pool in pools:
+        pool.close()
+        await pool.wait_closed()
+
+
+def set_read_since(since):
+    """Lo escrito hasta `since` (time.time()) tiene que verse en las lecturas de este request."""
+    _read_since.set(since)
+
+
+async def replica_checks():
+    """Tarea de fondo del lifespan: verifica las réplicas en un hilo cada DB_REPLICA_CHECK_INTERVAL."""
+    while True:
+        await asyncio.to_thread(check_replicas)
+        await asyncio.sleep(check_interval())
+
+
+async def _acquire_replica():
+    for _ in range(len(get_replicas())):
+        replica = choose_replica(_read_since.get(), check=False)
+        if replica is None:
+            return None
+        try:
+            pool = await _replica_pool(replica)
+            return pool, await asyncio.wait_for(pool.acquire(), replica.pool.timeout)
+        except Exception as e:
+            replica.mark_down(e)
+    return None
+
+
+async def _acquire():
+    if get_replicas():
+        acquired = await _acquire_replica()
+        if acquired is not None:
+            return acquired
+    pool = _pool or await init_pool()
+    timeout = float(os.getenv("DB_POOL_TIMEOUT", 10))
+    try:
+        return pool, await asyncio.wait_for(pool.acquire(), timeout)
+    except asyncio.TimeoutError:
+        raise DBError(f"Pool de conexiones agotado ({pool.maxsize} en uso, espera de {timeout:.0f}s)")
+    except Exception as e:
+        raise DBError(f"Error conectando a la base de datos: {str(e)}")
+
+
+async def fetch(sql, params=(), one=False, dictionary=True):
+    """
+    Ejecuta un SELECT y devuelve todas las filas (o la primera con one=True).
+    Avisa a los observadores de consultas igual que los cursores del pool sincrónico.
+    """
+    pool, conn = await _acquire()
+    start = time.perf_counter()
+    error = None
+    try:
+        async with conn.cursor(aiomysql.DictCursor if dictionary else aiomysql.Cursor) as cur:
+            await cur.execute(sql, params)
+            return await (cur.fetchone() if one else cur.fetchall())
+    except Exception as e:
+        error = e
+        raise DBError(str(e))
+    finally:
+        _notify_query(sql, params, time.perf_counter() - start, error)
+        pool.release(conn)
+
+
+async def stream(sql, params=(), batch_size=FETCH_BATCH):
+    """
+    Ejecuta un SELECT con cursor sin buffer (SSDictCursor) y devuelve un generador async de
+    lotes de `batch_size` filas, como iter_batches() en el camino sincrónico. La consulta corre
+    antes de devolver (los errores de SQL salen antes del primer byte) y la conexión vuelve al
+    pool al terminar de leer; si el generador se cierra antes (el cliente cortó), la conexión
+    se cierra en vez de leer el resto del resultado.
+    """
+    pool, conn = await _acquire()
+    start = time.perf_counter()
+    try:
+        cur = await conn.cursor(aiomysql.SSDictCursor)
+        await cur.execute(sql, params)
+    except Exception as e:
+        _notify_query(sql, params, time.perf_counter() - start, e)
+        conn.close()
+        pool.release(conn)
+        raise DBError(str(e))
+
+    async def batches():
+        error = None
+        done = False
+        try:
+            while True:
+                rows = await cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+            await cur.close()
+            done = True
+        except Exception as e:
+            error = e
+            raise DBError(str(e))
+        finally:
+            _notify_query(sql, params, time.perf_counter() - start, error)
+            if not done:
+                conn.close()
+            pool.release(conn)
+
+    return batches()
@@ -0,0 +1,131 @@
+# api/commands.py
+import click
+from api.db.db_config import DBError
+
+def register_commands(app):
+    """Comandos de mantenimiento: `flask <grupo> <comando>` desde la carpeta backend/."""
+
+    @app.cli.group("summaries")
+    def summaries():
+        """Tablas resumen mantenidas por triggers (settings/summaries.sql)."""
+
+    @summaries.command("verify")
+    def summaries_verify():
+        """Compara category_stock y order_rollup_daily contra las tablas base."""
+        from api.models.category_stock import CategoryStock
+        from api.models.order_rollup import OrderRollup
+        try:
+            diffs = CategoryStock.verify()
+            rollup_diffs = OrderRollup.verify()
+        except DBError as e:
+            raise click.ClickException(str(e))
+        for d in diffs:
+            click.echo(
+                f"categoría {d['category_id']}: stock {d['actual_stock']} (esperado {d['expected_stock']}), "
+                f"productos {d['actual_count']} (esperado {d['expected_count']})"
+            )
+        for d in rollup_diffs:
+            click.echo(
+                f"órdenes {d['day']} [{d['status']}]: {d['actual_orders']} (esperado {d['expected_orders']}), "
+                f"unidades {d['actual_quantity']} (esperado {d['expected_quantity']})"
+            )
+        if diffs or rollup_diffs:
+            raise click.ClickException(
+                f"category_stock: {len(diffs)} categoría(s) con diferencias; "
+                f"order_rollup_daily: {len(rollup_diffs)} día(s)/estado(s) con diferencias"
+            )
+        click.echo("category_stock OK")
+        click.echo("order_rollup_daily OK")
+
+    @summaries.command("rebuild")
+    def summaries_rebuild():
+        """Regenera category_stock desde products y order_rollup_daily desde orders."""
+        from api.models.category_stock import CategoryStock
+        from api.models.order_rollup import OrderRollup
+        try:
+            n = CategoryStock.rebuild()
+            m = OrderRollup.rebuild()
+        except DBError as e:
+            raise click.ClickException(str(e))
+        # Los reportes leen estos resúmenes: invalidar sus ETag
+        from api.utils import versions
+        versions.bump("products", "orders")
+        click.echo(f"category_stock regenerada ({n} filas)")
+        click.echo(f"order_rollup_daily regenerada ({m} filas)")
+
+    @app.cli.group("versions")
+    def versions_group():
+        """Tokens de versión de los ETag (utils/versions.py)."""
+
+    @versions_group.command("bump")
+    @click.argument("resources", nargs=-1)
+    def versions_bump(resources):
+        """Invalida los ETag de los recursos indicados (todos si no se indica ninguno)."""
+        from api.utils import versions
+        resources = resources or versions.RESOURCES
+        try:
+            versions.bump(*resources)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"Versiones renovadas: {', '.join(resources)}")
+
+    @app.cli.group("metrics")
+    def metrics_group():
+        """Archivos de métricas por proceso (utils/metrics.py)."""
+
+    @metrics_group.command("clear")
+    def metrics_clear():
+        """Borra el estado volcado por los workers, incluidas las consultas lentas (al reiniciar)."""
+        from api.utils import metrics, query_stats
+        n = metrics.clear() + query_stats.clear()
+        click.echo(f"{n} archivo(s) de métricas borrados de {metrics.metrics_dir()}")
+
+    @app.cli.group("assets")
+    def assets_group():
+        """Assets estáticos con hash y pre-comprimidos (utils/assets.py)."""
+
+    @assets_group.command("build")
+    @click.option("--out", default=None, help="Directorio de salida (default: ASSETS_DIR o static_dist/)")
+    @click.option("--clean", is_flag=True, help="Borra los archivos de builds anteriores que ya no se usan")
+    def assets_build(out, clean):
+        """Copia static/ con hash de contenido + variantes .br/.gz y escribe el manifest."""
+        from api.utils import assets
+        assets.build(app.static_folder, out, app.static_url_path, clean=clean, echo=click.echo)
+        click.echo("Reiniciá los workers para que tomen el manifest nuevo.")
+
+    @app.cli.group("export-cache")
+    def export_cache_group():
+        """Archivos generados por los endpoints /export/* (utils/export_cache.py)."""
+
+    @export_cache_group.command("stats")
+    def export_cache_stats():
+        """Cantidad y tamaño de los archivos en cache."""
+        from api.utils import export_cache
+        s = export_cache.stats()
+        click.echo(f"{s['files']} archivo(s), {s['bytes'] / 1e6:.1f} MB de {s['max_bytes'] / 1e6:.0f} MB en {s['dir']}")
+
+    @export_cache_group.command("clear")
+    def export_cache_clear():
+        """Borra todos los archivos (se regeneran con la próxima descarga)."""
+        from api.utils import export_cache
+        click.echo(f"{export_cache.clear()} archivo(s) borrados de {export_cache.cache_dir()}")
+
+    @app.cli.group("db")
+    def db_group():
+        """Conexiones a MySQL: primario y réplicas de lectura (api/db/db_config.py)."""
+
+    @db_group.command("replicas")
+    def db_replicas():
+        """Verifica cada réplica de DB_REPLICAS y muestra si recibe lecturas."""
+        from api.db.db_config import check_replicas, get_replicas, max_lag
+        replicas = get_replicas()
+        if not replicas:
+            click.echo("Sin réplicas (DB_REPLICAS vacío): todo se lee del primario")
+            return
+        check_replicas(force=True)
+        for r in replicas:
+            if r.healthy:
+                state = "en uso" if r.usable() else f"retraso mayor a {max_lag():.0f}s, no recibe lecturas"
+                click.echo(f"{r.name}: retraso {r.lag:.0f}s ({state})")
+            else:
+                click.echo(f"{r.name}: fuera de servicio ({r.error})")
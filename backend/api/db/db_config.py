@@ -2,32 +2,648 @@
 import mysql.connector
 from mysql.connector import Error
 import os
+import logging
+import contextvars
+import itertools
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from flask import g, has_app_context, has_request_context, request
 from dotenv import load_dotenv
 
 load_dotenv()  # Carga las variables del archivo .env
 
+logger = logging.getLogger(__name__)
+
 class DBError(Exception):
     """Clase personalizada para manejar errores de base de datos."""
     pass
 
+def _env_bool(name, default):
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+def _connection_config():
+    return {
+        "host": os.getenv('DB_HOST', 'localhost'),
+        "port": int(os.getenv('DB_PORT', 3306)),
+        "user": os.getenv('DB_USER', 'root'),
+        "password": os.getenv('DB_PASSWORD', ''),
+        "database": os.getenv('DB_NAME', 'mi_inventario'),
+        # La conexión de un request se comparte entre varios helpers/modelos:
+        # si uno deja filas sin leer, el siguiente comando las descarta en vez de fallar.
+        "consume_results": True,
+    }
+
+
+# ---------- Observadores de consultas ----------
+# Callbacks (statement, params, elapsed_segundos, error) llamados después de cada
+# execute/executemany. Sin observadores registrados los cursores no se envuelven
+# (costo cero); los usan el benchmark, las métricas y el log de consultas lentas.
+
+_query_observers = []
+
+def add_query_observer(callback):
+    if callback not in _query_observers:
+        _query_observers.append(callback)
+    return callback
+
+def remove_query_observer(callback):
+    try:
+        _query_observers.remove(callback)
+    except ValueError:
+        pass
+
+def _notify_query(statement, params, elapsed, error):
+    for cb in list(_query_observers):
+        try:
+            cb(statement, params, elapsed, error)
+        except Exception:
+            logger.exception("Error en un observador de consultas")
+
+
+class ObservedCursor:
+    """Cursor que mide cada execute/executemany y avisa a los observadores."""
+
+    def __init__(self, raw):
+        self._cur = raw
+
+    def _timed(self, method, statement, params, *args, **kwargs):
+        start = time.perf_counter()
+        error = None
+        try:
+            return method(statement, params, *args, **kwargs)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            _notify_query(statement, params, time.perf_counter() - start, error)
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        return self._timed(self._cur.execute, operation, params, *args, **kwargs)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        return self._timed(self._cur.executemany, operation, seq_params, *args, **kwargs)
+
+    def __iter__(self):
+        return iter(self._cur)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cur.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+
+class PooledConnection:
+    """
+    Envoltorio sobre una conexión física del pool.
+
+    - close() devuelve la conexión al pool (o no hace nada si pertenece al request:
+      en ese caso la libera teardown_appcontext).
+    - Todo lo demás (commit, rollback, cursor, ...) se delega a la conexión real.
+    """
+
+    def __init__(self, pool, raw, created_at, scoped=False):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._scoped = scoped
+        self._released = False
+
+    def cursor(self, *args, **kwargs):
+        cur = self._raw.cursor(*args, **kwargs)
+        return ObservedCursor(cur) if _query_observers else cur
+
+    def commit(self):
+        self._raw.commit()
+        # Read-your-writes: la sesión lee del primario hasta que las réplicas lleguen acá
+        if self._scoped and has_app_context():
+            g._db_last_write = time.time()
+
+    def close(self):
+        # Las rutas/modelos llaman conn.close() por costumbre; si la conexión es del
+        # request se ignora para que los siguientes helpers reutilicen la misma.
+        if not self._scoped:
+            self.release()
+
+    def release(self):
+        if self._released:
+            return
+        self._released = True
+        self._pool._release(self)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __del__(self):
+        # Detector de fugas: la conexión se perdió sin close()/release()
+        if not getattr(self, "_released", True):
+            self._pool._report_lost(self)
+            try:
+                self.release()
+            except Exception:
+                pass
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones MySQL (LIFO) con tamaño acotado.
+
+    - acquire() reutiliza una conexión libre, abre una nueva si hay cupo o espera
+      hasta `timeout` segundos a que se libere alguna.
+    - pre_ping: verifica la conexión (ping + reconexión) antes de entregarla.
+    - recycle: cierra conexiones más viejas que N segundos (evita wait_timeout del server).
+    - leak_timeout: conexiones prestadas por más de N segundos se reportan como fuga.
+    """
+
+    def __init__(self, config, size=10, timeout=10.0, pre_ping=True, recycle=3600, leak_timeout=60):
+        self.config = config
+        self.size = max(1, int(size))
+        self.timeout = float(timeout)
+        self.pre_ping = pre_ping
+        self.recycle = recycle
+        self.leak_timeout = leak_timeout
+        self._idle = deque()            # (raw, created_at)
+        self._total = 0                 # conexiones abiertas (libres + prestadas)
+        self._checked_out = {}          # id(proxy) -> info de quién la pidió
+        self._cond = threading.Condition()
+        self._last_leak_report = 0.0
+
+    # ---------- Conexiones físicas ----------
+
+    def _connect(self):
+        try:
+            return mysql.connector.connect(**self.config)
+        except Error as e:
+            raise DBError(f"Error conectando a la base de datos: {str(e)}")
+
+    def _close_raw(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _healthy(self, raw, created_at):
+        if self.recycle and time.monotonic() - created_at > self.recycle:
+            return False
+        if not self.pre_ping:
+            return True
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    # ---------- Préstamo / devolución ----------
+
+    def acquire(self, scoped=False):
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    raw, created_at = self._idle.pop()
+                    break
+                if self._total < self.size:
+                    self._total += 1
+                    raw, created_at = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.report_leaks(force=True)
+                    raise DBError(
+                        f"Pool de conexiones agotado ({self.size} en uso, espera de {self.timeout:.0f}s)"
+                    )
+                self._cond.wait(remaining)
+
+        try:
+            if raw is not None and not self._healthy(raw, created_at):
+                self._close_raw(raw)
+                raw = None
+            if raw is None:
+                raw = self._connect()
+                created_at = time.monotonic()
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+
+        conn = PooledConnection(self, raw, created_at, scoped=scoped)
+        with self._cond:
+            self._checked_out[id(conn)] = {
+                "since": time.monotonic(),
+                "thread": threading.current_thread().name,
+                "stack": "".join(traceback.format_stack(limit=8)[:-2]),
+            }
+        return conn
+
+    def _release(self, conn):
+        raw = conn._raw
+        reusable = True
+        try:
+            # No devolver transacciones abiertas (ni snapshots viejos) al pool
+            if raw.in_transaction:
+                raw.rollback()
+        except Exception:
+            reusable = False
+
+        with self._cond:
+            self._checked_out.pop(id(conn), None)
+            if reusable and raw.is_connected():
+                self._idle.append((raw, conn._created_at))
+            else:
+                self._total -= 1
+                self._close_raw(raw)
+            self._cond.notify()
+
+    # ---------- Detector de fugas ----------
+
+    def _report_lost(self, conn):
+        info = self._checked_out.get(id(conn)) or {}
+        logger.warning(
+            "Conexión MySQL nunca devuelta al pool (hilo %s). Obtenida en:\n%s",
+            info.get("thread", "?"), info.get("stack", "(desconocido)"),
+        )
+
+    def leaks(self, older_than=None):
+        """Conexiones prestadas hace más de `older_than` segundos (default: leak_timeout)."""
+        limit = self.leak_timeout if older_than is None else older_than
+        now = time.monotonic()
+        with self._cond:
+            items = list(self._checked_out.values())
+        return [
+            {"held_for": round(now - i["since"], 3), "thread": i["thread"], "stack": i["stack"]}
+            for i in items if now - i["since"] > limit
+        ]
+
+    def report_leaks(self, force=False):
+        """Loguea las posibles fugas (como máximo cada leak_timeout segundos)."""
+        now = time.monotonic()
+        if not force and now - self._last_leak_report < self.leak_timeout:
+            return
+        self._last_leak_report = now
+        for leak in self.leaks():
+            logger.warning(
+                "Conexión MySQL prestada hace %.1fs (hilo %s), posible fuga. Obtenida en:\n%s",
+                leak["held_for"], leak["thread"], leak["stack"],
+            )
+
+    def status(self):
+        with self._cond:
+            return {
+                "size": self.size,
+                "open": self._total,
+                "idle": len(self._idle),
+                "in_use": len(self._checked_out),
+                "leaks": len(self.leaks()),
+            }
+
+    def dispose(self):
+        """Cierra las conexiones libres (las prestadas se cierran al devolverse)."""
+        with self._cond:
+            while self._idle:
+                raw, _ = self._idle.pop()
+                self._total -= 1
+                self._close_raw(raw)
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Pool del proceso actual (se recrea tras un fork: los sockets no se comparten)."""
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                _pool = ConnectionPool(
+                    _connection_config(),
+                    size=int(os.getenv("DB_POOL_SIZE", 10)),
+                    timeout=float(os.getenv("DB_POOL_TIMEOUT", 10)),
+                    pre_ping=_env_bool("DB_POOL_PRE_PING", True),
+                    recycle=int(os.getenv("DB_POOL_RECYCLE", 3600)),
+                    leak_timeout=int(os.getenv("DB_POOL_LEAK_TIMEOUT", 60)),
+                )
+                _pool_pid = pid
+    return _pool
+
+# ---------- Réplicas de lectura ----------
+# DB_REPLICAS="host:puerto,host:puerto" (mismo usuario/base que el primario, o
+# DB_REPLICA_USER/DB_REPLICA_PASSWORD). Los GET/HEAD leen de una réplica sana cuyo retraso
+# (Seconds_Behind_Source) no pase DB_REPLICA_MAX_LAG y que ya haya aplicado las escrituras
+# que el request tiene que ver; si ninguna sirve, del primario. Todo lo demás va al primario.
+# Sin DB_REPLICAS no cambia nada.
+
+READ_METHODS = ("GET", "HEAD")
+LAST_WRITE_COOKIE = "db_last_write"
+# Seconds_Behind_Source es entero (0 = menos de 1 s) y los relojes de los servidores web
+# pueden diferir un poco: una réplica recién "está al día" un segundo después.
+LAG_MARGIN = 1.0
+
+def max_lag():
+    return float(os.getenv("DB_REPLICA_MAX_LAG", 5))
+
+def check_interval():
+    return float(os.getenv("DB_REPLICA_CHECK_INTERVAL", 2))
+
+def read_your_writes_window():
+    """Segundos que dura la cookie de última escritura: después cualquier réplica utilizable ya la vio."""
+    return int(max_lag() + check_interval() + LAG_MARGIN + 1)
+
+def _replica_specs():
+    """[(host, puerto)] de DB_REPLICAS."""
+    specs = []
+    for item in os.getenv("DB_REPLICAS", "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        host, _, port = item.partition(":")
+        specs.append((host, int(port or os.getenv("DB_PORT", 3306))))
+    return specs
+
+def _simulated_lags(count):
+    """
+    DB_REPLICA_SIMULATED_LAG="3" (todas) o "0,8" (una por réplica): el retraso se toma de acá
+    en vez de SHOW REPLICA STATUS y se acepta un servidor que no replica. Sirve para probar el
+    ruteo con una sola instancia de MySQL (DB_REPLICAS apuntando al mismo primario).
+    """
+    raw = os.getenv("DB_REPLICA_SIMULATED_LAG", "").strip()
+    if not raw:
+        return [None] * count
+    values = [float(v) for v in raw.split(",")]
+    return [values[i] if i < len(values) else values[-1] for i in range(count)]
+
+
+class Replica:
+    """
+    Una réplica de lectura: su pool y el último estado medido (salud y retraso).
+
+    check() consulta SHOW REPLICA STATUS (SHOW SLAVE STATUS antes de MySQL 8.0.22) como mucho
+    cada DB_REPLICA_CHECK_INTERVAL segundos; entre verificaciones se usa el último resultado.
+    Una réplica que no responde queda fuera hasta la próxima verificación.
+    """
+
+    def __init__(self, name, pool, simulated_lag=None):
+        self.name = name
+        self.pool = pool
+        self.simulated_lag = simulated_lag
+        self.healthy = False
+        self.lag = None
+        self.checked_at = 0.0           # time.time() al empezar la última verificación
+        self.error = "sin verificar"
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def _replication_lag(self):
+        conn = self.pool.acquire()
+        try:
+            # Cursor crudo: la verificación no cuenta como consulta del request
+            cur = conn._raw.cursor(dictionary=True)
+            try:
+                try:
+                    cur.execute("SHOW REPLICA STATUS")
+                except Error:
+                    cur.execute("SHOW SLAVE STATUS")
+                rows = cur.fetchall()
+            finally:
+                cur.close()
+        finally:
+            conn.release()
+        if self.simulated_lag is not None:
+            return self.simulated_lag
+        if not rows:
+            raise DBError("el servidor no es réplica de ningún primario")
+        lags = []
+        for row in rows:   # un canal por fila (multi-source)
+            sql_running = row.get("Replica_SQL_Running", row.get("Slave_SQL_Running"))
+            lag = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+            if sql_running != "Yes" or lag is None:
+                io_running = row.get("Replica_IO_Running", row.get("Slave_IO_Running"))
+                raise DBError(f"replicación detenida (IO={io_running}, SQL={sql_running})")
+            lags.append(float(lag))
+        return max(lags)
+
+    def check(self, force=False):
+        """Actualiza el estado si ya venció; si otro hilo lo está verificando, no espera."""
+        if not force and time.monotonic() < self._next_check:
+            return
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            started = time.time()
+            try:
+                lag = self._replication_lag()
+            except Exception as e:
+                self.mark_down(e)
+            else:
+                if not self.healthy:
+                    logger.info("Réplica %s disponible (retraso %.0fs)", self.name, lag)
+                self.healthy, self.lag, self.error = True, lag, None
+            self.checked_at = started
+            self._next_check = time.monotonic() + check_interval()
+        finally:
+            self._lock.release()
+
+    def mark_down(self, error):
+        if self.healthy or self.error == "sin verificar":
+            logger.warning("Réplica %s fuera de servicio: %s", self.name, error)
+        self.healthy, self.lag, self.error = False, None, str(error)
+        self._next_check = time.monotonic() + check_interval()
+
+    def usable(self, since=None):
+        """
+        Sana, con retraso aceptable y, si se pasa `since` (time.time() de una escritura), con
+        esa escritura ya aplicada: al medir en checked_at tenía todo lo anterior a checked_at - lag.
+        """
+        if not self.healthy or self.lag > max_lag():
+            return False
+        return not since or self.checked_at - self.lag - LAG_MARGIN > since
+
+    def status(self):
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "lag": self.lag,
+            "usable": self.usable(),
+            "checked_at": self.checked_at or None,
+            "error": self.error,
+            "pool": self.pool.status(),
+        }
+
+
+_replicas = None
+_replicas_pid = None
+_round_robin = itertools.count()
+
+def get_replicas():
+    """Réplicas de DB_REPLICAS para el proceso actual (lista vacía si no hay)."""
+    global _replicas, _replicas_pid
+    pid = os.getpid()
+    if _replicas is None or _replicas_pid != pid:
+        with _pool_lock:
+            if _replicas is None or _replicas_pid != pid:
+                specs = _replica_specs()
+                replicas = []
+                for (host, port), lag in zip(specs, _simulated_lags(len(specs))):
+                    config = {
+                        **_connection_config(),
+                        "host": host,
+                        "port": port,
+                        "user": os.getenv("DB_REPLICA_USER") or os.getenv("DB_USER", "root"),
+                        "password": os.getenv("DB_REPLICA_PASSWORD") or os.getenv("DB_PASSWORD", ""),
+                        # Una réplica caída no puede frenar al request: se cae al primario enseguida
+                        "connection_timeout": int(os.getenv("DB_REPLICA_CONNECT_TIMEOUT", 2)),
+                    }
+                    pool = ConnectionPool(
+                        config,
+                        size=int(os.getenv("DB_REPLICA_POOL_SIZE", os.getenv("DB_POOL_SIZE", 10))),
+                        timeout=float(os.getenv("DB_REPLICA_POOL_TIMEOUT", 1)),
+                        pre_ping=_env_bool("DB_POOL_PRE_PING", True),
+                        recycle=int(os.getenv("DB_POOL_RECYCLE", 3600)),
+                        leak_timeout=int(os.getenv("DB_POOL_LEAK_TIMEOUT", 60)),
+                    )
+                    replicas.append(Replica(f"{host}:{port}", pool, simulated_lag=lag))
+                _replicas = replicas
+                _replicas_pid = pid
+    return _replicas
+
+def check_replicas(force=False):
+    for replica in get_replicas():
+        replica.check(force=force)
+
+def choose_replica(since=None, check=True):
+    """
+    Réplica para leer lo escrito hasta `since` (round robin entre las que sirven) o None si
+    ninguna sirve. check=False usa el último estado sin consultar (el camino async lo
+    actualiza en segundo plano).
+    """
+    replicas = get_replicas()
+    if not replicas:
+        return None
+    if check:
+        check_replicas()
+    usable = [r for r in replicas if r.usable(since)]
+    if not usable:
+        return None
+    return usable[next(_round_robin) % len(usable)]
+
+def _acquire_read(since=None, scoped=False):
+    """(réplica o None, conexión): la primera réplica que responda, o el primario."""
+    for _ in range(len(get_replicas())):
+        replica = choose_replica(since)
+        if replica is None:
+            break
+        try:
+            return replica, replica.pool.acquire(scoped=scoped)
+        except DBError as e:
+            replica.mark_down(e)
+    return None, get_pool().acquire(scoped=scoped)
+
+def parse_last_write(value):
+    """time.time() de la cookie de última escritura (nunca en el futuro) o None."""
+    try:
+        return min(float(value), time.time())
+    except (TypeError, ValueError):
+        return None
+
+def read_since():
+    """Desde cuándo tienen que estar aplicadas las escrituras para las lecturas de este request."""
+    since = g.get("_db_since")
+    if has_request_context():
+        cookie = parse_last_write(request.cookies.get(LAST_WRITE_COOKIE))
+        if cookie and (not since or cookie > since):
+            since = cookie
+    return since
+
+def read_after(ts):
+    """
+    Las lecturas que siguen en este request tienen que ver lo escrito hasta `ts` (p. ej. el
+    último bump de los recursos de un ETag o de un export cacheado). Si la conexión del
+    request es de una réplica que todavía no llegó, se devuelve y la próxima
+    get_db_connection() elige otra vez.
+    """
+    if not ts or not has_app_context() or not get_replicas():
+        return
+    if ts > (g.get("_db_since") or 0):
+        g._db_since = ts
+    replica = g.get("_db_replica")
+    if replica is not None and not replica.usable(read_since()):
+        g.pop("_db_conn").release()
+        g._db_replica = None
+
+_replica_reads = contextvars.ContextVar("db_replica_reads", default=None)
+
+@contextmanager
+def replica_reads(since=None):
+    """
+    Fuera de un request (jobs de exportación): las conexiones de get_db_connection() salen de
+    una réplica que ya aplicó lo escrito hasta `since`, o del primario.
+    """
+    token = _replica_reads.set((since,))
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+def _request_reads_replica():
+    return bool(get_replicas()) and has_request_context() and request.method in READ_METHODS
+
 def get_db_connection():
     """
-    Establece una conexión a la base de datos utilizando mysql.connector.
+    Obtiene una conexión del pool.
+
+    Dentro de un request de Flask devuelve siempre la misma conexión (guardada en `g`)
+    y la libera teardown_appcontext; fuera de Flask (scripts, workers) la conexión
+    vuelve al pool con close(). Los GET/HEAD (y el código dentro de replica_reads())
+    leen de una réplica si hay alguna al día; lo demás usa el primario.
 
     Returns:
         connection: Objeto de conexión a la base de datos.
-    
+
     Raises:
         DBError: Si ocurre un error durante la conexión.
     """
-    try:
-        connection = mysql.connector.connect(
-            host=os.getenv('DB_HOST', 'localhost'),
-            port=int(os.getenv('DB_PORT', 3306)),
-            user=os.getenv('DB_USER', 'root'),
-            password=os.getenv('DB_PASSWORD', ''),
-            database=os.getenv('DB_NAME', 'mi_inventario')
-        )
-        return connection
-    except Error as e:
-        raise DBError(f"Error conectando a la base de datos: {str(e)}")
+    if has_app_context():
+        conn = g.get("_db_conn")
+        if conn is None:
+            if _request_reads_replica():
+                replica, conn = _acquire_read(read_since(), scoped=True)
+                g._db_replica = replica
+                g._db_route = replica.name if replica else "primary"
+            else:
+                conn = get_pool().acquire(scoped=True)
+            g._db_conn = conn
+        return conn
+    reads = _replica_reads.get()
+    if reads is not None and get_replicas():
+        return _acquire_read(reads[0])[1]
+    return get_pool().acquire()
+
+def close_db_connection(exc=None):
+    """Devuelve al pool la conexión del request (registrado en teardown_appcontext)."""
+    conn = g.pop("_db_conn", None)
+    if conn is not None:
+        conn.release()
+        get_pool().report_leaks()
+
+def _route_headers(resp):
+    """Cookie de última escritura (read-your-writes) y réplica/primario que atendió el request."""
+    wrote = g.get("_db_last_write")
+    if wrote and get_replicas():
+        resp.set_cookie(LAST_WRITE_COOKIE, f"{wrote:.3f}", max_age=read_your_writes_window(),
+                        httponly=True, samesite="Lax")
+    route = g.get("_db_route")
+    if route:
+        resp.headers["X-DB-Route"] = route
+    return resp
+
+def init_app(app):
+    app.teardown_appcontext(close_db_connection)
+    app.after_request(_route_headers)
@@ -1,4 +1,5 @@
 from api.db.db_config import get_db_connection, DBError
+from api.utils import refdata
 
 class Category:
     schema = {"name": str}
@@ -37,14 +38,7 @@ class Category:
 
     @staticmethod
     def _exists_category(category_id: int) -> bool:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        try:
-            cur.execute("SELECT id FROM categories WHERE id = %s", (category_id,))
-            return cur.fetchone() is not None
-        finally:
-            cur.close()
-            conn.close()
+        return refdata.categories.exists(int(category_id))
 
     # ---------- CRUD ----------
 
@@ -0,0 +1,106 @@
+from api.db.db_config import get_db_connection, DBError
+
+class CategoryStock:
+    """
+    Resumen de stock por categoría (tabla category_stock, ver settings/summaries.sql).
+    Los triggers de products lo mantienen exacto; verify()/rebuild() sirven para
+    auditarlo o regenerarlo (p. ej. después de cargar datos con FOREIGN_KEY_CHECKS=0).
+    """
+
+    # Reporte de stock por categoría (endpoint JSON, exports y camino async): sólo el resumen
+    REPORT_SQL = """
+        SELECT c.name AS category,
+               COALESCE(s.total_stock, 0) AS total_stock
+        FROM categories c
+        LEFT JOIN category_stock s ON s.category_id = c.id
+        ORDER BY c.name
+    """
+
+    # Agregación "en vivo" sobre products: la fuente de verdad
+    _LIVE_SQL = """
+        SELECT c.id AS category_id,
+               COALESCE(SUM(p.stock), 0) AS total_stock,
+               COUNT(p.id) AS product_count
+        FROM categories c
+        LEFT JOIN products p ON p.category_id = c.id
+        GROUP BY c.id
+    """
+
+    @classmethod
+    def get_all(cls):
+        """Stock total por categoría leyendo sólo el resumen (una fila por categoría)."""
+        conn = get_db_connection()
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute(cls.REPORT_SQL)
+            return cur.fetchall()
+        except Exception as e:
+            raise DBError(f"Error leyendo stock por categoría: {str(e)}")
+        finally:
+            cur.close()
+            conn.close()
+
+    @classmethod
+    def verify(cls):
+        """
+        Compara el resumen contra la agregación real.
+        :return: lista de diferencias [{category_id, expected_stock, actual_stock, ...}]
+        """
+        conn = get_db_connection()
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute(f"""
+                SELECT COALESCE(live.category_id, s.category_id) AS category_id,
+                       COALESCE(live.total_stock, 0)   AS expected_stock,
+                       COALESCE(s.total_stock, 0)      AS actual_stock,
+                       COALESCE(live.product_count, 0) AS expected_count,
+                       COALESCE(s.product_count, 0)    AS actual_count
+                FROM ({cls._LIVE_SQL}) live
+                LEFT JOIN category_stock s ON s.category_id = live.category_id
+                UNION ALL
+                SELECT s.category_id, 0, s.total_stock, 0, s.product_count
+                FROM category_stock s
+                LEFT JOIN categories c ON c.id = s.category_id
+                WHERE c.id IS NULL
+            """)
+            rows = cur.fetchall()
+            return [
+                {k: int(v) for k, v in r.items()}
+                for r in rows
+                if int(r["expected_stock"]) != int(r["actual_stock"])
+                or int(r["expected_count"]) != int(r["actual_count"])
+            ]
+        except Exception as e:
+            raise DBError(f"Error verificando category_stock: {str(e)}")
+        finally:
+            cur.close()
+            conn.close()
+
+    @classmethod
+    def rebuild(cls) -> int:
+        """
+        Regenera el resumen completo en una transacción.
+        INSERT ... SELECT bloquea (lectura compartida) las filas de products mientras corre,
+        así ninguna escritura concurrente queda afuera del recálculo.
+        :return: filas escritas.
+        """
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("DELETE FROM category_stock")
+            cur.execute(f"""
+                INSERT INTO category_stock (category_id, total_stock, product_count)
+                SELECT category_id, total_stock, product_count FROM ({cls._LIVE_SQL}) live
+            """)
+            written = cur.rowcount
+            conn.commit()
+            return written
+        except Exception as e:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise DBError(f"Error regenerando category_stock: {str(e)}")
+        finally:
+            cur.close()
+            conn.close()
@@ -0,0 +1,169 @@
+from datetime import date, timedelta
+from api.db.db_config import get_db_connection, DBError
+
+GRANULARITIES = ("day", "week", "month")
+MAX_BUCKETS = 3700  # ~10 años por día
+
+def _bucket_start(d: date, granularity: str) -> date:
+    if granularity == "week":
+        return d - timedelta(days=d.weekday())  # lunes
+    if granularity == "month":
+        return d.replace(day=1)
+    return d
+
+def _next_bucket(d: date, granularity: str) -> date:
+    if granularity == "week":
+        return d + timedelta(days=7)
+    if granularity == "month":
+        return (d.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return d + timedelta(days=1)
+
+def _label(d: date, granularity: str) -> str:
+    return d.strftime("%Y-%m") if granularity == "month" else d.isoformat()
+
+def default_range(today=None):
+    """Últimos 12 meses completos (incluye el mes actual), como el reporte original."""
+    today = today or date.today()
+    start = today.replace(day=1)
+    for _ in range(11):
+        start = (start - timedelta(days=1)).replace(day=1)
+    return start, today
+
+class OrderRollup:
+    """
+    Rollup diario de órdenes (tabla order_rollup_daily, ver settings/summaries.sql).
+    Los triggers de orders lo mantienen; acá se agrega por día/semana/mes.
+    """
+
+    _LIVE_SQL = """
+        SELECT DATE(order_date) AS day, status, COUNT(*) AS orders, SUM(quantity) AS quantity
+        FROM orders
+        GROUP BY DATE(order_date), status
+    """
+
+    @staticmethod
+    def history_query(d_from: date, d_to: date, granularity: str = "month", status: str | None = None):
+        """
+        Valida el rango y arma la consulta. Devuelve (buckets, sql, params); con las filas
+        se llama a history_rows(). Separado para que el camino async use su propio driver.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity inválida: {granularity} (use day, week o month)")
+        if d_from > d_to:
+            raise ValueError("from no puede ser posterior a to")
+
+        # Esqueleto de períodos (reemplaza al CTE recursivo de meses)
+        buckets = {}
+        cursor = _bucket_start(d_from, granularity)
+        while cursor <= d_to:
+            buckets[cursor] = [0, 0]
+            if len(buckets) > MAX_BUCKETS:
+                raise ValueError(f"El rango pedido supera {MAX_BUCKETS} períodos")
+            cursor = _next_bucket(cursor, granularity)
+
+        sql = """
+            SELECT day, SUM(orders) AS orders, SUM(quantity) AS quantity
+            FROM order_rollup_daily
+            WHERE day BETWEEN %s AND %s
+        """
+        params = [d_from, d_to]
+        if status:
+            sql += " AND status = %s"
+            params.append(status)
+        sql += " GROUP BY day"
+        return buckets, sql, tuple(params)
+
+    @staticmethod
+    def history_rows(buckets, rows, granularity: str):
+        """Reparte las filas (day, orders, quantity) en los períodos, con los vacíos en 0."""
+        for day, orders, quantity in rows:
+            b = buckets.get(_bucket_start(day, granularity))
+            if b is None:
+                continue
+            b[0] += int(orders or 0)
+            b[1] += int(quantity or 0)
+
+        out = []
+        for start, (orders, quantity) in buckets.items():
+            item = {"period": _label(start, granularity), "count": orders, "quantity": quantity}
+            if granularity == "month":
+                item["month"] = item["period"]
+            out.append(item)
+        return out
+
+    @classmethod
+    def history(cls, d_from: date, d_to: date, granularity: str = "month", status: str | None = None):
+        """
+        Órdenes por período entre d_from y d_to (inclusive), con los períodos vacíos en 0.
+        :return: [{"period", "count", "quantity"}] (+ "month" si granularity == "month",
+                 compatible con la respuesta anterior del reporte).
+        """
+        buckets, sql, params = cls.history_query(d_from, d_to, granularity, status)
+
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+        except Exception as e:
+            raise DBError(f"Error leyendo order_rollup_daily: {str(e)}")
+        finally:
+            cur.close()
+            conn.close()
+
+        return cls.history_rows(buckets, rows, granularity)
+
+    @classmethod
+    def verify(cls):
+        """Diferencias entre el rollup y la agregación real de orders."""
+        conn = get_db_connection()
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute(f"""
+                SELECT live.day, live.status,
+                       live.orders AS expected_orders, COALESCE(r.orders, 0) AS actual_orders,
+                       live.quantity AS expected_quantity, COALESCE(r.quantity, 0) AS actual_quantity
+                FROM ({cls._LIVE_SQL}) live
+                LEFT JOIN order_rollup_daily r ON r.day = live.day AND r.status = live.status
+                WHERE COALESCE(r.orders, 0) <> live.orders
+                   OR COALESCE(r.quantity, 0) <> live.quantity
+                UNION ALL
+                SELECT r.day, r.status, 0, r.orders, 0, r.quantity
+                FROM order_rollup_daily r
+                LEFT JOIN ({cls._LIVE_SQL}) live ON live.day = r.day AND live.status = r.status
+                WHERE live.day IS NULL AND (r.orders <> 0 OR r.quantity <> 0)
+            """)
+            return [
+                {**r, "day": r["day"].isoformat(),
+                 **{k: int(r[k]) for k in ("expected_orders", "actual_orders", "expected_quantity", "actual_quantity")}}
+                for r in cur.fetchall()
+            ]
+        except Exception as e:
+            raise DBError(f"Error verificando order_rollup_daily: {str(e)}")
+        finally:
+            cur.close()
+            conn.close()
+
+    @classmethod
+    def rebuild(cls) -> int:
+        """Regenera el rollup completo en una transacción."""
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("DELETE FROM order_rollup_daily")
+            cur.execute(f"""
+                INSERT INTO order_rollup_daily (day, status, orders, quantity)
+                SELECT day, status, orders, quantity FROM ({cls._LIVE_SQL}) live
+            """)
+            written = cur.rowcount
+            conn.commit()
+            return written
+        except Exception as e:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise DBError(f"Error regenerando order_rollup_daily: {str(e)}")
+        finally:
+            cur.close()
+            conn.close()
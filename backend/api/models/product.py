@@ -1,4 +1,5 @@
 from api.db.db_config import get_db_connection, DBError
+from api.utils import refdata
 
 class Product:
     """
@@ -119,23 +120,16 @@ class Product:
         supplier_id = data.get("supplier_id")
         supplier_id = int(supplier_id) if supplier_id is not None else None
 
+        # Validar categoría y proveedor (si viene), en memoria
+        if not refdata.categories.exists(category_id):
+            raise DBError(f"category_id {category_id} no existe")
+        if supplier_id is not None and not refdata.suppliers.exists(supplier_id):
+            raise DBError(f"supplier_id {supplier_id} no existe")
+
         try:
             conn = get_db_connection()
             cur = conn.cursor()
 
-            # Validar categoría
-            cur.execute("SELECT id FROM categories WHERE id = %s", (category_id,))
-            if not cur.fetchone():
-                conn.close()
-                raise DBError(f"category_id {category_id} no existe")
-
-            # Validar proveedor (si viene)
-            if supplier_id is not None:
-                cur.execute("SELECT id FROM suppliers WHERE id = %s", (supplier_id,))
-                if not cur.fetchone():
-                    conn.close()
-                    raise DBError(f"supplier_id {supplier_id} no existe")
-
             cur.execute(
                 """
                 INSERT INTO products (name, price, stock, category_id, supplier_id)
@@ -172,26 +166,20 @@ class Product:
         allowed = ("name", "price", "stock", "category_id", "supplier_id")
         sets, params = [], []
 
+        if "category_id" in data and data["category_id"] is not None:
+            cid = int(data["category_id"])
+            if not refdata.categories.exists(cid):
+                raise DBError(f"category_id {cid} no existe")
+
+        if data.get("supplier_id") is not None:
+            sid = int(data["supplier_id"])
+            if not refdata.suppliers.exists(sid):
+                raise DBError(f"supplier_id {sid} no existe")
+
         try:
             conn = get_db_connection()
             cur = conn.cursor()
 
-            if "category_id" in data and data["category_id"] is not None:
-                cid = int(data["category_id"])
-                cur.execute("SELECT id FROM categories WHERE id = %s", (cid,))
-                if not cur.fetchone():
-                    conn.close()
-                    raise DBError(f"category_id {cid} no existe")
-
-            if "supplier_id" in data:
-                sid = data["supplier_id"]
-                if sid is not None:
-                    sid = int(sid)
-                    cur.execute("SELECT id FROM suppliers WHERE id = %s", (sid,))
-                    if not cur.fetchone():
-                        conn.close()
-                        raise DBError(f"supplier_id {sid} no existe")
-
             for k in allowed:
                 if k in data:
                     v = data[k]
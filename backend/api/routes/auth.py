@@ -1,7 +1,9 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, request
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from api.models.users import User
 from api.db.db_config import DBError
+from api.utils.responses import json_ok, json_err
+from api.utils.cache import invalidate
 from datetime import timedelta
 
 auth_bp = Blueprint("auth", __name__)
@@ -9,13 +11,10 @@ auth_bp.strict_slashes = False
 
 # ------------------ Helpers de respuesta ------------------
 def ok(data=None, status=200):
-    payload = {"ok": True}
-    if data is not None:
-        payload["data"] = data
-    return jsonify(payload), status
+    return json_ok(data, status)
 
 def err(message="Error", code="ERROR", status=400, details=None):
-    return jsonify({"ok": False, "error": message, "code": code, "details": details or {}}), status
+    return json_err(message, code, status, details)
 
 # ------------------ POST /auth/register (opcional) ------------------
 @auth_bp.route("/register", methods=["POST"])
@@ -36,6 +35,7 @@ def register():
 
     try:
         result = User.register({"username": username, "password": password, "role": role})
+        invalidate("users")  # GET /users es condicional: el alta cambia su ETag
         return ok(result, 201)
     except DBError as e:
         return err("Error de base de datos", "DB_ERROR", 400, {"db": str(e)})
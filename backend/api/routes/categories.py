@@ -1,39 +1,41 @@
-from flask import Blueprint, jsonify, request, make_response, render_template_string
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from api.db.db_config import get_db_connection, DBError
 from api.errors import ValidationError, DatabaseError, NotFoundError
 from api.utils.roles import admin_required
-
-# Para PDF
-from io import BytesIO
-try:
-    from xhtml2pdf import pisa
-    HAS_PDF = True
-except Exception:
-    HAS_PDF = False
+from api.utils.cache import invalidate
+from api.utils.versions import conditional_get
+from api.utils.streaming import iter_batches, csv_lines, iter_rows, write_chunks
+from api.utils.pagination import keyset_sql, page_params, page_response, wants_all
+from api.utils.responses import json_ok
+from api.utils import pdf, refdata
+from api.utils.export_cache import send_export
 
 categories_bp = Blueprint("categories", __name__)
 categories_bp.strict_slashes = False
 
 def ok(data=None, status=200):
-    payload = {"ok": True}
-    if data is not None:
-        payload["data"] = data
-    return jsonify(payload), status
+    return json_ok(data, status)
 
 # ----------------------------
 # GET /categories (listar)
 # ----------------------------
 @categories_bp.route("", methods=["GET"])
 @jwt_required()
+@conditional_get("categories")
 def get_all_categories():
+    """?limit=&after_id= (cursor) o ?all=true para el listado completo (desplegables, en memoria)."""
     try:
+        if wants_all():
+            return ok(refdata.categories.list())
+        limit, after_id = page_params()
+        sql, params = keyset_sql("SELECT id, name FROM categories", [], [], "id", limit, after_id)
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT id, name FROM categories ORDER BY id DESC")
+        cursor.execute(sql, params)
         items = cursor.fetchall()
         cursor.close(); conn.close()
-        return ok(items)
+        return page_response(items, limit)
     except DBError as e:
         raise DatabaseError("No se pudieron obtener las categorías", details={"db": str(e)})
 
@@ -54,6 +56,7 @@ def create_category():
         cursor = conn.cursor()
         cursor.execute("INSERT INTO categories (name) VALUES (%s)", (name,))
         conn.commit()
+        invalidate("categories")
         category_id = cursor.lastrowid
         cursor.close(); conn.close()
         return ok({"id": category_id}, 201)
@@ -77,6 +80,7 @@ def update_category(category_id):
         cursor = conn.cursor()
         cursor.execute("UPDATE categories SET name=%s WHERE id=%s", (name, category_id))
         conn.commit()
+        invalidate("categories")
         affected = cursor.rowcount
         cursor.close(); conn.close()
         if affected == 0:
@@ -96,6 +100,7 @@ def delete_category(category_id):
         cursor = conn.cursor()
         cursor.execute("DELETE FROM categories WHERE id=%s", (category_id,))
         conn.commit()
+        invalidate("categories")
         affected = cursor.rowcount
         cursor.close(); conn.close()
         if affected == 0:
@@ -107,78 +112,55 @@ def delete_category(category_id):
 # ============================
 # EXPORTS (solo admin)
 # ============================
-@categories_bp.route("/export/csv", methods=["GET"])
-@admin_required
-def export_categories_csv():
+def _csv_row(r):
+    _name = str(r[1]).replace('"', '""')
+    return f'{r[0]},"{_name}"'
+
+def iter_categories_csv(params=None, progress=None):
+    conn = get_db_connection()
+    cur = conn.cursor(buffered=False)
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
         cur.execute("SELECT id, name FROM categories ORDER BY id")
-        rows = cur.fetchall()
+        yield from csv_lines("id,name", iter_batches(cur), _csv_row)
+    finally:
         cur.close(); conn.close()
 
-        csv_lines = ["id,name"]
-        for r in rows:
-            _id = str(r[0])
-            _name = str(r[1]).replace('"', '""')
-            csv_lines.append(f'{_id},"{_name}"')
-
-        csv_data = "\n".join(csv_lines)
-        resp = make_response(csv_data)
-        resp.headers["Content-Type"] = "text/csv; charset=utf-8"
-        resp.headers["Content-Disposition"] = "attachment; filename=categorias.csv"
-        return resp
+def render_categories_csv(dest, params=None, progress=None):
+    write_chunks(dest, iter_categories_csv(params, progress))
+
+@categories_bp.route("/export/csv", methods=["GET"])
+@admin_required
+def export_categories_csv():
+    try:
+        return send_export("categories_csv", ("categories",), iter_categories_csv,
+                           "categorias.csv", "text/csv; charset=utf-8")
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
-@categories_bp.route("/export/pdf", methods=["GET"])
-@admin_required
-def export_categories_pdf():
-    if not HAS_PDF:
-        return jsonify({"ok": False, "error": "xhtml2pdf no está instalado en el entorno"}), 501
+_PDF_COLUMNS = ["ID", "Nombre"]
 
+def iter_categories_pdf(params=None, progress=None):
+    """
+    Chunks del PDF (uno por página). No depende del request: lo usan el endpoint
+    sincrónico y los jobs de /exports (render_categories_pdf). El cursor se lee de a lotes.
+    """
+    conn = get_db_connection()
+    cur = conn.cursor(buffered=False)
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
         cur.execute("SELECT id, name FROM categories ORDER BY id")
-        rows = cur.fetchall()
+        yield from pdf.iter_table("Categorías", _PDF_COLUMNS, iter_rows(cur),
+                                  widths=(1, 6), progress=progress)
+    finally:
         cur.close(); conn.close()
 
-        html = render_template_string("""
-        <html>
-          <head>
-            <meta charset="utf-8">
-            <style>
-              body { font-family: DejaVu Sans, Arial, Helvetica, sans-serif; font-size: 12px; }
-              h1 { text-align: center; }
-              table { width: 100%; border-collapse: collapse; }
-              th, td { border: 1px solid #444; padding: 6px; text-align: left; }
-              thead { background: #efefef; }
-            </style>
-          </head>
-          <body>
-            <h1>Categorías</h1>
-            <table>
-              <thead><tr><th>ID</th><th>Nombre</th></tr></thead>
-              <tbody>
-                {% for r in rows %}
-                  <tr><td>{{ r[0] }}</td><td>{{ r[1] }}</td></tr>
-                {% endfor %}
-              </tbody>
-            </table>
-          </body>
-        </html>
-        """, rows=rows)
-
-        pdf_io = BytesIO()
-        pisa_status = pisa.CreatePDF(html, dest=pdf_io)
-        if pisa_status.err:
-            return jsonify({"ok": False, "error": "No se pudo generar el PDF"}), 500
-
-        pdf_io.seek(0)
-        resp = make_response(pdf_io.read())
-        resp.headers["Content-Type"] = "application/pdf"
-        resp.headers["Content-Disposition"] = "inline; filename=categorias.pdf"
-        return resp
+def render_categories_pdf(dest, params=None, progress=None):
+    write_chunks(dest, iter_categories_pdf(params, progress))
+
+@categories_bp.route("/export/pdf", methods=["GET"])
+@admin_required
+def export_categories_pdf():
+    try:
+        return send_export("categories_pdf", ("categories",), iter_categories_pdf,
+                           "categorias.pdf", "application/pdf", inline=True)
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
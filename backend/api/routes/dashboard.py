@@ -1,21 +1,48 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, request
 from api.db.db_config import get_db_connection, DBError
 from api.utils.security import token_required
+from api.utils.roles import admin_required
+from api.utils import query_stats
+from api.utils.cache import TTLCache
+from api.utils.versions import conditional_get
+from api.utils.responses import json_ok, json_err
+import os
+from datetime import date, datetime
 
 dashboard_bp = Blueprint("dashboard", __name__)
 dashboard_bp.strict_slashes = False
 
 def ok(data=None, status=200):
-    payload = {"ok": True}
-    if data is not None:
-        payload["data"] = data
-    return jsonify(payload), status
+    return json_ok(data, status)
 
 def err(message="Error interno del servidor", code="INTERNAL_ERROR", status=500, details=None):
-    return jsonify({"ok": False, "error": message, "code": code, "details": details or {}}), status
+    return json_err(message, code, status, details)
+
+# Conteos del dashboard: cache corto por proceso, atado a los tokens de versión de las tablas
+_metrics_cache = TTLCache(ttl=float(os.getenv("DASHBOARD_CACHE_TTL", 15)),
+                          resources=("products", "categories", "suppliers", "orders"))
+
+METRICS_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM products)   AS products,
+        (SELECT COUNT(*) FROM categories) AS categories,
+        (SELECT COUNT(*) FROM suppliers)  AS suppliers,
+        (SELECT COUNT(*) FROM orders
+          WHERE order_date >= CURDATE()
+            AND order_date <  DATE_ADD(CURDATE(), INTERVAL 1 DAY)) AS orders_today,
+        (SELECT COUNT(*) FROM products WHERE stock <= 5) AS low_stock
+"""
+METRICS_KEYS = ("products", "categories", "suppliers", "orders_today", "low_stock")
+
+def _q_metrics(cur):
+    """Los cinco conteos en un solo round trip."""
+    cur.execute(METRICS_SQL)
+    row = cur.fetchone() or {}
+    return {k: int(row.get(k) or 0) for k in METRICS_KEYS}
 
 @dashboard_bp.route("/metrics", methods=["GET"])
 @token_required
+@conditional_get("products", "categories", "suppliers", "orders")
 def metrics(*args, **kwargs):
     """
     Devuelve:
@@ -24,46 +51,57 @@ def metrics(*args, **kwargs):
         "categories": int,
         "suppliers": int,
         "orders_today": int,
-        "low_stock": int        # productos con stock <= 5
+        "low_stock": int,       # productos con stock <= 5
+        "generated_at": str,    # ISO-8601: cuándo se calcularon los conteos
+        "cached": bool,
+        "cache": {"hits", "misses", "size", "ttl"}
       }
     """
-    try:
-        connection = get_db_connection()
-        cur = connection.cursor(dictionary=True)
-
-        cur.execute("SELECT COUNT(*) AS c FROM products")
-        products = (cur.fetchone() or {}).get("c", 0)
-
-        cur.execute("SELECT COUNT(*) AS c FROM categories")
-        categories = (cur.fetchone() or {}).get("c", 0)
-
-        cur.execute("SELECT COUNT(*) AS c FROM suppliers")
-        suppliers = (cur.fetchone() or {}).get("c", 0)
+    # La clave incluye la fecha: orders_today cambia a medianoche aunque nadie escriba
+    key = date.today().isoformat()
+    # Tokens leídos antes de consultar: si alguien escribe en el medio, lo guardado no se usa
+    tokens = _metrics_cache.tokens()
+    data = _metrics_cache.get(key, tokens)
+    cached = data is not None
+    if not cached:
+        try:
+            connection = get_db_connection()
+            cur = connection.cursor(dictionary=True)
+            data = _q_metrics(cur)
+            cur.close()
+            connection.close()
+        except DBError as e:
+            return err("No se pudieron obtener métricas", details={"db": str(e)})
+        except Exception as e:
+            return err(str(e))
+        data["generated_at"] = datetime.now().isoformat(timespec="seconds")
+        _metrics_cache.set(key, data, tokens)
 
-        # Órdenes de HOY (por order_date)
-        cur.execute("""
-            SELECT COUNT(*) AS c
-            FROM orders
-            WHERE order_date >= CURDATE()
-              AND order_date <  DATE_ADD(CURDATE(), INTERVAL 1 DAY)
-        """)
-        orders_today = (cur.fetchone() or {}).get("c", 0)
+    return ok({**data, "cached": cached, "cache": _metrics_cache.stats()})
 
-        # Bajo stock (umbral 5)
-        cur.execute("SELECT COUNT(*) AS c FROM products WHERE stock <= 5")
-        low_stock = (cur.fetchone() or {}).get("c", 0)
-
-        cur.close()
-        connection.close()
-
-        return ok({
-            "products": products,
-            "categories": categories,
-            "suppliers": suppliers,
-            "orders_today": orders_today,
-            "low_stock": low_stock
-        })
-    except DBError as e:
-        return err("No se pudieron obtener métricas", details={"db": str(e)})
-    except Exception as e:
-        return err(str(e))
+@dashboard_bp.route("/slow-queries", methods=["GET"])
+@admin_required
+def slow_queries():
+    """
+    Consultas agrupadas por huella (todos los procesos), de mayor a menor tiempo total.
+    Query: ?limit=20 (máx. 200) & sort=total|max|count|slow|avg
+      {
+        "threshold_ms": float,   # SLOW_QUERY_MS
+        "fingerprints": int,     # huellas distintas vistas
+        "items": [{id, fingerprint, count, total_ms, avg_ms, max_ms, errors, slow,
+                   last_slow: {at, elapsed_ms, route, error, explain} | null}]
+      }
+    """
+    try:
+        limit = min(max(int(request.args.get("limit", 20)), 1), 200)
+    except ValueError:
+        return err("limit debe ser un entero", code="VALIDATION_ERROR", status=400)
+    sort = request.args.get("sort", "total")
+    if sort not in ("total", "max", "count", "slow", "avg"):
+        return err("sort debe ser total, max, count, slow o avg", code="VALIDATION_ERROR", status=400)
+    items, total = query_stats.top(limit, sort)
+    return ok({
+        "threshold_ms": float(os.getenv("SLOW_QUERY_MS", 200)),
+        "fingerprints": total,
+        "items": items,
+    })
@@ -0,0 +1,91 @@
+# api/routes/exports.py
+import os
+import time
+from flask import Blueprint, request, send_file
+from api.db.db_config import read_since
+from api.utils.security import token_required
+from api.utils import export_jobs
+from api.utils.responses import json_ok, json_err
+
+exports_bp = Blueprint("exports", __name__)
+exports_bp.strict_slashes = False
+
+# ----------------- Helpers de respuesta -----------------
+def ok(data=None, status=200):
+    return json_ok(data, status)
+
+def err(message="Error interno del servidor", code="INTERNAL_ERROR", status=500, details=None):
+    return json_err(message, code, status, details)
+
+def _load_own_job(job_id, user_id, role):
+    """Devuelve (meta, None) o (None, respuesta de error). Sólo el dueño o un admin lo ven."""
+    meta = export_jobs.read_job(job_id)
+    expired = meta and meta.get("finished_at") and time.time() - meta["finished_at"] > export_jobs.export_ttl()
+    if not meta or expired:
+        return None, err("Export no encontrado", code="NOT_FOUND", status=404)
+    if role != "admin" and meta.get("user_id") != user_id:
+        return None, err("Export no encontrado", code="NOT_FOUND", status=404)
+    return meta, None
+
+# --------- POST /exports (encolar) ---------
+@exports_bp.route("", methods=["POST"])
+@token_required
+def create_export(*args, **kwargs):
+    """
+    Body: { "kind": "products_pdf|categories_pdf|suppliers_pdf|stock_by_category_pdf|orders_history_pdf",
+            "params": {} }
+    Responde 202 con el id del job; el PDF se genera en segundo plano.
+    """
+    data = request.get_json(silent=True) or {}
+    kind = (data.get("kind") or "").strip()
+    params = data.get("params") or {}
+    role = kwargs.get("role")
+
+    spec = export_jobs.EXPORT_KINDS.get(kind)
+    if not spec:
+        return err(f"kind inválido: {kind}", code="VALIDATION_ERROR", status=400,
+                   details={"kinds": sorted(export_jobs.EXPORT_KINDS)})
+    if not isinstance(params, dict):
+        return err("params debe ser un objeto", code="VALIDATION_ERROR", status=400)
+    if spec["admin"] and role != "admin":
+        return err("No autorizado", code="FORBIDDEN", status=403)
+
+    try:
+        export_jobs.cleanup_expired()
+        if export_jobs.pending_jobs() >= export_jobs.max_queued():
+            return err("Hay demasiadas exportaciones en curso, reintentá en unos segundos",
+                       code="EXPORT_QUEUE_FULL", status=429)
+        meta = export_jobs.submit(kind, params, user_id=kwargs.get("user_id"), since=read_since())
+    except Exception as e:
+        return err("No se pudo encolar la exportación", details={"error": str(e)})
+
+    view = export_jobs.public_view(meta)
+    view["status_url"] = f"/exports/{meta['id']}"
+    view["file_url"] = f"/exports/{meta['id']}/file"
+    return ok(view, status=202)
+
+# --------- GET /exports/<id> (estado/progreso) ---------
+@exports_bp.route("/<job_id>", methods=["GET"])
+@token_required
+def export_status(job_id, *args, **kwargs):
+    meta, error = _load_own_job(job_id, kwargs.get("user_id"), kwargs.get("role"))
+    if error:
+        return error
+    return ok(export_jobs.public_view(meta))
+
+# --------- GET /exports/<id>/file (descarga) ---------
+@exports_bp.route("/<job_id>/file", methods=["GET"])
+@token_required
+def export_file(job_id, *args, **kwargs):
+    meta, error = _load_own_job(job_id, kwargs.get("user_id"), kwargs.get("role"))
+    if error:
+        return error
+    if meta.get("status") == "error":
+        return err("La exportación falló", code="EXPORT_FAILED", status=500,
+                   details={"error": meta.get("message")})
+    path = export_jobs.file_path(job_id)
+    if meta.get("status") != "done" or not os.path.exists(path):
+        return err("La exportación todavía no terminó", code="EXPORT_NOT_READY", status=409,
+                   details={"status": meta.get("status"), "progress": meta.get("progress")})
+    return send_file(path, mimetype=meta.get("mimetype"), as_attachment=True,
+                     download_name=meta.get("filename"))
@@ -1,26 +1,21 @@
 # api/routes/orders.py
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, request
 from api.db.db_config import get_db_connection, DBError
 from api.utils.security import token_required       # autenticado (inyecta user_id en kwargs)
 from api.utils.roles import admin_required          # SOLO admin (usa JWT)
+from api.utils.cache import invalidate
+from api.utils.versions import conditional_get
+from api.utils.responses import json_ok, json_err
 
 orders_bp = Blueprint("orders", __name__)
 orders_bp.strict_slashes = False  # evitamos 308 por la barra final
 
 # Helpers de respuesta unificada
 def ok(data=None, status=200):
-    payload = {"ok": True}
-    if data is not None:
-        payload["data"] = data
-    return jsonify(payload), status
+    return json_ok(data, status)
 
 def err(message="Error interno del servidor", code="INTERNAL_ERROR", status=500, details=None):
-    return jsonify({
-        "ok": False,
-        "error": message,
-        "code": code,
-        "details": details or {}
-    }), status
+    return json_err(message, code, status, details)
 
 # --------- Utils de validación/simple ---------
 def _to_int(val, default=None):
@@ -33,10 +28,55 @@ def _status_norm(s):
     return (s or "").strip().lower()
 
 VALID_STATUS = {"pending", "received", "completed", "cancelled", "canceled"}
+# Estados en los que la mercadería ya ingresó: la cantidad de la orden suma a products.stock
+STOCKED_STATUS = {"received", "completed"}
+
+def _stock_effect(status, quantity):
+    return quantity if status in STOCKED_STATUS else 0
+
+_ORDER_COLUMNS = """
+    SELECT o.id, o.product_id, p.name AS product_name,
+           o.quantity, o.status,
+           o.order_date, o.receipt_date,
+           o.user_id
+    FROM orders o
+    JOIN products p ON p.id = o.product_id
+"""
+ORDER_DETAIL_SQL = _ORDER_COLUMNS + " WHERE o.id = %s"
+
+def _orders_list_query(args):
+    """SELECT del listado con los filtros de `args` (request.args o los del camino async)."""
+    q_from = args.get("from")
+    q_to = args.get("to")
+    q_status = _status_norm(args.get("status"))
+    q_product = _to_int(args.get("product_id"))
+
+    where = []
+    params = []
+
+    if q_from:
+        where.append("o.order_date >= %s")
+        params.append(f"{q_from} 00:00:00")
+    if q_to:
+        where.append("o.order_date <= %s")
+        params.append(f"{q_to} 23:59:59")
+    if q_status:
+        where.append("LOWER(o.status) = %s")
+        params.append(q_status)
+    if q_product is not None:
+        where.append("o.product_id = %s")
+        params.append(q_product)
+
+    sql = _ORDER_COLUMNS
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY o.order_date DESC, o.id DESC"
+    return sql, tuple(params)
 
 # --------- GET /orders (lista con filtros) ---------
 @orders_bp.route("", methods=["GET"])
 @token_required
+@conditional_get("orders", "products")
 def list_orders(*args, **kwargs):
     """
     Filtros opcionales:
@@ -46,47 +86,13 @@ def list_orders(*args, **kwargs):
       ?product_id=ID
     """
     try:
-        q_from = request.args.get("from")
-        q_to = request.args.get("to")
-        q_status = _status_norm(request.args.get("status"))
-        q_product = _to_int(request.args.get("product_id"))
-
+        sql, params = _orders_list_query(request.args)
         connection = get_db_connection()
         cur = connection.cursor(dictionary=True)
-
-        where = []
-        params = []
-
-        if q_from:
-            where.append("o.order_date >= %s")
-            params.append(f"{q_from} 00:00:00")
-        if q_to:
-            where.append("o.order_date <= %s")
-            params.append(f"{q_to} 23:59:59")
-        if q_status:
-            where.append("LOWER(o.status) = %s")
-            params.append(q_status)
-        if q_product is not None:
-            where.append("o.product_id = %s")
-            params.append(q_product)
-
-        sql = """
-            SELECT o.id, o.product_id, p.name AS product_name,
-                   o.quantity, o.status,
-                   o.order_date, o.receipt_date,
-                   o.user_id
-            FROM orders o
-            JOIN products p ON p.id = o.product_id
-        """
-        if where:
-            sql += " WHERE " + " AND ".join(where)
-        sql += " ORDER BY o.order_date DESC, o.id DESC"
-
-        cur.execute(sql, tuple(params))
-        rows = cur.fetchall()
-        cur.close()
-        connection.close()
-        return ok(rows)
+        cur.execute(sql, params)
+        # Sin paginación y con filtros opcionales puede ser muy grande: se envía en
+        # streaming a medida que se lee el cursor (no se arma la lista en memoria)
+        return ok(cur)
     except DBError as e:
         return err("No se pudieron listar las órdenes", details={"db": str(e)})
     except Exception as e:
@@ -95,19 +101,12 @@ def list_orders(*args, **kwargs):
 # --------- GET /orders/<id> (detalle) ---------
 @orders_bp.route("/<int:order_id>", methods=["GET"])
 @token_required
+@conditional_get("orders", "products")
 def get_order(order_id, *args, **kwargs):
     try:
         connection = get_db_connection()
         cur = connection.cursor(dictionary=True)
-        cur.execute("""
-            SELECT o.id, o.product_id, p.name AS product_name,
-                   o.quantity, o.status,
-                   o.order_date, o.receipt_date,
-                   o.user_id
-            FROM orders o
-            JOIN products p ON p.id = o.product_id
-            WHERE o.id = %s
-        """, (order_id,))
+        cur.execute(ORDER_DETAIL_SQL, (order_id,))
         row = cur.fetchone()
         cur.close()
         connection.close()
@@ -163,7 +162,11 @@ def create_order(*args, **kwargs):
             (product_id, quantity, status or "pending", user_id)
         )
         new_id = cur.lastrowid
+        # Alta directa como recibida: el stock se ajusta en la misma transacción
+        if _stock_effect(status, quantity):
+            cur.execute("UPDATE products SET stock = stock + %s WHERE id = %s", (quantity, product_id))
         connection.commit()
+        invalidate("orders", "products")
 
         # devolver registro creado
         cur.execute("""
@@ -192,6 +195,10 @@ def update_order(order_id, *args, **kwargs):
     SOLO ADMIN.
     Campos aceptados: quantity (int>0), status (enum), receipt_date (YYYY-MM-DD HH:MM:SS)
     Regla: si status pasa a 'received'/'completed' y NO mandan receipt_date, se fija NOW().
+    Stock: al entrar a 'received'/'completed' suma quantity a products.stock, al salir la
+    resta, y si cambia quantity estando recibida ajusta la diferencia. Orden y stock se
+    actualizan en un único UPDATE condicionado al estado/cantidad leídos: un reintento o
+    una transición concurrente no aplica el ajuste dos veces (responde 409).
     """
     try:
         data = request.get_json(silent=True) or {}
@@ -199,33 +206,37 @@ def update_order(order_id, *args, **kwargs):
         fields = []
         params = []
 
+        new_qty = None
         if "quantity" in data:
             q = _to_int(data.get("quantity"))
             if q is None or q <= 0:
                 return err("quantity debe ser entero > 0", code="VALIDATION_ERROR", status=400)
-            fields.append("quantity = %s")
+            fields.append("o.quantity = %s")
             params.append(q)
+            new_qty = q
 
+        new_status = None
         set_receipt_now = False
         if "status" in data:
             st = _status_norm(data.get("status"))
             if st and st not in VALID_STATUS:
                 return err(f"status inválido: {st}", code="VALIDATION_ERROR", status=400)
-            fields.append("status = %s")
+            fields.append("o.status = %s")
             params.append(st)
+            new_status = st
             if st in {"received", "completed"} and "receipt_date" not in data:
                 set_receipt_now = True
 
         if "receipt_date" in data:
             rd = data.get("receipt_date")
             if rd is None:
-                fields.append("receipt_date = NULL")
+                fields.append("o.receipt_date = NULL")
             else:
-                fields.append("receipt_date = %s")
+                fields.append("o.receipt_date = %s")
                 params.append(str(rd))
 
         if set_receipt_now:
-            fields.append("receipt_date = NOW()")  # literal SQL
+            fields.append("o.receipt_date = NOW()")  # literal SQL
 
         if not fields:
             return err("No hay campos válidos para actualizar", code="VALIDATION_ERROR", status=400)
@@ -233,17 +244,63 @@ def update_order(order_id, *args, **kwargs):
         connection = get_db_connection()
         cur = connection.cursor(dictionary=True)
 
-        # verificar existencia
-        cur.execute("SELECT id FROM orders WHERE id = %s", (order_id,))
-        if not cur.fetchone():
+        # estado previo (lectura simple, sin locks: la condición va en el UPDATE)
+        cur.execute("SELECT id, status, quantity FROM orders WHERE id = %s", (order_id,))
+        prev = cur.fetchone()
+        if not prev:
             cur.close()
             connection.close()
             return err("Orden no encontrada", code="NOT_FOUND", status=404)
 
-        sql = f"UPDATE orders SET {', '.join(fields)} WHERE id = %s"
-        params.append(order_id)
+        prev_status, prev_qty = prev["status"], prev["quantity"]
+        delta = (_stock_effect(new_status if new_status is not None else prev_status,
+                               new_qty if new_qty is not None else prev_qty)
+                 - _stock_effect(prev_status, prev_qty))
+
+        # Un solo UPDATE (orden + producto si hay delta): InnoDB bloquea sólo esas dos filas.
+        # Si otra transición ganó, el WHERE ya no coincide y no se toca nada.
+        guard = " WHERE o.id = %s AND o.status = %s AND o.quantity = %s"
+        if delta:
+            fields.append("p.stock = p.stock + %s")
+            params.append(delta)
+            sql = f"UPDATE orders o JOIN products p ON p.id = o.product_id SET {', '.join(fields)}" + guard
+            if delta < 0:
+                sql += " AND p.stock + %s >= 0"
+        else:
+            sql = f"UPDATE orders o SET {', '.join(fields)}" + guard
+        params += [order_id, prev_status, prev_qty]
+        if delta < 0:
+            params.append(delta)
         cur.execute(sql, tuple(params))
-        connection.commit()
+
+        if cur.rowcount == 0:
+            # Sin filas modificadas: o ya estaba así (no-op) o perdió la carrera. El rollback
+            # cierra la transacción: la relectura ve lo confirmado y no el snapshot del SELECT
+            # de arriba (REPEATABLE READ), que todavía mostraría el estado previo.
+            connection.rollback()
+            cur.execute("""
+                SELECT o.status, o.quantity, p.stock
+                FROM orders o JOIN products p ON p.id = o.product_id
+                WHERE o.id = %s
+            """, (order_id,))
+            now = cur.fetchone()
+            if not now or (now["status"], now["quantity"]) != (prev_status, prev_qty):
+                cur.close()
+                connection.close()
+                return err("La orden cambió mientras se actualizaba, reintentá", code="CONFLICT", status=409)
+            if delta < 0 and now["stock"] + delta < 0:
+                cur.close()
+                connection.close()
+                return err("Stock insuficiente para revertir la recepción", code="INSUFFICIENT_STOCK",
+                           status=409, details={"stock": now["stock"], "delta": delta})
+            if delta:
+                # El ajuste no se aplicó y el stock cambió entre el UPDATE y la relectura
+                cur.close()
+                connection.close()
+                return err("La orden cambió mientras se actualizaba, reintentá", code="CONFLICT", status=409)
+        else:
+            connection.commit()
+            invalidate("orders", "products")
 
         # devolver actualizado
         cur.execute("""
@@ -268,17 +325,43 @@ def update_order(order_id, *args, **kwargs):
 @orders_bp.route("/<int:order_id>", methods=["DELETE"])
 @admin_required
 def delete_order(order_id, *args, **kwargs):
-    """SOLO ADMIN."""
+    """
+    SOLO ADMIN.
+    Stock: si la orden estaba 'received'/'completed' se resta su quantity de products.stock
+    en la misma transacción que el DELETE (409 si el stock ya no alcanza). La orden se lee
+    con FOR UPDATE: una transición concurrente espera a que termine el borrado.
+    """
     try:
         connection = get_db_connection()
-        cur = connection.cursor()
+        cur = connection.cursor(dictionary=True)
+        cur.execute("SELECT product_id, status, quantity FROM orders WHERE id = %s FOR UPDATE", (order_id,))
+        order = cur.fetchone()
+        if not order:
+            connection.rollback()
+            cur.close()
+            connection.close()
+            return err("Orden no encontrada", code="NOT_FOUND", status=404)
+
+        delta = -_stock_effect(order["status"], order["quantity"])
+        if delta:
+            cur.execute("UPDATE products SET stock = stock + %s WHERE id = %s AND stock + %s >= 0",
+                        (delta, order["product_id"], delta))
+            if cur.rowcount == 0:
+                cur.execute("SELECT stock FROM products WHERE id = %s", (order["product_id"],))
+                stock = cur.fetchone()["stock"]
+                connection.rollback()
+                cur.close()
+                connection.close()
+                return err("Stock insuficiente para revertir la recepción", code="INSUFFICIENT_STOCK",
+                           status=409, details={"stock": stock, "delta": delta})
         cur.execute("DELETE FROM orders WHERE id = %s", (order_id,))
-        affected = cur.rowcount
         connection.commit()
+        if delta:
+            invalidate("orders", "products")
+        else:
+            invalidate("orders")
         cur.close()
         connection.close()
-        if affected == 0:
-            return err("Orden no encontrada", code="NOT_FOUND", status=404)
         return ok({"deleted": order_id})
     except DBError as e:
         return err("No se pudo eliminar la orden", details={"db": str(e)})
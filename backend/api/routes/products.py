@@ -1,26 +1,26 @@
-
-from flask import Blueprint, jsonify, request, make_response, render_template_string
+import csv
+import os
+import re
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from api.db.db_config import get_db_connection, DBError
 from api.errors import ValidationError, DatabaseError, NotFoundError, ConflictError
 from api.utils.roles import admin_required
-
-# PDF opcional
-from io import BytesIO
-try:
-    from xhtml2pdf import pisa
-    HAS_PDF = True
-except Exception:
-    HAS_PDF = False
+from api.utils.cache import invalidate
+from api.utils.versions import conditional_get
+from api.utils.streaming import iter_batches, csv_lines, iter_csv_dicts, iter_json_array, iter_rows, write_chunks
+from api.utils.pagination import (
+    arg_int, arg_float, add_range, keyset_sql, page_params, page_response, wants_all,
+)
+from api.utils.responses import json_ok
+from api.utils import pdf, refdata
+from api.utils.export_cache import send_export
 
 products_bp = Blueprint("products", __name__)
 products_bp.strict_slashes = False
 
 def ok(data=None, status=200):
-    payload = {"ok": True}
-    if data is not None:
-        payload["data"] = data
-    return jsonify(payload), status
+    return json_ok(data, status)
 
 # ============================
 # Helpers
@@ -70,37 +70,142 @@ def _coerce_product_payload(data: dict, require_all=True):
 
     return out
 
-def _ensure_category_exists(conn, category_id: int):
-    cur = conn.cursor()
-    cur.execute("SELECT 1 FROM categories WHERE id=%s", (category_id,))
-    row = cur.fetchone()
-    cur.close()
-    if not row:
+def _ensure_category_exists(category_id: int):
+    if not refdata.categories.exists(category_id):
         raise NotFoundError(f"La categoría {category_id} no existe")
 
 # ============================
 # CRUD
 # ============================
 
+def _products_list_query(limit=None, after_id=None, args=None):
+    """
+    SELECT del listado con los filtros de la query string empujados a SQL:
+      ?category_id= ?supplier_id= ?min_price= ?max_price= ?min_stock= ?max_stock=
+    `args`: request.args por defecto (el camino async pasa los suyos).
+    """
+    where, params = [], []
+    category_id = arg_int("category_id", args=args)
+    if category_id is not None:
+        where.append("p.category_id = %s")
+        params.append(category_id)
+    supplier_id = arg_int("supplier_id", args=args)
+    if supplier_id is not None:
+        where.append("p.supplier_id = %s")
+        params.append(supplier_id)
+    add_range(where, params, "p.price", arg_float("min_price", args=args), arg_float("max_price", args=args))
+    add_range(where, params, "p.stock", arg_int("min_stock", args=args), arg_int("max_stock", args=args))
+
+    sql = """
+        SELECT p.id, p.name, p.price, p.stock, p.category_id,
+               c.name AS category_name
+        FROM products p
+        JOIN categories c ON p.category_id = c.id
+    """
+    return keyset_sql(sql, where, params, "p.id", limit, after_id)
+
 @products_bp.route("", methods=["GET"])
 @jwt_required()
+@conditional_get("products", "categories")
 def get_all_products():
+    """
+    Paginado por cursor: ?limit=50&after_id=<next_cursor de la página anterior>.
+    ?all=true devuelve el listado completo (formato anterior).
+    """
+    unpaged = wants_all()
+    limit, after_id = (None, None) if unpaged else page_params()
+    sql, params = _products_list_query(limit, after_id)
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT p.id, p.name, p.price, p.stock, p.category_id,
-                   c.name AS category_name
-            FROM products p
-            JOIN categories c ON p.category_id = c.id
-            ORDER BY p.id DESC
-        """)
+        cursor.execute(sql, params)
+        if unpaged:
+            # Listado completo en streaming (iter_batches cierra el cursor al terminar)
+            return ok(cursor)
         items = cursor.fetchall()
         cursor.close(); conn.close()
-        return ok(items)
+        return page_response(items, limit)
     except DBError as e:
         raise DatabaseError("No se pudieron obtener los productos", details={"db": str(e)})
 
+SEARCH_DEFAULT_LIMIT = 10
+SEARCH_MAX_LIMIT = 50
+# innodb_ft_min_token_size del servidor: las palabras más cortas no están en el índice
+FT_MIN_TOKEN_SIZE = int(os.getenv("FT_MIN_TOKEN_SIZE", 3))
+_SEARCH_COLUMNS = """
+    SELECT p.id, p.name, p.price, p.stock, p.category_id, p.supplier_id,
+           c.name AS category_name
+    FROM products p
+    JOIN categories c ON p.category_id = c.id
+"""
+
+def _like_prefix(q: str) -> str:
+    """'ab%c' -> 'ab\\%c%' (los comodines del usuario se buscan literales)."""
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+def _fulltext_terms(q: str) -> str:
+    """
+    Tokens para MATCH ... AGAINST en modo BOOLEAN: todos obligatorios y el último
+    como prefijo ("cafe mol" -> "+cafe +mol*"). Se descartan operadores del usuario y
+    las palabras de menos de FT_MIN_TOKEN_SIZE letras: no están indexadas y, obligatorias,
+    no dejarían ningún resultado (esas las cubre la búsqueda por prefijo).
+    """
+    tokens = re.findall(r"\w+", q)
+    terms = [f"+{t}" for t in tokens[:-1] if len(t) >= FT_MIN_TOKEN_SIZE]
+    if tokens and len(tokens[-1]) >= FT_MIN_TOKEN_SIZE:
+        terms.append(f"+{tokens[-1]}*")
+    return " ".join(terms)
+
+@products_bp.route("/search", methods=["GET"])
+@jwt_required()
+@conditional_get("products", "categories")
+def search_products():
+    """
+    Búsqueda para typeahead: ?q=<texto>&limit=10 (máx. 50).
+    1) Prefijo del nombre con LIKE 'q%' sobre idx_products_name: la colación
+       utf8mb4_unicode_ci ignora mayúsculas y acentos ("cafe" encuentra "Café ...").
+    2) Si faltan resultados, coincidencia por palabras (FULLTEXT ft_products_name),
+       ordenada por relevancia.
+    Sin q devuelve los primeros productos por nombre.
+    """
+    q = " ".join((request.args.get("q") or "").split())[:100]
+    limit = arg_int("limit", SEARCH_DEFAULT_LIMIT)
+    if limit < 1:
+        raise ValidationError("limit debe ser >= 1")
+    limit = min(limit, SEARCH_MAX_LIMIT)
+
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+
+        cursor.execute(_SEARCH_COLUMNS + " WHERE p.name LIKE %s ORDER BY p.name, p.id LIMIT %s",
+                       (_like_prefix(q), limit))
+        items = cursor.fetchall()
+        for it in items:
+            it["match"] = "prefix"
+
+        terms = _fulltext_terms(q)
+        if terms and len(items) < limit:
+            seen = [it["id"] for it in items] or [0]
+            marks = ", ".join(["%s"] * len(seen))
+            cursor.execute(
+                _SEARCH_COLUMNS + f"""
+                WHERE MATCH(p.name) AGAINST (%s IN BOOLEAN MODE)
+                  AND p.id NOT IN ({marks})
+                ORDER BY MATCH(p.name) AGAINST (%s IN BOOLEAN MODE) DESC, p.name
+                LIMIT %s
+                """,
+                (terms, *seen, terms, limit - len(items)),
+            )
+            for it in cursor.fetchall():
+                it["match"] = "token"
+                items.append(it)
+
+        cursor.close(); conn.close()
+        return ok(items)
+    except DBError as e:
+        raise DatabaseError("No se pudo buscar productos", details={"db": str(e)})
+
 @products_bp.route("", methods=["POST"])
 @admin_required
 def create_product():
@@ -108,8 +213,8 @@ def create_product():
     fields = _coerce_product_payload(data, require_all=True)
 
     try:
+        _ensure_category_exists(fields["category_id"])
         conn = get_db_connection()
-        _ensure_category_exists(conn, fields["category_id"])
 
         cursor = conn.cursor()
         cursor.execute("""
@@ -117,6 +222,7 @@ def create_product():
             VALUES (%s, %s, %s, %s)
         """, (fields["name"], fields["price"], fields["stock"], fields["category_id"]))
         conn.commit()
+        invalidate("products")
         product_id = cursor.lastrowid
         cursor.close(); conn.close()
         return ok({"id": product_id}, 201)
@@ -133,8 +239,8 @@ def update_product(product_id):
     fields = _coerce_product_payload(data, require_all=True)
 
     try:
+        _ensure_category_exists(fields["category_id"])
         conn = get_db_connection()
-        _ensure_category_exists(conn, fields["category_id"])
 
         cursor = conn.cursor()
         cursor.execute("""
@@ -143,6 +249,7 @@ def update_product(product_id):
              WHERE id=%s
         """, (fields["name"], fields["price"], fields["stock"], fields["category_id"], product_id))
         conn.commit()
+        invalidate("products")
         if cursor.rowcount == 0:
             cursor.close(); conn.close()
             raise NotFoundError("Producto no encontrado")
@@ -159,6 +266,7 @@ def delete_product(product_id):
         cursor = conn.cursor()
         cursor.execute("DELETE FROM products WHERE id=%s", (product_id,))
         conn.commit()
+        invalidate("products")
         affected = cursor.rowcount
         cursor.close(); conn.close()
         if affected == 0:
@@ -168,102 +276,217 @@ def delete_product(product_id):
         raise DatabaseError("Error al eliminar producto", details={"db": str(e)})
 
 # ============================
-# EXPORTS (restringidas a admin)
+# IMPORT MASIVO
 # ============================
 
-@products_bp.route("/export/csv", methods=["GET"])
+BULK_CHUNK = int(os.getenv("PRODUCTS_BULK_CHUNK", 1000))
+BULK_MAX_ERRORS = 1000  # errores detallados en la respuesta (el total se informa igual)
+
+_BULK_INSERT = """
+    INSERT INTO products (name, price, stock, category_id, supplier_id)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+def _bulk_rows():
+    """Filas del body según Content-Type: text/csv (con encabezado) o un array JSON."""
+    ctype = (request.mimetype or "").lower()
+    if ctype in ("text/csv", "application/csv"):
+        return iter_csv_dicts(request.stream)
+    if ctype == "application/json":
+        return iter_json_array(request.stream)
+    raise ValidationError("Content-Type debe ser text/csv o application/json")
+
+def _coerce_bulk_row(data):
+    """Mismas reglas que POST /products + supplier_id opcional (vacío = sin proveedor)."""
+    fields = _coerce_product_payload(data, require_all=True)
+    supplier_id = data.get("supplier_id")
+    if supplier_id in (None, ""):
+        fields["supplier_id"] = None
+    else:
+        try:
+            fields["supplier_id"] = int(supplier_id)
+        except Exception:
+            raise ValidationError("supplier_id debe ser entero")
+    return fields
+
+class _BulkImport:
+    """
+    Acumula filas válidas y las inserta por lotes de BULK_CHUNK: un executemany
+    (INSERT multi-fila) y un commit por lote. Las categorías/proveedores se validan en
+    memoria (utils/refdata.py).
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.cur = conn.cursor()
+        self.pending = []          # [(n° de fila, fields)]
+        self.received = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, row, message):
+        self.failed += 1
+        if len(self.errors) < BULK_MAX_ERRORS:
+            self.errors.append({"row": row, "error": message})
+
+    def add(self, row, data):
+        self.received += 1
+        try:
+            if not isinstance(data, dict):
+                raise ValidationError("Cada fila debe ser un objeto")
+            self.pending.append((row, _coerce_bulk_row(data)))
+        except ValidationError as e:
+            self.error(row, e.message)
+            return
+        if len(self.pending) >= BULK_CHUNK:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        chunk, self.pending = self.pending, []
+        categories = refdata.categories.rows()
+        suppliers = refdata.suppliers.rows()
+
+        valid = []
+        for row, f in chunk:
+            if f["category_id"] not in categories:
+                self.error(row, f"La categoría {f['category_id']} no existe")
+            elif f["supplier_id"] is not None and f["supplier_id"] not in suppliers:
+                self.error(row, f"El proveedor {f['supplier_id']} no existe")
+            else:
+                valid.append((row, f))
+        if not valid:
+            return
+
+        values = [(f["name"], f["price"], f["stock"], f["category_id"], f["supplier_id"]) for _, f in valid]
+        try:
+            self.cur.executemany(_BULK_INSERT, values)
+            self.conn.commit()
+            self.inserted += len(valid)
+        except Exception:
+            # El lote falló entero: se reintenta fila por fila para reportar cuál(es)
+            self.conn.rollback()
+            self._insert_one_by_one(valid)
+
+    def _insert_one_by_one(self, valid):
+        for row, f in valid:
+            try:
+                self.cur.execute(_BULK_INSERT, (f["name"], f["price"], f["stock"], f["category_id"], f["supplier_id"]))
+                self.inserted += 1
+            except Exception as e:
+                self.error(row, str(e))
+        self.conn.commit()
+
+    def close(self):
+        self.cur.close()
+
+    def report(self):
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+@products_bp.route("/bulk", methods=["POST"])
 @admin_required
-def export_products_csv():
+def bulk_create_products():
+    """
+    Alta masiva. Body en streaming (no se carga entero en memoria):
+      - text/csv: encabezado name,price,stock,category_id[,supplier_id]
+      - application/json: [ {"name", "price", "stock", "category_id", "supplier_id"?}, ... ]
+    Cada lote de PRODUCTS_BULK_CHUNK filas se inserta y confirma por separado; las filas
+    inválidas no frenan la carga y vuelven en `errors` con su número (1 = primera fila de datos).
+    """
+    rows = _bulk_rows()
     try:
         conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT p.id, p.name, p.price, p.stock, p.category_id, c.name AS category_name
-            FROM products p
-            JOIN categories c ON p.category_id = c.id
-            ORDER BY p.id
-        """)
-        rows = cur.fetchall()
+        job = _BulkImport(conn)
+        try:
+            for n, data in enumerate(rows, start=1):
+                job.add(n, data)
+            job.flush()
+        except (ValueError, csv.Error) as e:
+            # Body mal formado a mitad de camino: lo ya confirmado queda, se informa dónde cortó
+            job.flush()
+            raise ValidationError(f"Body inválido: {e}", details=job.report())
+        finally:
+            job.close()
+            conn.close()
+            if job.inserted:
+                invalidate("products")
+        return ok(job.report(), 201 if job.inserted else 200)
+    except DBError as e:
+        raise DatabaseError("Error en la carga masiva de productos", details={"db": str(e)})
+
+# ============================
+# EXPORTS (restringidas a admin)
+# ============================
+
+_EXPORT_SQL = """
+    SELECT p.id, p.name, p.price, p.stock, p.category_id, c.name AS category_name
+    FROM products p
+    JOIN categories c ON p.category_id = c.id
+    ORDER BY p.id
+"""
+
+def _csv_esc(s):
+    s = "" if s is None else str(s)
+    return '"' + s.replace('"', '""') + '"'
+
+def _csv_row(r):
+    _id, _name, _price, _stock, _cat_id, _cat_name = r
+    return f'{_id},{_csv_esc(_name)},{_price},{_stock},{_cat_id},{_csv_esc(_cat_name)}'
+
+def iter_products_csv(params=None, progress=None):
+    conn = get_db_connection()
+    cur = conn.cursor(buffered=False)
+    try:
+        cur.execute(_EXPORT_SQL)
+        yield from csv_lines("id,name,price,stock,category_id,category_name", iter_batches(cur), _csv_row)
+    finally:
         cur.close(); conn.close()
 
-        lines = ["id,name,price,stock,category_id,category_name"]
-        for r in rows:
-            _id, _name, _price, _stock, _cat_id, _cat_name = r
-            def esc(s):
-                s = "" if s is None else str(s)
-                return '"' + s.replace('"', '""') + '"'
-            lines.append(f'{_id},{esc(_name)},{_price},{_stock},{_cat_id},{esc(_cat_name)}')
-
-        csv_data = "\n".join(lines)
-        resp = make_response(csv_data)
-        resp.headers["Content-Type"] = "text/csv; charset=utf-8"
-        resp.headers["Content-Disposition"] = "attachment; filename=productos.csv"
-        return resp
+def render_products_csv(dest, params=None, progress=None):
+    write_chunks(dest, iter_products_csv(params, progress))
+
+@products_bp.route("/export/csv", methods=["GET"])
+@admin_required
+def export_products_csv():
+    try:
+        return send_export("products_csv", ("products", "categories"), iter_products_csv,
+                           "productos.csv", "text/csv; charset=utf-8")
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
+_PDF_COLUMNS = ["ID", "Nombre", "Precio", "Stock", "Categoría"]
+
+def iter_products_pdf(params=None, progress=None):
+    """
+    Chunks del PDF (uno por página). No depende del request: lo usan el endpoint
+    sincrónico y los jobs de /exports (render_products_pdf). El cursor se lee de a lotes.
+    """
+    conn = get_db_connection()
+    cur = conn.cursor(buffered=False)
+    try:
+        cur.execute(_EXPORT_SQL)
+        rows = ((r[0], r[1], "%.2f" % r[2], r[3], r[5]) for r in iter_rows(cur))
+        yield from pdf.iter_table("Productos", _PDF_COLUMNS, rows,
+                                  widths=(1, 5, 1.5, 1, 3), align="LLRRL", progress=progress)
+    finally:
+        cur.close(); conn.close()
+
+def render_products_pdf(dest, params=None, progress=None):
+    write_chunks(dest, iter_products_pdf(params, progress))
+
 @products_bp.route("/export/pdf", methods=["GET"])
 @admin_required
 def export_products_pdf():
-    if not HAS_PDF:
-        return jsonify({"ok": False, "error": "xhtml2pdf no está instalado en el entorno"}), 501
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT p.id, p.name, p.price, p.stock, p.category_id, c.name AS category_name
-            FROM products p
-            JOIN categories c ON p.category_id = c.id
-            ORDER BY p.id
-        """)
-        rows = cur.fetchall()
-        cur.close(); conn.close()
-
-        html = render_template_string("""
-        <html>
-          <head>
-            <meta charset="utf-8">
-            <style>
-              body { font-family: DejaVu Sans, Arial, Helvetica, sans-serif; font-size: 12px; }
-              h1 { text-align: center; }
-              table { width: 100%; border-collapse: collapse; }
-              th, td { border: 1px solid #444; padding: 6px; text-align: left; }
-              thead { background: #efefef; }
-            </style>
-          </head>
-          <body>
-            <h1>Productos</h1>
-            <table>
-              <thead>
-                <tr>
-                  <th>ID</th><th>Nombre</th><th>Precio</th><th>Stock</th><th>Categoría</th>
-                </tr>
-              </thead>
-              <tbody>
-                {% for r in rows %}
-                  <tr>
-                    <td>{{ r[0] }}</td>
-                    <td>{{ r[1] }}</td>
-                    <td>{{ "%.2f"|format(r[2]) }}</td>
-                    <td>{{ r[3] }}</td>
-                    <td>{{ r[5] }}</td>
-                  </tr>
-                {% endfor %}
-              </tbody>
-            </table>
-          </body>
-        </html>
-        """, rows=rows)
-
-        pdf_io = BytesIO()
-        pisa_status = pisa.CreatePDF(html, dest=pdf_io)
-        if pisa_status.err:
-            return jsonify({"ok": False, "error": "No se pudo generar el PDF"}), 500
-
-        pdf_io.seek(0)
-        resp = make_response(pdf_io.read())
-        resp.headers["Content-Type"] = "application/pdf"
-        resp.headers["Content-Disposition"] = "inline; filename=productos.pdf"
-        return resp
+        return send_export("products_pdf", ("products", "categories"), iter_products_pdf,
+                           "productos.pdf", "application/pdf", inline=True)
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
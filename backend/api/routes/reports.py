@@ -1,10 +1,15 @@
 # api/routes/reports.py
-from flask import Blueprint, jsonify, request, Response
+from flask import Blueprint, request
 from api.db.db_config import get_db_connection, DBError
 from api.utils.security import token_required
+from api.utils.streaming import iter_rows, csv_writer_chunks, write_chunks
+from api.utils.versions import conditional_get
+from api.models.category_stock import CategoryStock
+from api.models.order_rollup import OrderRollup, GRANULARITIES, default_range
+from api.utils.responses import json_ok, json_err
+from api.utils import pdf
+from api.utils.export_cache import send_export
 
-import csv
-import io
 from datetime import date
 
 reports_bp = Blueprint("reports", __name__)
@@ -12,75 +17,80 @@ reports_bp.strict_slashes = False
 
 # ----------------- Helpers de respuesta -----------------
 def ok(data=None, status=200):
-    payload = {"ok": True}
-    if data is not None:
-        payload["data"] = data
-    return jsonify(payload), status
+    return json_ok(data, status)
 
 def err(message="Error interno del servidor", code="INTERNAL_ERROR", status=500, details=None):
-    return jsonify({"ok": False, "error": message, "code": code, "details": details or {}}), status
+    return json_err(message, code, status, details)
 
 # ----------------- Consultas base (reutilizables) -----------------
-def _q_stock_by_category(cur):
-    cur.execute("""
-        SELECT c.name AS category,
-               COALESCE(SUM(p.stock), 0) AS total_stock
-        FROM categories c
-        LEFT JOIN products p ON p.category_id = c.id
-        GROUP BY c.id, c.name
-        ORDER BY c.name
-    """)
-    return cur.fetchall()
-
-def _q_orders_history(cur):
-    # Intento con CTE (MySQL 8). Si falla, fallback.
+# stream=True devuelve un iterador sobre el cursor (fetchmany) en vez de fetchall().
+def _rows(cur, stream):
+    return iter_rows(cur) if stream else cur.fetchall()
+
+# Lee el resumen category_stock (mantenido por triggers): una fila por categoría,
+# sin recorrer products. El SQL es del modelo; el camino async lo usa por este nombre.
+STOCK_BY_CATEGORY_SQL = CategoryStock.REPORT_SQL
+
+LOW_STOCK_SQL = """
+    SELECT p.id, p.name, p.stock, c.name AS category
+    FROM products p
+    LEFT JOIN categories c ON c.id = p.category_id
+    WHERE p.stock <= %s
+    ORDER BY p.stock ASC, p.name ASC
+"""
+
+def _q_stock_by_category(cur, stream=False):
+    cur.execute(STOCK_BY_CATEGORY_SQL)
+    return _rows(cur, stream)
+
+def _history_params(source):
+    """
+    Parámetros de /orders-history (request.args o el dict params de un job de export):
+    from/to (YYYY-MM-DD, default: últimos 12 meses), granularity=day|week|month (default month),
+    status opcional. Devuelve (d_from, d_to, granularity, status); ValueError si son inválidos.
+    """
+    default_from, default_to = default_range()
+    try:
+        d_from = date.fromisoformat(source.get("from")) if source.get("from") else default_from
+        d_to = date.fromisoformat(source.get("to")) if source.get("to") else default_to
+    except (TypeError, ValueError):
+        raise ValueError("from/to deben tener formato YYYY-MM-DD")
+    granularity = (source.get("granularity") or "month").strip().lower()
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity inválida: {granularity} (use day, week o month)")
+    status = (source.get("status") or "").strip() or None
+    return d_from, d_to, granularity, status
+
+def _q_orders_history(params):
+    # Lee el rollup order_rollup_daily (mantenido por triggers): índice por día,
+    # sin recorrer orders. ValueError si el rango es inválido.
+    return OrderRollup.history(*_history_params(params))
+
+def _history_labels(granularity):
+    # (título, encabezado de período, nombre de archivo)
+    if granularity == "month":
+        return "Órdenes por Mes", "Mes", "ordenes_por_mes"
+    if granularity == "week":
+        return "Órdenes por Semana", "Semana (desde)", "ordenes_por_semana"
+    return "Órdenes por Día", "Día", "ordenes_por_dia"
+
+def _q_low_stock(cur, threshold: int, stream=False):
+    cur.execute(LOW_STOCK_SQL, (threshold,))
+    return _rows(cur, stream)
+
+def _low_stock_threshold(source, default=5):
     try:
-        cur.execute("""
-            WITH RECURSIVE months AS (
-                SELECT DATE_FORMAT(DATE_SUB(CURDATE(), INTERVAL 11 MONTH), '%Y-%m-01') AS m
-                UNION ALL
-                SELECT DATE_ADD(m, INTERVAL 1 MONTH) FROM months
-                WHERE m < DATE_FORMAT(CURDATE(), '%Y-%m-01')
-            )
-            SELECT DATE_FORMAT(m, '%Y-%m') AS month,
-                   COALESCE(COUNT(o.id), 0) AS count
-            FROM months
-            LEFT JOIN orders o
-                   ON DATE_FORMAT(o.order_date, '%Y-%m-01') = m
-            GROUP BY m
-            ORDER BY m
-        """)
-        return cur.fetchall()
+        return int(source.get("threshold", default))
     except Exception:
-        cur.execute("""
-            SELECT DATE_FORMAT(order_date, '%Y-%m') AS month,
-                   COUNT(*) AS count
-            FROM orders
-            WHERE order_date >= DATE_SUB(CURDATE(), INTERVAL 12 MONTH)
-            GROUP BY DATE_FORMAT(order_date, '%Y-%m')
-            ORDER BY month
-        """)
-        return cur.fetchall()
-
-def _q_low_stock(cur, threshold: int):
-    cur.execute("""
-        SELECT p.id, p.name, p.stock, c.name AS category
-        FROM products p
-        LEFT JOIN categories c ON c.id = p.category_id
-        WHERE p.stock <= %s
-        ORDER BY p.stock ASC, p.name ASC
-    """, (threshold,))
-    return cur.fetchall()
+        return default
 
 # ----------------- Endpoints JSON usados por tu dashboard/reports.js -----------------
 @reports_bp.route("/stock-by-category", methods=["GET"])
 @token_required
+@conditional_get("products", "categories")
 def stock_by_category(*args, **kwargs):
     try:
-        con = get_db_connection(); cur = con.cursor(dictionary=True)
-        rows = _q_stock_by_category(cur)
-        cur.close(); con.close()
-        return ok(rows)
+        return ok(CategoryStock.get_all())
     except DBError as e:
         return err("No se pudo obtener stock por categoría", details={"db": str(e)})
     except Exception as e:
@@ -88,12 +98,17 @@ def stock_by_category(*args, **kwargs):
 
 @reports_bp.route("/orders-history", methods=["GET"])
 @token_required
+@conditional_get("orders")
 def orders_history(*args, **kwargs):
+    """
+    ?from=YYYY-MM-DD&to=YYYY-MM-DD&granularity=day|week|month&status=...
+    Sin parámetros: últimos 12 meses por mes (misma forma que antes: month + count).
+    """
     try:
-        con = get_db_connection(); cur = con.cursor(dictionary=True)
-        rows = _q_orders_history(cur)
-        cur.close(); con.close()
+        rows = _q_orders_history(request.args)
         return ok(rows)
+    except ValueError as e:
+        return err(str(e), code="VALIDATION_ERROR", status=400)
     except DBError as e:
         return err("No se pudo obtener historial de órdenes", details={"db": str(e)})
     except Exception as e:
@@ -101,118 +116,87 @@ def orders_history(*args, **kwargs):
 
 @reports_bp.route("/low-stock", methods=["GET"])
 @token_required
+@conditional_get("products", "categories")
 def low_stock(*args, **kwargs):
     """
     ?threshold=5 (default)
     Devuelve productos con stock <= threshold
     """
     try:
-        thr = request.args.get("threshold", "5")
-        try:
-            thr_int = int(thr)
-        except Exception:
-            thr_int = 5
-
+        thr_int = _low_stock_threshold(request.args)
         con = get_db_connection(); cur = con.cursor(dictionary=True)
-        rows = _q_low_stock(cur, thr_int)
-        cur.close(); con.close()
-        return ok(rows)
+        # Con un umbral alto puede traer casi todo el catálogo: respuesta en streaming
+        return ok(_q_low_stock(cur, thr_int, stream=True))
     except DBError as e:
         return err("No se pudo obtener bajo stock", details={"db": str(e)})
     except Exception as e:
         return err(str(e))
 
-# ----------------- Helpers de exportación -----------------
-def _csv_response(filename: str, header: list, rows: list, keymap: list):
+# ----------------- Exportaciones (archivos del cache de exports) -----------------
+CSV_MIMETYPE = "text/csv; charset=utf-8"
+
+def _csv_chunks(header: list, rows, keymap: list):
     """
     header: títulos de columnas
-    rows: lista de dicts
+    rows: iterable de dicts (idealmente iter_rows(cursor): se escribe a medida que se lee)
     keymap: en qué orden tomar cada clave del dict (misma longitud que header)
     """
-    sio = io.StringIO()
-    writer = csv.writer(sio)
-    writer.writerow(header)
-    for r in rows:
-        writer.writerow([r.get(k, "") for k in keymap])
-
-    out = sio.getvalue()
-    return Response(
-        out,
-        mimetype="text/csv; charset=utf-8",
-        headers={
-            "Content-Disposition": f'attachment; filename="{filename}"',
-            "Cache-Control": "no-store",
-        },
-    )
+    return csv_writer_chunks(header, rows, keymap)
 
-def _pdf_response_simple(title: str, columns: list, rows: list, filename: str):
-    """
-    Genera PDF con reportlab si está instalado. Si no, devuelve 501 con instrucción.
-    columns: títulos
-    rows: lista de listas ya ordenadas como columns
-    """
+def iter_stock_by_category_csv(params=None, progress=None):
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True, buffered=False)
     try:
-        from reportlab.lib.pagesizes import A4, landscape
-        from reportlab.lib import colors
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-        from reportlab.lib.styles import getSampleStyleSheet
-
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=landscape(A4), leftMargin=24, rightMargin=24, topMargin=24, bottomMargin=24)
-        styles = getSampleStyleSheet()
-        story = []
-
-        story.append(Paragraph(title, styles["Title"]))
-        story.append(Spacer(1, 12))
-
-        data = [columns] + rows
-        tbl = Table(data, repeatRows=1)
-        tbl.setStyle(TableStyle([
-            ("BACKGROUND", (0,0), (-1,0), colors.HexColor("#f0f0f0")),
-            ("TEXTCOLOR", (0,0), (-1,0), colors.HexColor("#333333")),
-            ("FONTNAME", (0,0), (-1,0), "Helvetica-Bold"),
-            ("FONTSIZE", (0,0), (-1,0), 10),
-
-            ("GRID", (0,0), (-1,-1), 0.25, colors.HexColor("#aaaaaa")),
-            ("ROWBACKGROUNDS", (0,1), (-1,-1), [colors.white, colors.HexColor("#fcfcfc")]),
-            ("FONTSIZE", (0,1), (-1,-1), 9),
-            ("ALIGN", (0,0), (-1,-1), "LEFT"),
-        ]))
-        story.append(tbl)
-
-        doc.build(story)
-        pdf = buffer.getvalue()
-        buffer.close()
-
-        return Response(
-            pdf,
-            mimetype="application/pdf",
-            headers={
-                "Content-Disposition": f'attachment; filename="{filename}"',
-                "Cache-Control": "no-store",
-            },
-        )
-    except ImportError:
-        # reportlab no está instalado
-        return err(
-            "Exportar a PDF requiere la librería 'reportlab'. Instálala con: pip install reportlab",
-            code="PDF_DEPENDENCY_MISSING",
-            status=501
-        )
+        yield from _csv_chunks(["Categoría", "Stock total"], _q_stock_by_category(cur, stream=True),
+                               ["category", "total_stock"])
+    finally:
+        cur.close(); conn.close()
+
+def iter_orders_history_csv(params=None, progress=None):
+    params = params or {}
+    rows = _q_orders_history(params)
+    _, period_col, _ = _history_labels(_history_params(params)[2])
+    yield from _csv_chunks([period_col, "Órdenes", "Unidades"], rows, ["period", "count", "quantity"])
+
+def render_stock_by_category_csv(dest, params=None, progress=None):
+    write_chunks(dest, iter_stock_by_category_csv(params, progress))
+
+def render_orders_history_csv(dest, params=None, progress=None):
+    write_chunks(dest, iter_orders_history_csv(params, progress))
+
+# ----------------- PDF (endpoints y jobs de /exports) -----------------
+def iter_stock_by_category_pdf(params=None, progress=None):
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True, buffered=False)
+    try:
+        rows = ((r["category"], r["total_stock"]) for r in _q_stock_by_category(cur, stream=True))
+        yield from pdf.iter_table("Stock por Categoría", ["Categoría", "Stock total"], rows,
+                                  widths=(3, 1), align="LR", progress=progress)
+    finally:
+        cur.close(); conn.close()
+
+def iter_orders_history_pdf(params=None, progress=None):
+    params = params or {}
+    rows = _q_orders_history(params)
+    title, period_col, _ = _history_labels(_history_params(params)[2])
+    table_rows = ((r.get("period", ""), r.get("count", 0), r.get("quantity", 0)) for r in rows)
+    yield from pdf.iter_table(title, [period_col, "Órdenes", "Unidades"], table_rows,
+                              widths=(2, 1, 1), align="LRR", progress=progress)
+
+def render_stock_by_category_pdf(dest, params=None, progress=None):
+    write_chunks(dest, iter_stock_by_category_pdf(params, progress))
+
+def render_orders_history_pdf(dest, params=None, progress=None):
+    write_chunks(dest, iter_orders_history_pdf(params, progress))
 
 # ----------------- Export: Stock por Categoría -----------------
 @reports_bp.route("/stock-by-category/export/csv", methods=["GET"])
 @token_required
 def export_stock_by_category_csv(*args, **kwargs):
     try:
-        con = get_db_connection(); cur = con.cursor(dictionary=True)
-        rows = _q_stock_by_category(cur)
-        cur.close(); con.close()
-
-        header = ["Categoría", "Stock total"]
-        keymap = ["category", "total_stock"]
         fname = f"stock_por_categoria_{date.today().isoformat()}.csv"
-        return _csv_response(fname, header, rows, keymap)
+        return send_export("stock_by_category_csv", ("products", "categories"),
+                           iter_stock_by_category_csv, fname, CSV_MIMETYPE)
     except DBError as e:
         return err("No se pudo exportar CSV", details={"db": str(e)})
     except Exception as e:
@@ -222,32 +206,27 @@ def export_stock_by_category_csv(*args, **kwargs):
 @token_required
 def export_stock_by_category_pdf(*args, **kwargs):
     try:
-        con = get_db_connection(); cur = con.cursor(dictionary=True)
-        rows = _q_stock_by_category(cur)
-        cur.close(); con.close()
-
-        columns = ["Categoría", "Stock total"]
-        table_rows = [[r.get("category",""), str(r.get("total_stock",0))] for r in rows]
         fname = f"stock_por_categoria_{date.today().isoformat()}.pdf"
-        return _pdf_response_simple("Stock por Categoría", columns, table_rows, fname)
+        return send_export("stock_by_category_pdf", ("products", "categories"),
+                           iter_stock_by_category_pdf, fname, "application/pdf")
     except DBError as e:
         return err("No se pudo exportar PDF", details={"db": str(e)})
     except Exception as e:
         return err(str(e))
 
-# ----------------- Export: Órdenes por Mes -----------------
+# ----------------- Export: Órdenes por período -----------------
 @reports_bp.route("/orders-history/export/csv", methods=["GET"])
 @token_required
 def export_orders_history_csv(*args, **kwargs):
     try:
-        con = get_db_connection(); cur = con.cursor(dictionary=True)
-        rows = _q_orders_history(cur)
-        cur.close(); con.close()
-
-        header = ["Mes", "Órdenes"]
-        keymap = ["month", "count"]
-        fname = f"ordenes_por_mes_{date.today().isoformat()}.csv"
-        return _csv_response(fname, header, rows, keymap)
+        params = _history_params(request.args)
+        _, _, base = _history_labels(params[2])
+        fname = f"{base}_{date.today().isoformat()}.csv"
+        return send_export("orders_history_csv", ("orders",),
+                           lambda: iter_orders_history_csv(request.args),
+                           fname, CSV_MIMETYPE, params=params)
+    except ValueError as e:
+        return err(str(e), code="VALIDATION_ERROR", status=400)
     except DBError as e:
         return err("No se pudo exportar CSV", details={"db": str(e)})
     except Exception as e:
@@ -257,14 +236,14 @@ def export_orders_history_csv(*args, **kwargs):
 @token_required
 def export_orders_history_pdf(*args, **kwargs):
     try:
-        con = get_db_connection(); cur = con.cursor(dictionary=True)
-        rows = _q_orders_history(cur)
-        cur.close(); con.close()
-
-        columns = ["Mes", "Órdenes"]
-        table_rows = [[r.get("month",""), str(r.get("count",0))] for r in rows]
-        fname = f"ordenes_por_mes_{date.today().isoformat()}.pdf"
-        return _pdf_response_simple("Órdenes por Mes", columns, table_rows, fname)
+        params = _history_params(request.args)
+        _, _, base = _history_labels(params[2])
+        fname = f"{base}_{date.today().isoformat()}.pdf"
+        return send_export("orders_history_pdf", ("orders",),
+                           lambda: iter_orders_history_pdf(request.args),
+                           fname, "application/pdf", params=params)
+    except ValueError as e:
+        return err(str(e), code="VALIDATION_ERROR", status=400)
     except DBError as e:
         return err("No se pudo exportar PDF", details={"db": str(e)})
     except Exception as e:
@@ -1,26 +1,22 @@
 # api/routes/suppliers.py
-from flask import Blueprint, jsonify, request, make_response, render_template_string
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from api.db.db_config import get_db_connection, DBError
 from api.errors import ValidationError, DatabaseError, NotFoundError
 from api.utils.roles import admin_required
-
-# PDF opcional
-from io import BytesIO
-try:
-    from xhtml2pdf import pisa
-    HAS_PDF = True
-except Exception:
-    HAS_PDF = False
+from api.utils.cache import invalidate
+from api.utils.versions import conditional_get
+from api.utils.streaming import iter_batches, csv_lines, iter_rows, write_chunks
+from api.utils.pagination import keyset_sql, page_params, page_response, wants_all
+from api.utils.responses import json_ok
+from api.utils import pdf, refdata
+from api.utils.export_cache import send_export
 
 suppliers_bp = Blueprint("suppliers", __name__)
 suppliers_bp.strict_slashes = False
 
 def ok(data=None, status=200):
-    payload = {"ok": True}
-    if data is not None:
-        payload["data"] = data
-    return jsonify(payload), status
+    return json_ok(data, status)
 
 # ============================
 # CRUD
@@ -28,18 +24,22 @@ def ok(data=None, status=200):
 
 @suppliers_bp.route("", methods=["GET"])
 @jwt_required()
+@conditional_get("suppliers")
 def list_suppliers():
+    """?limit=&after_id= (cursor) o ?all=true para el listado completo (desplegables, en memoria)."""
     try:
+        if wants_all():
+            return ok(refdata.suppliers.list())
+        limit, after_id = page_params()
+        sql, params = keyset_sql(
+            "SELECT id, name, email, phone, contact FROM suppliers", [], [], "id", limit, after_id
+        )
         conn = get_db_connection()
         cur = conn.cursor(dictionary=True)
-        cur.execute("""
-            SELECT id, name, email, phone, contact
-            FROM suppliers
-            ORDER BY id DESC
-        """)
+        cur.execute(sql, params)
         rows = cur.fetchall()
         cur.close(); conn.close()
-        return ok(rows)
+        return page_response(rows, limit)
     except DBError as e:
         raise DatabaseError("No se pudieron obtener los proveedores", details={"db": str(e)})
 
@@ -63,6 +63,7 @@ def create_supplier():
             VALUES (%s, %s, %s, %s)
         """, (name, email, phone, contact))
         conn.commit()
+        invalidate("suppliers")
         new_id = cur.lastrowid
         cur.close(); conn.close()
         return ok({"id": new_id}, 201)
@@ -92,6 +93,7 @@ def update_supplier(supplier_id: int):
         params.append(supplier_id)
         cur.execute(sql, tuple(params))
         conn.commit()
+        invalidate("suppliers")
         affected = cur.rowcount
         cur.close(); conn.close()
         if affected == 0:
@@ -108,6 +110,8 @@ def delete_supplier(supplier_id: int):
         cur = conn.cursor()
         cur.execute("DELETE FROM suppliers WHERE id=%s", (supplier_id,))
         conn.commit()
+        # fk_products_supplier es ON DELETE SET NULL: también cambian filas de products
+        invalidate("suppliers", "products")
         affected = cur.rowcount
         cur.close(); conn.close()
         if affected == 0:
@@ -120,90 +124,59 @@ def delete_supplier(supplier_id: int):
 # EXPORTS (solo admin)
 # ============================
 
-@suppliers_bp.route("/export/csv", methods=["GET"])
-@admin_required
-def export_suppliers_csv():
+def _csv_esc(x):
+    s = "" if x is None else str(x)
+    return '"' + s.replace('"', '""') + '"'
+
+def _csv_row(r):
+    _id, _name, _email, _phone, _contact = r
+    return f'{_id},{_csv_esc(_name)},{_csv_esc(_email)},{_csv_esc(_phone)},{_csv_esc(_contact)}'
+
+def iter_suppliers_csv(params=None, progress=None):
+    conn = get_db_connection()
+    cur = conn.cursor(buffered=False)
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
         cur.execute("SELECT id, name, email, phone, contact FROM suppliers ORDER BY id")
-        rows = cur.fetchall()
+        yield from csv_lines("id,name,email,phone,contact", iter_batches(cur), _csv_row)
+    finally:
         cur.close(); conn.close()
 
-        lines = ["id,name,email,phone,contact"]
-
-        def esc(x):
-            s = "" if x is None else str(x)
-            return '"' + s.replace('"', '""') + '"'
+def render_suppliers_csv(dest, params=None, progress=None):
+    write_chunks(dest, iter_suppliers_csv(params, progress))
 
-        for r in rows:
-            _id, _name, _email, _phone, _contact = r
-            lines.append(f'{_id},{esc(_name)},{esc(_email)},{esc(_phone)},{esc(_contact)}')
-
-        csv_data = "\n".join(lines)
-        resp = make_response(csv_data)
-        resp.headers["Content-Type"] = "text/csv; charset=utf-8"
-        resp.headers["Content-Disposition"] = "attachment; filename=proveedores.csv"
-        return resp
+@suppliers_bp.route("/export/csv", methods=["GET"])
+@admin_required
+def export_suppliers_csv():
+    try:
+        return send_export("suppliers_csv", ("suppliers",), iter_suppliers_csv,
+                           "proveedores.csv", "text/csv; charset=utf-8")
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
-@suppliers_bp.route("/export/pdf", methods=["GET"])
-@admin_required
-def export_suppliers_pdf():
-    if not HAS_PDF:
-        return jsonify({"ok": False, "error": "xhtml2pdf no está instalado en el entorno"}), 501
+_PDF_COLUMNS = ["ID", "Nombre", "Email", "Teléfono", "Contacto"]
 
+def iter_suppliers_pdf(params=None, progress=None):
+    """
+    Chunks del PDF (uno por página). No depende del request: lo usan el endpoint
+    sincrónico y los jobs de /exports (render_suppliers_pdf). El cursor se lee de a lotes.
+    """
+    conn = get_db_connection()
+    cur = conn.cursor(buffered=False)
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
         cur.execute("SELECT id, name, email, phone, contact FROM suppliers ORDER BY id")
-        rows = cur.fetchall()
+        yield from pdf.iter_table("Proveedores", _PDF_COLUMNS, iter_rows(cur),
+                                  widths=(1, 4, 4, 2, 3), progress=progress)
+    finally:
         cur.close(); conn.close()
 
-        html = render_template_string("""
-        <html>
-          <head>
-            <meta charset="utf-8">
-            <style>
-              body { font-family: DejaVu Sans, Arial, Helvetica, sans-serif; font-size: 12px; }
-              h1 { text-align: center; }
-              table { width: 100%; border-collapse: collapse; }
-              th, td { border: 1px solid #444; padding: 6px; text-align: left; }
-              thead { background: #efefef; }
-            </style>
-          </head>
-          <body>
-            <h1>Proveedores</h1>
-            <table>
-              <thead>
-                <tr><th>ID</th><th>Nombre</th><th>Email</th><th>Teléfono</th><th>Contacto</th></tr>
-              </thead>
-              <tbody>
-                {% for r in rows %}
-                  <tr>
-                    <td>{{ r[0] }}</td>
-                    <td>{{ r[1] }}</td>
-                    <td>{{ r[2] or "" }}</td>
-                    <td>{{ r[3] or "" }}</td>
-                    <td>{{ r[4] or "" }}</td>
-                  </tr>
-                {% endfor %}
-              </tbody>
-            </table>
-          </body>
-        </html>
-        """, rows=rows)
-
-        pdf_io = BytesIO()
-        pisa_status = pisa.CreatePDF(html, dest=pdf_io)
-        if pisa_status.err:
-            return jsonify({"ok": False, "error": "No se pudo generar el PDF"}), 500
-
-        pdf_io.seek(0)
-        resp = make_response(pdf_io.read())
-        resp.headers["Content-Type"] = "application/pdf"
-        resp.headers["Content-Disposition"] = "inline; filename=proveedores.pdf"
-        return resp
+def render_suppliers_pdf(dest, params=None, progress=None):
+    write_chunks(dest, iter_suppliers_pdf(params, progress))
+
+@suppliers_bp.route("/export/pdf", methods=["GET"])
+@admin_required
+def export_suppliers_pdf():
+    try:
+        return send_export("suppliers_pdf", ("suppliers",), iter_suppliers_pdf,
+                           "proveedores.pdf", "application/pdf", inline=True)
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
@@ -1,20 +1,21 @@
 # api/routes/users.py
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, request
 from flask_jwt_extended import jwt_required
 from werkzeug.security import generate_password_hash
 from api.db.db_config import get_db_connection, DBError
 from api.errors import ValidationError, DatabaseError, NotFoundError, ConflictError
 from api.utils.roles import admin_required
+from api.utils.pagination import keyset_sql, page_params, page_response, wants_all
+from api.utils.cache import invalidate
+from api.utils.versions import conditional_get
+from api.utils.responses import json_ok
 
 users_bp = Blueprint("users", __name__)
 users_bp.strict_slashes = False
 
 # ---------- helpers de respuesta ----------
 def ok(data=None, status=200):
-    payload = {"ok": True}
-    if data is not None:
-        payload["data"] = data
-    return jsonify(payload), status
+    return json_ok(data, status)
 
 def _norm_role(role: str):
     r = (role or "").strip().lower()
@@ -28,15 +29,24 @@ def _norm_role(role: str):
 # ---------- GET /users (solo admin) ----------
 @users_bp.route("", methods=["GET"])
 @admin_required
+@conditional_get("users")
 def list_users():
+    """?limit=&after_id= (cursor) o ?all=true para el listado completo."""
+    unpaged = wants_all()
+    limit, after_id = (None, None) if unpaged else page_params()
+    # asumimos que ya agregaste created_at a la tabla (como hicimos antes)
+    sql, params = keyset_sql(
+        "SELECT id, username, role, created_at FROM users", [], [], "id", limit, after_id
+    )
     try:
         conn = get_db_connection()
         cur = conn.cursor(dictionary=True)
-        # asumimos que ya agregaste created_at a la tabla (como hicimos antes)
-        cur.execute("SELECT id, username, role, created_at FROM users ORDER BY id DESC")
+        cur.execute(sql, params)
+        if unpaged:
+            return ok(cur)  # en streaming
         rows = cur.fetchall()
         cur.close(); conn.close()
-        return ok(rows)
+        return page_response(rows, limit)
     except DBError as e:
         raise DatabaseError("No se pudieron obtener los usuarios", details={"db": str(e)})
 
@@ -65,6 +75,7 @@ def create_user():
             VALUES (%s, %s, %s, NOW())
         """, (username, pwd_hash, role))
         conn.commit()
+        invalidate("users")
         new_id = cur.lastrowid
         cur.close(); conn.close()
         return ok({"id": new_id}, 201)
@@ -113,6 +124,7 @@ def update_user(user_id: int):
         params.append(user_id)
         cur.execute(sql, tuple(params))
         conn.commit()
+        invalidate("users")
         affected = cur.rowcount
         cur.close(); conn.close()
         if affected == 0:
@@ -131,12 +143,23 @@ def delete_user(user_id: int):
     try:
         conn = get_db_connection()
         cur = conn.cursor()
-        cur.execute("DELETE FROM users WHERE id=%s", (user_id,))
-        conn.commit()
-        affected = cur.rowcount
-        cur.close(); conn.close()
+        # Borrado explícito de órdenes y productos del usuario (antes lo hacía el ON DELETE
+        # CASCADE): las cascadas de FK no disparan triggers, y así order_rollup_daily y
+        # category_stock quedan exactos. Todo en la misma transacción.
+        try:
+            cur.execute("DELETE FROM orders WHERE user_id=%s", (user_id,))
+            cur.execute("DELETE FROM products WHERE user_id=%s", (user_id,))
+            cur.execute("DELETE FROM users WHERE id=%s", (user_id,))
+            affected = cur.rowcount
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close(); conn.close()
         if affected == 0:
             raise NotFoundError("Usuario no encontrado")
+        invalidate("orders", "products", "users")
         return ok({"deleted": True})
     except DBError as e:
         raise DatabaseError("No se pudo eliminar el usuario", details={"db": str(e)})
@@ -19,6 +19,8 @@ DROP VIEW IF EXISTS low_stock_products;
 DROP VIEW IF EXISTS current_inventory;
 
 -- Borrar tablas existentes (orden seguro)
+DROP TABLE IF EXISTS category_stock;
+DROP TABLE IF EXISTS order_rollup_daily;
 DROP TABLE IF EXISTS product_suppliers;
 DROP TABLE IF EXISTS orders;
 DROP TABLE IF EXISTS products;
@@ -62,6 +64,8 @@ CREATE TABLE IF NOT EXISTS products (
     user_id INT NULL,
     supplier_id INT NULL,
     KEY fk_products_category (category_id),
+    KEY idx_products_name (name),
+    FULLTEXT KEY ft_products_name (name),
     KEY idx_products_supplier_id (supplier_id),
     KEY user_id (user_id),
     CONSTRAINT fk_products_category FOREIGN KEY (category_id) REFERENCES categories(id)
@@ -81,10 +85,11 @@ CREATE TABLE IF NOT EXISTS orders (
     quantity INT NOT NULL,
     order_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
     receipt_date DATETIME NULL,
-    status ENUM('pending', 'completed') NOT NULL DEFAULT 'pending',
+    status ENUM('pending', 'received', 'completed', 'cancelled', 'canceled') NOT NULL DEFAULT 'pending',
     user_id INT NULL,
     KEY product_id (product_id),
     KEY user_id (user_id),
+    KEY idx_orders_order_date (order_date),
     CONSTRAINT fk_orders_product FOREIGN KEY (product_id) REFERENCES products(id)
         ON UPDATE CASCADE
         ON DELETE RESTRICT,
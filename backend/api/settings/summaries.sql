@@ -0,0 +1,132 @@
+-- summaries.sql (tablas resumen mantenidas por triggers)
+-- Ejecutar DESPUÉS de create_db.sql (y antes del seeder). Es idempotente: se puede
+-- volver a correr sobre una base existente y luego `flask summaries rebuild`.
+
+USE mi_inventario;
+
+-- ---------------------------------------------------------------------------
+-- Stock por categoría: una fila por categoría con la suma exacta de products.stock
+-- Lo mantienen los triggers de products (alta, baja, cambio de stock o de categoría,
+-- incluida la reasignación de Category.delete(reassign_to=...)).
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS category_stock (
+    category_id INT NOT NULL PRIMARY KEY,
+    total_stock BIGINT NOT NULL DEFAULT 0,
+    product_count INT NOT NULL DEFAULT 0,
+    -- Si cambia categories.id, products.category_id cambia por CASCADE (sin disparar
+    -- triggers): el resumen acompaña por su propia FK.
+    CONSTRAINT fk_category_stock_category FOREIGN KEY (category_id) REFERENCES categories(id)
+        ON UPDATE CASCADE
+        ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+DROP TRIGGER IF EXISTS trg_products_category_stock_ai;
+DROP TRIGGER IF EXISTS trg_products_category_stock_au;
+DROP TRIGGER IF EXISTS trg_products_category_stock_ad;
+
+DELIMITER $$
+
+CREATE TRIGGER trg_products_category_stock_ai AFTER INSERT ON products
+FOR EACH ROW
+BEGIN
+    IF NEW.category_id IS NOT NULL THEN
+        INSERT INTO category_stock (category_id, total_stock, product_count)
+        VALUES (NEW.category_id, NEW.stock, 1)
+        ON DUPLICATE KEY UPDATE total_stock = total_stock + NEW.stock,
+                                product_count = product_count + 1;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_products_category_stock_au AFTER UPDATE ON products
+FOR EACH ROW
+BEGIN
+    IF OLD.category_id <=> NEW.category_id THEN
+        IF NEW.category_id IS NOT NULL AND OLD.stock <> NEW.stock THEN
+            INSERT INTO category_stock (category_id, total_stock, product_count)
+            VALUES (NEW.category_id, NEW.stock - OLD.stock, 1)
+            ON DUPLICATE KEY UPDATE total_stock = total_stock + (NEW.stock - OLD.stock);
+        END IF;
+    ELSE
+        IF OLD.category_id IS NOT NULL THEN
+            UPDATE category_stock
+               SET total_stock = total_stock - OLD.stock,
+                   product_count = product_count - 1
+             WHERE category_id = OLD.category_id;
+        END IF;
+        IF NEW.category_id IS NOT NULL THEN
+            INSERT INTO category_stock (category_id, total_stock, product_count)
+            VALUES (NEW.category_id, NEW.stock, 1)
+            ON DUPLICATE KEY UPDATE total_stock = total_stock + NEW.stock,
+                                    product_count = product_count + 1;
+        END IF;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_products_category_stock_ad AFTER DELETE ON products
+FOR EACH ROW
+BEGIN
+    IF OLD.category_id IS NOT NULL THEN
+        UPDATE category_stock
+           SET total_stock = total_stock - OLD.stock,
+               product_count = product_count - 1
+         WHERE category_id = OLD.category_id;
+    END IF;
+END$$
+
+DELIMITER ;
+
+-- ---------------------------------------------------------------------------
+-- Rollup diario de órdenes por (día, estado): cantidad de órdenes y unidades.
+-- Lo mantienen los triggers de orders; /reports/orders-history agrega desde acá
+-- (día/semana/mes) sin recorrer la tabla orders.
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS order_rollup_daily (
+    day DATE NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    orders INT NOT NULL DEFAULT 0,
+    quantity BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, status)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+DROP TRIGGER IF EXISTS trg_orders_rollup_ai;
+DROP TRIGGER IF EXISTS trg_orders_rollup_au;
+DROP TRIGGER IF EXISTS trg_orders_rollup_ad;
+
+DELIMITER $$
+
+CREATE TRIGGER trg_orders_rollup_ai AFTER INSERT ON orders
+FOR EACH ROW
+BEGIN
+    INSERT INTO order_rollup_daily (day, status, orders, quantity)
+    VALUES (DATE(NEW.order_date), NEW.status, 1, NEW.quantity)
+    ON DUPLICATE KEY UPDATE orders = orders + 1,
+                            quantity = quantity + NEW.quantity;
+END$$
+
+CREATE TRIGGER trg_orders_rollup_au AFTER UPDATE ON orders
+FOR EACH ROW
+BEGIN
+    IF DATE(OLD.order_date) <> DATE(NEW.order_date)
+       OR OLD.status <> NEW.status
+       OR OLD.quantity <> NEW.quantity THEN
+        UPDATE order_rollup_daily
+           SET orders = orders - 1,
+               quantity = quantity - OLD.quantity
+         WHERE day = DATE(OLD.order_date) AND status = OLD.status;
+        INSERT INTO order_rollup_daily (day, status, orders, quantity)
+        VALUES (DATE(NEW.order_date), NEW.status, 1, NEW.quantity)
+        ON DUPLICATE KEY UPDATE orders = orders + 1,
+                                quantity = quantity + NEW.quantity;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_orders_rollup_ad AFTER DELETE ON orders
+FOR EACH ROW
+BEGIN
+    UPDATE order_rollup_daily
+       SET orders = orders - 1,
+           quantity = quantity - OLD.quantity
+     WHERE day = DATE(OLD.order_date) AND status = OLD.status;
+END$$
+
+DELIMITER ;
@@ -22,6 +22,9 @@ INSERT INTO categories (name) VALUES
 
 -- Productos (sin supplier_id: queda NULL por defecto)
 DELETE FROM products;
+-- Con FOREIGN_KEY_CHECKS = 0 no corren los CASCADE: se vacía el resumen a mano
+-- y los triggers lo vuelven a llenar con los INSERT de abajo.
+DELETE FROM category_stock;
 INSERT INTO products (name, description, price, stock, category_id, user_id) VALUES
 ('Laptop', 'Portátil de alta gama', 800.00, 10, 1, 1),
 ('Silla', 'Silla ergonómica para oficina', 50.00, 25, 2, 2),
@@ -44,6 +47,7 @@ INSERT INTO product_suppliers (product_id, supplier_id) VALUES
 
 -- Órdenes de ejemplo
 DELETE FROM orders;
+DELETE FROM order_rollup_daily;
 INSERT INTO orders (product_id, quantity, status, user_id) VALUES
 (1, 2, 'pending', 2),
 (2, 1, 'completed', 1),
@@ -0,0 +1,247 @@
+# api/utils/assets.py
+"""
+Assets estáticos con hash de contenido y pre-comprimidos.
+
+    flask assets build [--clean]      # static/ -> ASSETS_DIR (default backend/static_dist)
+
+- Cada archivo de static/ se copia como <nombre>.<hash>.<ext> en el mismo directorio relativo
+  (los url(...) relativos de los CSS siguen apuntando a fuentes/imágenes originales) y, si es
+  texto y comprime bien, también .br y .gz al lado, con el nivel máximo: se paga una sola vez.
+- Los import/export ... from "..." de los módulos JS que apuntan a otro archivo de static/ se
+  reescriben a la URL con hash; si no, el navegador cargaría dos instancias del mismo módulo.
+- Templates: {{ static_url('js/common.js') }} -> /static/js/common.<hash>.js. Sin manifest, o
+  si el archivo cambió después del build, devuelve la URL de siempre.
+- /static/<archivo con hash> se sirve desde ASSETS_DIR con `Cache-Control: immutable` (un año)
+  y la variante .br/.gz que acepte el cliente. Lo demás sigue por el static de Flask.
+El build es incremental: los archivos con hash que ya existen no se reescriben, así los
+workers que siguen corriendo con el manifest anterior no pierden nada. --clean borra lo viejo.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+
+from flask import current_app, request, send_file, url_for
+
+from api.utils.compression import negotiate
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+MANIFEST = "manifest.json"
+HASH_LEN = 12
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+PRECOMPRESS = {".js", ".mjs", ".css", ".svg", ".json", ".map", ".txt", ".html", ".xml",
+               ".ttf", ".eot", ".otf", ".ico", ".scss", ".less", ".yml"}
+PRECOMPRESS_MIN_SIZE = 512
+# La variante se guarda sólo si ahorra al menos un 10 %
+PRECOMPRESS_MAX_RATIO = 0.9
+
+# from "x.js" (import/export ... from), import "x.js" e import("x.js")
+_IMPORT_RE = re.compile(r"""(\bfrom\s*|\bimport\s*\(?\s*)(["'])([^"'\n]+?\.m?js)\2""")
+
+_state = {"dir": None, "static_dir": None, "files": {}, "by_path": {}, "checked": {}}
+
+
+def assets_dir():
+    return os.getenv("ASSETS_DIR") or os.path.join(BACKEND_DIR, "static_dist")
+
+
+def _hashed_name(rel, digest):
+    head, name = posixpath.split(rel)
+    stem, dot, ext = name.rpartition(".")
+    hashed = f"{stem}.{digest}.{ext}" if dot and stem else f"{name}.{digest}"
+    return posixpath.join(head, hashed)
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _variants(data):
+    """(encoding, bytes) que vale la pena guardar."""
+    out = []
+    if brotli is not None:
+        out.append(("br", brotli.compress(data, quality=11)))
+    out.append(("gzip", gzip.compress(data, compresslevel=9, mtime=0)))
+    return [(enc, body) for enc, body in out if len(body) <= len(data) * PRECOMPRESS_MAX_RATIO]
+
+
+_SUFFIX = {"br": ".br", "gzip": ".gz"}
+
+
+def build(static_dir, out_dir=None, static_url_path="/static", clean=False, echo=print):
+    """Genera los archivos con hash, sus variantes comprimidas y el manifest. Devuelve un resumen."""
+    out_dir = out_dir or assets_dir()
+    sources = {}
+    for root, _dirs, names in os.walk(static_dir):
+        for name in names:
+            full = os.path.join(root, name)
+            sources[os.path.relpath(full, static_dir).replace(os.sep, "/")] = full
+
+    contents, hashed, resolving, source_sha = {}, {}, set(), {}
+
+    def content(rel):
+        if rel not in contents:
+            with open(sources[rel], "rb") as f:
+                data = f.read()
+            source_sha[rel] = hashlib.sha256(data).hexdigest()
+            if rel.endswith((".js", ".mjs")):
+                data = _rewrite_imports(rel, data)
+            contents[rel] = data
+        return contents[rel]
+
+    def _rewrite_imports(rel, data):
+        text = data.decode("utf-8", errors="surrogateescape")
+        resolving.add(rel)
+
+        def repl(m):
+            spec = m.group(3)
+            if spec.startswith(static_url_path + "/"):
+                target = spec[len(static_url_path) + 1:]
+            elif spec.startswith(("./", "../")):
+                target = posixpath.normpath(posixpath.join(posixpath.dirname(rel), spec))
+            else:
+                return m.group(0)
+            # Ciclos de imports: ese especificador queda como estaba
+            if target not in sources or target in resolving:
+                return m.group(0)
+            return f"{m.group(1)}{m.group(2)}{static_url_path}/{hashed_path(target)}{m.group(2)}"
+
+        try:
+            text = _IMPORT_RE.sub(repl, text)
+        finally:
+            resolving.discard(rel)
+        return text.encode("utf-8", errors="surrogateescape")
+
+    def hashed_path(rel):
+        if rel not in hashed:
+            digest = hashlib.sha256(content(rel)).hexdigest()[:HASH_LEN]
+            hashed[rel] = _hashed_name(rel, digest)
+        return hashed[rel]
+
+    files, written, raw_bytes, stored_bytes = {}, 0, 0, 0
+    for rel in sorted(sources):
+        path = hashed_path(rel)
+        data = content(rel)
+        dest = os.path.join(out_dir, *path.split("/"))
+        encodings = []
+        if os.path.exists(dest):
+            encodings = [enc for enc, suffix in _SUFFIX.items() if os.path.exists(dest + suffix)]
+        else:
+            _write(dest, data)
+            written += 1
+            if os.path.splitext(rel)[1].lower() in PRECOMPRESS and len(data) >= PRECOMPRESS_MIN_SIZE:
+                for enc, body in _variants(data):
+                    _write(dest + _SUFFIX[enc], body)
+                    encodings.append(enc)
+        raw_bytes += len(data)
+        stored_bytes += min([os.path.getsize(dest + _SUFFIX[e]) for e in encodings] or [len(data)])
+        files[rel] = {"path": path, "encodings": encodings, "source_sha256": source_sha[rel]}
+
+    manifest = {"static_url_path": static_url_path, "files": files}
+    _write(os.path.join(out_dir, MANIFEST), json.dumps(manifest, indent=1, sort_keys=True).encode("utf-8"))
+
+    removed = _clean(out_dir, files) if clean else 0
+    summary = {"files": len(files), "written": written, "removed": removed,
+               "bytes": raw_bytes, "smallest_bytes": stored_bytes, "dir": out_dir}
+    echo(f"{len(files)} assets ({written} nuevos, {removed} viejos borrados) en {out_dir}: "
+         f"{raw_bytes / 1e6:.1f} MB -> {stored_bytes / 1e6:.1f} MB con la mejor variante comprimida")
+    return summary
+
+
+def _clean(out_dir, files):
+    keep = {os.path.join(out_dir, MANIFEST)}
+    for entry in files.values():
+        dest = os.path.join(out_dir, *entry["path"].split("/"))
+        keep.add(dest)
+        keep.update(dest + _SUFFIX[e] for e in entry["encodings"])
+    removed = 0
+    for root, _dirs, names in os.walk(out_dir, topdown=False):
+        for name in names:
+            full = os.path.join(root, name)
+            if full not in keep:
+                os.remove(full)
+                removed += 1
+        if root != out_dir and not os.listdir(root):
+            os.rmdir(root)
+    return removed
+
+
+# ---------- En la app ----------
+
+def load_manifest(app, directory=None):
+    """Carga ASSETS_DIR/manifest.json si existe. Devuelve cuántos assets quedaron disponibles."""
+    directory = directory or assets_dir()
+    _state.update(dir=directory, static_dir=app.static_folder, files={}, by_path={}, checked={})
+    try:
+        with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+            files = json.load(f).get("files", {})
+    except (OSError, ValueError):
+        return 0
+    _state["files"] = files
+    _state["by_path"] = {entry["path"]: rel for rel, entry in files.items()}
+    return len(files)
+
+
+def _fresh_entry(filename):
+    """
+    Entrada del manifest si el archivo de static/ no cambió desde el build. El contenido se
+    compara por sha256 una vez por (mtime, tamaño); después alcanza con un stat.
+    """
+    entry = _state["files"].get(filename)
+    if entry is None:
+        return None
+    source = os.path.join(_state["static_dir"], *filename.split("/"))
+    try:
+        st = os.stat(source)
+    except OSError:
+        return None
+    key = (st.st_mtime_ns, st.st_size)
+    checked = _state["checked"].get(filename)
+    if checked is None or checked[0] != key:
+        with open(source, "rb") as f:
+            fresh = hashlib.sha256(f.read()).hexdigest() == entry.get("source_sha256")
+        checked = _state["checked"][filename] = (key, fresh)
+    return entry if checked[1] else None
+
+
+def static_url(filename, **kwargs):
+    """Como url_for('static', filename=...) pero con la versión con hash si está construida."""
+    entry = _fresh_entry(filename)
+    return url_for("static", filename=entry["path"] if entry else filename, **kwargs)
+
+
+def serve_static(filename):
+    rel = _state["by_path"].get(filename)
+    if rel is None:
+        return current_app.send_static_file(filename)
+    entry = _state["files"][rel]
+    path = os.path.join(_state["dir"], *filename.split("/"))
+    encoding = negotiate(request.headers.get("Accept-Encoding"), entry["encodings"])
+    mimetype = mimetypes.guess_type(rel)[0] or "application/octet-stream"
+    resp = send_file(path + _SUFFIX[encoding] if encoding else path, mimetype=mimetype, conditional=True)
+    if encoding:
+        resp.headers["Content-Encoding"] = encoding
+    if entry["encodings"]:
+        resp.vary.add("Accept-Encoding")
+    resp.headers["Cache-Control"] = IMMUTABLE
+    return resp
+
+
+def init_app(app):
+    app.add_template_global(static_url)
+    if app.static_folder and "static" in app.view_functions:
+        load_manifest(app)
+        app.view_functions["static"] = serve_static
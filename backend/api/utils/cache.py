@@ -0,0 +1,80 @@
+# api/utils/cache.py
+import logging
+import threading
+import time
+from api.utils import versions
+
+logger = logging.getLogger(__name__)
+
+class TTLCache:
+    """
+    Cache en memoria del proceso con vencimiento por tiempo.
+    Cuenta hits/misses para poder exponerlos (p. ej. en /dashboard/metrics).
+
+    Con `resources`, cada entrada queda atada a los tokens de versión (utils/versions.py) que
+    el llamador leyó con tokens() ANTES de consultar: una escritura durante la consulta deja
+    la entrada con tokens viejos y el próximo get() no la usa (en este proceso o en otro).
+    """
+
+    def __init__(self, ttl=10.0, resources=()):
+        self.ttl = float(ttl)
+        self.resources = tuple(resources)
+        self._data = {}                 # key -> (expires_at, tokens, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        for resource in self.resources:
+            on_invalidate(resource, self.clear)
+
+    def tokens(self):
+        return tuple(versions.current(r) for r in self.resources)
+
+    def get(self, key, tokens=None):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item and item[0] > now and (tokens is None or item[1] == tokens):
+                self.hits += 1
+                return item[2]
+            self.misses += 1
+            return None
+
+    def set(self, key, value, tokens=None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, tokens, value)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "ttl": self.ttl}
+
+
+# ---------- Invalidación por escritura ----------
+# Los endpoints que modifican datos llaman invalidate("products", ...) después del commit;
+# los caches se suscriben con on_invalidate(recurso, callback). Además se renueva el token
+# de versión del recurso (utils/versions.py), que invalida los ETag en todos los procesos.
+# El commit ya pasó: un error acá se registra pero nunca convierte la escritura en un 500.
+
+_listeners = {}
+_listeners_lock = threading.Lock()
+
+def on_invalidate(resource, callback):
+    with _listeners_lock:
+        _listeners.setdefault(resource, []).append(callback)
+
+def invalidate(*resources):
+    for resource in resources:
+        try:
+            versions.bump(resource)
+        except OSError:
+            logger.exception("No se pudo renovar el token de versión de %s", resource)
+    with _listeners_lock:
+        callbacks = [cb for r in resources for cb in _listeners.get(r, [])]
+    for cb in callbacks:
+        try:
+            cb()
+        except Exception:
+            logger.exception("Error en un listener de invalidación")
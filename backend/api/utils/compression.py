@@ -0,0 +1,279 @@
+# api/utils/compression.py
+"""
+Compresión negociada (zstd / br / gzip) de respuestas JSON, CSV y HTML.
+
+- Se elige según Accept-Encoding y el orden de COMPRESS_ALGORITHMS (default "zstd,br,gzip");
+  br y zstd sólo si están instalados `brotli` / `zstandard` (gzip siempre).
+- Respuestas armadas: se comprimen si pesan al menos COMPRESS_MIN_SIZE bytes (default 1024).
+- Respuestas en streaming (listados sin paginar): chunk por chunk, con un flush por chunk para
+  que el cliente siga recibiendo a medida que se lee el cursor. Los exports CSV del cache
+  (utils/export_cache.py) negocian con choose() y guardan sus variantes comprimidas en disco.
+- Respuestas con ETag: el cuerpo comprimido queda en un LRU por (ETag, encoding) de hasta
+  COMPRESS_CACHE_MB (default 32) por proceso. El ETag ya incluye los tokens de versión de los
+  recursos, así que una escritura deja las entradas viejas sin uso (y el LRU las descarta).
+COMPRESS_ENABLED=false lo desactiva.
+"""
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE = {"application/json", "text/csv", "text/html", "text/plain"}
+
+# Niveles pensados para contenido dinámico: buena relación sin gastar mucha CPU por request
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+
+_settings = {"enabled": False, "min_size": 1024, "algorithms": ("gzip",)}
+
+
+def available():
+    algos = []
+    if zstandard is not None:
+        algos.append("zstd")
+    if brotli is not None:
+        algos.append("br")
+    algos.append("gzip")
+    return algos
+
+
+def configure(enabled=True, min_size=1024, algorithms=None, cache_mb=32):
+    usable = set(available())
+    wanted = algorithms or ("zstd", "br", "gzip")
+    _settings.update(
+        enabled=enabled,
+        min_size=int(min_size),
+        algorithms=tuple(a for a in wanted if a in usable),
+    )
+    _cache.resize(int(float(cache_mb) * 1024 * 1024))
+
+
+def negotiate(accept_encoding, algorithms=None):
+    """Primer algoritmo (del servidor, en su orden) que el cliente acepta con q > 0, o None."""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    for algo in _settings["algorithms"] if algorithms is None else algorithms:
+        if accepted.get(algo, accepted.get("*", 0.0)) > 0:
+            return algo
+    return None
+
+
+def compress(data, encoding):
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    z = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    return z.compress(data) + z.flush()
+
+
+class _StreamCompressor:
+    """process(chunk) devuelve lo comprimido hasta ahí (flush incluido); finish() cierra el stream."""
+
+    def __init__(self, encoding):
+        if encoding == "zstd":
+            obj = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+            self._process = lambda data: obj.compress(data) + obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+            self.finish = obj.flush
+        elif encoding == "br":
+            obj = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._process = lambda data: obj.process(data) + obj.flush()
+            self.finish = obj.finish
+        else:
+            obj = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+            self._process = lambda data: obj.compress(data) + obj.flush(zlib.Z_SYNC_FLUSH)
+            self.finish = obj.flush
+
+    def process(self, data):
+        return self._process(data) if data else b""
+
+
+def stream_compressor(encoding):
+    """Compresor incremental (process/finish) para quien guarda o envía su propio stream."""
+    return _StreamCompressor(encoding)
+
+
+def base_mimetype(mimetype):
+    return (mimetype or "").split(";")[0].strip().lower()
+
+
+def compressible(mimetype):
+    return base_mimetype(mimetype) in COMPRESSIBLE
+
+
+class _BodyCache:
+    """LRU de cuerpos comprimidos acotado por bytes (thread-safe)."""
+
+    def __init__(self, max_bytes=0):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def item_max(self):
+        # Un solo cuerpo no puede ocupar más de un cuarto del cache
+        return self.max_bytes // 4
+
+    def resize(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def get(self, key):
+        with self._lock:
+            body = self._data.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.item_max:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._data[key] = body
+            self.size += len(body)
+            self._evict()
+
+    def _evict(self):
+        while self._data and self.size > self.max_bytes:
+            _, body = self._data.popitem(last=False)
+            self.size -= len(body)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._data), "bytes": self.size, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses}
+
+
+_cache = _BodyCache()
+
+
+def compress_cached(data, encoding, etag=None):
+    """compress() con el LRU si la respuesta tiene ETag."""
+    if etag is None:
+        return compress(data, encoding)
+    key = (etag, encoding)
+    body = _cache.get(key)
+    if body is None:
+        body = compress(data, encoding)
+        _cache.put(key, body)
+    return body
+
+
+def choose(accept_encoding, mimetype, size=None):
+    """Encoding a usar para una respuesta (None = sin comprimir). size=None: streaming."""
+    if not _settings["enabled"] or mimetype not in COMPRESSIBLE:
+        return None
+    if size is not None and size < _settings["min_size"]:
+        return None
+    return negotiate(accept_encoding)
+
+
+def _iter_compressed(chunks, encoding, key=None):
+    comp = _StreamCompressor(encoding)
+    parts, size = ([] if key else None), 0
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            out = comp.process(chunk)
+            if out:
+                if parts is not None:
+                    parts.append(out)
+                    size += len(out)
+                    if size > _cache.item_max:
+                        parts = None
+                yield out
+        out = comp.finish()
+        if parts is not None:
+            parts.append(out)
+            _cache.put(key, b"".join(parts))
+        yield out
+    finally:
+        # Cierra el generador original (cursor y contexto del request de stream_with_context)
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def _compress_response(resp):
+    if (resp.status_code != 200 or resp.direct_passthrough
+            or "Content-Encoding" in resp.headers or "Content-Range" in resp.headers
+            or "no-transform" in (resp.headers.get("Cache-Control") or "")):
+        return resp
+    if resp.mimetype not in COMPRESSIBLE:
+        return resp
+    streamed = resp.is_streamed
+    encoding = choose(request.headers.get("Accept-Encoding"), resp.mimetype,
+                      None if streamed else resp.calculate_content_length())
+    resp.vary.add("Accept-Encoding")
+    if encoding is None:
+        return resp
+
+    etag, _ = resp.get_etag()
+    if streamed:
+        key = (etag, encoding) if etag else None
+        cached = _cache.get(key) if key else None
+        if cached is not None:
+            # Mismo ETag ya comprimido: no hace falta serializar/comprimir de nuevo
+            close = getattr(resp.response, "close", None)
+            if close is not None:
+                close()
+            resp.set_data(cached)
+        else:
+            resp.response = _iter_compressed(resp.response, encoding, key)
+            resp.headers.pop("Content-Length", None)
+    else:
+        resp.set_data(compress_cached(resp.get_data(), encoding, etag))
+    resp.headers["Content-Encoding"] = encoding
+    return resp
+
+
+def init_app(app):
+    if os.getenv("COMPRESS_ENABLED", "1").strip().lower() in ("0", "false", "no", "off"):
+        return
+    algorithms = [a.strip().lower() for a in os.getenv("COMPRESS_ALGORITHMS", "zstd,br,gzip").split(",") if a.strip()]
+    configure(
+        min_size=int(os.getenv("COMPRESS_MIN_SIZE", 1024)),
+        algorithms=algorithms,
+        cache_mb=float(os.getenv("COMPRESS_CACHE_MB", 32)),
+    )
+    app.after_request(_compress_response)
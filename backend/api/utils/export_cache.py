@@ -0,0 +1,312 @@
+# api/utils/export_cache.py
+"""
+Cache en disco de las exportaciones (CSV y PDF) servidas por los endpoints /export/*.
+
+- Clave: tipo de export + parámetros + tokens de versión de los recursos que lee (y el día,
+  como el ETag de utils/versions.py). Una escritura renueva el token (invalidate) y la próxima
+  descarga genera un archivo nuevo; al escribirlo se borran las versiones viejas del mismo
+  export + parámetros.
+- Miss: los chunks del export (CSV por lote, PDF por página) se envían al cliente a medida
+  que se generan y a la vez se escriben en el cache; el archivo se publica recién cuando
+  terminó entero (si el cliente corta, se descarta).
+- Hit: los archivos viven en EXPORT_CACHE_DIR (compartido por todos los workers) y se sirven
+  con send_file: Range/If-Range (descargas reanudables), ETag/304 y, bajo gunicorn,
+  sendfile() del sistema. Con EXPORT_CACHE_ACCEL_PREFIX se responde sólo con
+  X-Accel-Redirect y nginx envía el archivo (también con Range; la compresión, de nginx).
+- Compresión (CSV): junto a cada archivo se guarda una variante por encoding negociado
+  (<nombre>.gzip, .br, .zstd; la del miss sale del mismo stream que recibe el cliente, las
+  demás se generan con el primer hit que las pide) y se sirve con su propio ETag y Range.
+- LRU acotado a EXPORT_CACHE_MB (default 256): cada hit actualiza el mtime y, al agregar un
+  archivo, se borran los de mtime más viejo hasta entrar en el límite.
+- Un archivo ya publicado no cambia nunca (el primero que termina de generarlo gana), así un
+  Range sobre el mismo ETag siempre lee los mismos bytes. EXPORT_CACHE_MB=0 lo desactiva: cada
+  descarga se genera y se envía en streaming, sin tocar el disco.
+- Con réplicas, un archivo se genera leyendo de una réplica que ya vio el último bump de sus
+  recursos (db_config.read_after): la clave nueva nunca guarda datos de antes de la escritura.
+"""
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import date
+
+from flask import Response, request, send_file, stream_with_context
+
+from api.db.db_config import read_after
+from api.utils import compression, versions
+
+CACHE_CONTROL = "private, no-cache"
+FILE_CHUNK = 256 * 1024
+
+
+def cache_dir():
+    path = os.getenv("EXPORT_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "inventario_export_cache")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def max_bytes():
+    return int(float(os.getenv("EXPORT_CACHE_MB", 256)) * 1024 * 1024)
+
+
+def _digest(text, size):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:size]
+
+
+def entry_name(kind, resources, params, filename):
+    """<kind>-<hash de parámetros>-<hash de versiones><ext>."""
+    params_key = _digest(json.dumps(params or {}, sort_keys=True, default=str), 12)
+    tokens = [f"{r}={versions.current(r)}" for r in resources]
+    tokens.append(date.today().isoformat())
+    ext = os.path.splitext(filename)[1]
+    return f"{kind}-{params_key}-{_digest('|'.join(tokens), 16)}{ext}"
+
+
+def _tmp_path(path):
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _publish(tmp, path):
+    """Publica `tmp` como `path` sin pisar uno que otro proceso ya publicó."""
+    try:
+        os.link(tmp, path)
+    except FileExistsError:
+        pass
+    except OSError:
+        # Sistemas de archivos sin hard links
+        if not os.path.exists(path):
+            os.replace(tmp, path)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _compress_file(path, encoded_path, encoding):
+    """Variante comprimida de un archivo ya publicado (la primera vez que se pide ese encoding)."""
+    tmp = _tmp_path(encoded_path)
+    try:
+        comp = compression.stream_compressor(encoding)
+        with open(path, "rb") as src, open(tmp, "wb") as dest:
+            while True:
+                chunk = src.read(FILE_CHUNK)
+                if not chunk:
+                    break
+                dest.write(comp.process(chunk))
+            dest.write(comp.finish())
+        _publish(tmp, encoded_path)
+    finally:
+        _remove(tmp)
+
+
+def _drop_old_versions(directory, name):
+    prefix = name.rsplit("-", 1)[0] + "-"
+    for other in os.listdir(directory):
+        # Quedan el archivo nuevo y sus variantes comprimidas (<nombre>.<encoding>)
+        if other.startswith(prefix) and not other.startswith(name) and not other.endswith(".tmp"):
+            _remove(os.path.join(directory, other))
+
+
+def evict(directory=None, limit=None, keep=None):
+    """
+    Borra los archivos menos usados hasta que el total entre en `limit` (nunca `keep` ni sus
+    variantes). Devuelve cuántos borró.
+    """
+    directory = directory or cache_dir()
+    limit = max_bytes() if limit is None else limit
+    entries, total = [], 0
+    for name in os.listdir(directory):
+        if name.endswith(".tmp"):
+            continue
+        try:
+            st = os.stat(os.path.join(directory, name))
+        except OSError:
+            continue
+        entries.append((st.st_mtime, name, st.st_size))
+        total += st.st_size
+    removed = 0
+    for _mtime, name, size in sorted(entries):
+        if total <= limit:
+            break
+        if keep and name.startswith(keep):
+            continue
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            # En Windows no se puede borrar un archivo que se está enviando
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def stats(directory=None):
+    directory = directory or cache_dir()
+    files = [n for n in os.listdir(directory) if not n.endswith(".tmp")]
+    size = 0
+    for name in files:
+        try:
+            size += os.path.getsize(os.path.join(directory, name))
+        except OSError:
+            pass
+    return {"dir": directory, "files": len(files), "bytes": size, "max_bytes": max_bytes()}
+
+
+def clear(directory=None):
+    directory = directory or cache_dir()
+    removed = 0
+    for name in os.listdir(directory):
+        try:
+            os.remove(os.path.join(directory, name))
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def _disposition(filename, inline):
+    return f'{"inline" if inline else "attachment"}; filename="{filename}"'
+
+
+def _send(path, name, filename, mimetype, inline, status, encoding=None):
+    st = os.stat(path)
+    # El inode distingue un archivo regenerado después de un evict (mismo nombre, otros bytes)
+    etag = f"{name}-{st.st_ino:x}"
+    accel = os.getenv("EXPORT_CACHE_ACCEL_PREFIX")
+    if accel:
+        resp = Response(status=200, mimetype=mimetype)
+        resp.headers["X-Accel-Redirect"] = f"{accel.rstrip('/')}/{name}"
+        resp.headers["Content-Disposition"] = _disposition(filename, inline)
+        resp.set_etag(etag)
+    else:
+        resp = send_file(path, mimetype=mimetype, as_attachment=not inline, download_name=filename,
+                         conditional=True, etag=etag)
+        resp.headers["Accept-Ranges"] = "bytes"
+    if encoding:
+        resp.headers["Content-Encoding"] = encoding
+    if compression.compressible(mimetype):
+        resp.vary.add("Accept-Encoding")
+    resp.headers["Cache-Control"] = CACHE_CONTROL
+    resp.headers["X-Export-Cache"] = status
+    return resp
+
+
+def _start(chunks):
+    """
+    Arranca el export (conexión, consulta y primer chunk) antes de responder: si MySQL falla,
+    el endpoint todavía puede devolver su error. Devuelve un generador de bytes.
+    """
+    it = iter(chunks())
+    try:
+        first = next(it)
+    except StopIteration:
+        first = b""
+
+    def body():
+        try:
+            yield first.encode("utf-8") if isinstance(first, str) else first
+            for chunk in it:
+                if chunk:
+                    yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+        finally:
+            # Cierra el cursor aunque el cliente corte la descarga
+            close = getattr(it, "close", None)
+            if close is not None:
+                close()
+    return body()
+
+
+def _stream_uncached(body, filename, mimetype, inline):
+    # Sin Content-Encoding propio: la comprime utils/compression.py, chunk por chunk
+    resp = Response(stream_with_context(body), mimetype=mimetype)
+    resp.headers["Content-Disposition"] = _disposition(filename, inline)
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+
+def _stream_miss(directory, path, name, body, filename, mimetype, inline, encoding):
+    """Envía los chunks mientras los escribe en el cache (y en la variante de `encoding`)."""
+    encoded_path = f"{path}.{encoding}" if encoding else None
+
+    def generate():
+        tmp = _tmp_path(path)
+        encoded_tmp = _tmp_path(encoded_path) if encoding else None
+        comp = compression.stream_compressor(encoding) if encoding else None
+        complete = False
+        try:
+            with open(tmp, "wb") as dest, \
+                    (open(encoded_tmp, "wb") if encoding else contextlib.nullcontext()) as encoded:
+                for chunk in body:
+                    dest.write(chunk)
+                    if comp is None:
+                        yield chunk
+                        continue
+                    out = comp.process(chunk)
+                    if out:
+                        encoded.write(out)
+                        yield out
+                if comp is not None:
+                    out = comp.finish()
+                    encoded.write(out)
+                    yield out
+            complete = True
+        finally:
+            body.close()
+            if complete:
+                _publish(tmp, path)
+                if encoding:
+                    _publish(encoded_tmp, encoded_path)
+                _drop_old_versions(directory, name)
+                evict(directory, keep=name)
+            _remove(tmp)
+            if encoding:
+                _remove(encoded_tmp)
+
+    resp = Response(stream_with_context(generate()), mimetype=mimetype)
+    resp.headers["Content-Disposition"] = _disposition(filename, inline)
+    if encoding:
+        resp.headers["Content-Encoding"] = encoding
+    if compression.compressible(mimetype):
+        resp.vary.add("Accept-Encoding")
+    resp.headers["Cache-Control"] = CACHE_CONTROL
+    resp.headers["X-Export-Cache"] = "MISS"
+    return resp
+
+
+def send_export(kind, resources, chunks, filename, mimetype, params=None, inline=False):
+    """
+    Respuesta de descarga de un export. chunks() devuelve los chunks (str o bytes) del archivo
+    y sólo se llama si no hay uno generado para la misma versión de `resources` y los mismos
+    `params`.
+    """
+    if max_bytes() <= 0:
+        read_after(versions.bumped_at(*resources))
+        return _stream_uncached(_start(chunks), filename, mimetype, inline)
+    directory = cache_dir()
+    name = entry_name(kind, resources, params, filename)
+    path = os.path.join(directory, name)
+    accept = None if os.getenv("EXPORT_CACHE_ACCEL_PREFIX") else request.headers.get("Accept-Encoding")
+    try:
+        encoding = compression.choose(accept, compression.base_mimetype(mimetype),
+                                      os.path.getsize(path))
+        if encoding:
+            encoded_path = f"{path}.{encoding}"
+            if not os.path.exists(encoded_path):
+                _compress_file(path, encoded_path, encoding)
+            os.utime(encoded_path)
+            os.utime(path)
+            return _send(encoded_path, f"{name}.{encoding}", filename, mimetype, inline, "HIT", encoding)
+        os.utime(path)
+        return _send(path, name, filename, mimetype, inline, "HIT")
+    except FileNotFoundError:
+        # No está generado (o otro proceso lo desalojó recién): se genera mientras se envía
+        pass
+    # Después de leer los tokens: el bump de un token nunca es posterior a su mtime
+    read_after(versions.bumped_at(*resources))
+    encoding = compression.choose(accept, compression.base_mimetype(mimetype))
+    return _stream_miss(directory, path, name, _start(chunks), filename, mimetype, inline, encoding)
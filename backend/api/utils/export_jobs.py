@@ -0,0 +1,236 @@
+# api/utils/export_jobs.py
+"""
+Jobs de exportación asíncronos (PDF).
+
+- Cada job se guarda en disco (EXPORTS_DIR/<id>.json + el archivo generado), así
+  cualquier proceso worker puede responder el estado o servir la descarga.
+- El render corre en un ProcessPoolExecutor acotado (EXPORT_WORKERS procesos):
+  no compite por el GIL con los requests interactivos.
+- Los archivos terminados se borran pasado EXPORT_TTL segundos.
+- Con réplicas (DB_REPLICAS) el render lee de una réplica que ya aplicó las escrituras de la
+  sesión que pidió el export (read-your-writes, api/db/db_config.py), o del primario.
+- EXPORT_WARMUP=true: cada proceso del pool importa los módulos de render al arrancar y
+  warm_up() levanta el pool apenas arranca el worker web (no con el primer job).
+"""
+import importlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# kind -> función render(dest, params, progress) + metadatos de descarga
+EXPORT_KINDS = {
+    "products_pdf": {
+        "target": "api.routes.products:render_products_pdf",
+        "filename": "productos.pdf", "mimetype": "application/pdf", "admin": True,
+    },
+    "categories_pdf": {
+        "target": "api.routes.categories:render_categories_pdf",
+        "filename": "categorias.pdf", "mimetype": "application/pdf", "admin": True,
+    },
+    "suppliers_pdf": {
+        "target": "api.routes.suppliers:render_suppliers_pdf",
+        "filename": "proveedores.pdf", "mimetype": "application/pdf", "admin": True,
+    },
+    "stock_by_category_pdf": {
+        "target": "api.routes.reports:render_stock_by_category_pdf",
+        "filename": "stock_por_categoria.pdf", "mimetype": "application/pdf", "admin": False,
+    },
+    "orders_history_pdf": {
+        "target": "api.routes.reports:render_orders_history_pdf",
+        "filename": "ordenes_por_mes.pdf", "mimetype": "application/pdf", "admin": False,
+    },
+}
+
+JOB_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+ACTIVE_STATUS = ("queued", "running")
+
+def exports_dir():
+    path = os.getenv("EXPORTS_DIR") or os.path.join(tempfile.gettempdir(), "inventario_exports")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def export_ttl():
+    return int(os.getenv("EXPORT_TTL", 3600))
+
+def export_workers():
+    return int(os.getenv("EXPORT_WORKERS", 2))
+
+def max_queued():
+    return int(os.getenv("EXPORT_MAX_QUEUE", 20))
+
+# ---------- Metadatos en disco ----------
+
+def _meta_path(job_id, base=None):
+    return os.path.join(base or exports_dir(), f"{job_id}.json")
+
+def file_path(job_id, base=None):
+    return os.path.join(base or exports_dir(), f"{job_id}.out")
+
+def _write_meta(meta, base=None):
+    path = _meta_path(meta["id"], base)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, path)  # atómico: nunca se lee un JSON a medio escribir
+
+def read_job(job_id, base=None):
+    if not JOB_ID_RE.match(job_id or ""):
+        return None
+    try:
+        with open(_meta_path(job_id, base), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _update_meta(job_id, base, **fields):
+    meta = read_job(job_id, base) or {"id": job_id}
+    meta.update(fields)
+    _write_meta(meta, base)
+    return meta
+
+def _iter_jobs(base=None):
+    base = base or exports_dir()
+    for name in os.listdir(base):
+        if name.endswith(".json"):
+            meta = read_job(name[:-5], base)
+            if meta:
+                yield meta
+
+def cleanup_expired(now=None):
+    """Borra jobs terminados hace más de EXPORT_TTL segundos (metadatos + archivo)."""
+    now = now or time.time()
+    ttl = export_ttl()
+    removed = 0
+    for meta in _iter_jobs():
+        finished = meta.get("finished_at")
+        if finished and now - finished > ttl:
+            for path in (file_path(meta["id"]), _meta_path(meta["id"])):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            removed += 1
+    return removed
+
+# ---------- Ejecución (proceso hijo) ----------
+
+def _resolve(target):
+    module, func = target.split(":")
+    return getattr(importlib.import_module(module), func)
+
+def warmup_enabled():
+    return os.getenv("EXPORT_WARMUP", "0").strip().lower() in ("1", "true", "yes", "on")
+
+def _worker_init():
+    # Prioridad más baja que los workers web (no disponible en Windows)
+    if hasattr(os, "nice"):
+        try:
+            os.nice(5)
+        except OSError:
+            pass
+    if warmup_enabled():
+        for spec in EXPORT_KINDS.values():
+            _resolve(spec["target"])
+
+def _ping():
+    return os.getpid()
+
+def _run_job(job_id, target, params, base, since=None):
+    """Corre en el proceso hijo: renderiza a un .tmp y lo publica con os.replace."""
+    from api.db.db_config import replica_reads
+    _update_meta(job_id, base, status="running", progress=5, message="Consultando datos", started_at=time.time())
+
+    def progress(pct, message=""):
+        _update_meta(job_id, base, progress=int(pct), message=message)
+
+    tmp = f"{file_path(job_id, base)}.tmp"
+    try:
+        render = _resolve(target)
+        with open(tmp, "wb") as dest, replica_reads(since):
+            render(dest, params, progress)
+        os.replace(tmp, file_path(job_id, base))
+        _update_meta(job_id, base, status="done", progress=100, message="Listo",
+                     size=os.path.getsize(file_path(job_id, base)), finished_at=time.time())
+    except Exception as e:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        _update_meta(job_id, base, status="error", message=str(e), finished_at=time.time())
+
+# ---------- Pool de procesos (proceso web) ----------
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+    """ProcessPoolExecutor acotado, uno por proceso web (spawn: no hereda hilos/sockets)."""
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = ProcessPoolExecutor(
+                    max_workers=export_workers(),
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_worker_init,
+                )
+                _executor_pid = pid
+    return _executor
+
+def warm_up(wait=False):
+    """
+    Levanta los EXPORT_WORKERS procesos del pool sin esperar al primer job (con spawn cada
+    uno arranca un intérprete nuevo). wait=True bloquea hasta que todos respondan.
+    """
+    executor = get_executor()
+    futures = [executor.submit(_ping) for _ in range(export_workers())]
+    if wait:
+        return sorted({f.result() for f in futures})
+    return futures
+
+def pending_jobs():
+    """Jobs en cola o corriendo (los que quedaron colgados más de EXPORT_TTL no cuentan)."""
+    limit = time.time() - export_ttl()
+    return sum(1 for m in _iter_jobs()
+               if m.get("status") in ACTIVE_STATUS and m.get("created_at", 0) > limit)
+
+def submit(kind, params=None, user_id=None, since=None):
+    """
+    Registra el job (status=queued) y lo encola en el pool. Devuelve los metadatos.
+    since: time.time() de la última escritura de la sesión (db_config.read_since()).
+    """
+    base = exports_dir()
+    spec = EXPORT_KINDS[kind]
+    meta = {
+        "id": uuid.uuid4().hex,
+        "kind": kind,
+        "params": params or {},
+        "status": "queued",
+        "progress": 0,
+        "message": "En cola",
+        "filename": spec["filename"],
+        "mimetype": spec["mimetype"],
+        "user_id": user_id,
+        "created_at": time.time(),
+        "finished_at": None,
+    }
+    _write_meta(meta, base)
+    get_executor().submit(_run_job, meta["id"], spec["target"], meta["params"], base, since)
+    return meta
+
+def public_view(meta):
+    """Lo que se expone por la API (sin rutas internas)."""
+    keys = ("id", "kind", "params", "status", "progress", "message", "filename",
+            "size", "created_at", "started_at", "finished_at")
+    out = {k: meta.get(k) for k in keys if k in meta}
+    if meta.get("finished_at"):
+        out["expires_at"] = meta["finished_at"] + export_ttl()
+    return out
@@ -0,0 +1,462 @@
+# api/utils/metrics.py
+"""
+Métricas de requests en formato de texto de Prometheus (GET /metrics).
+
+- Por endpoint y método: histograma de latencia, de consultas por request y de tiempo
+  en MySQL por request; contador de respuestas por status; requests en curso.
+- Las consultas se cuentan con un observador de cursores (api.db.db_config); el request
+  se cierra en teardown_request, así las respuestas en streaming miden hasta el final.
+- El camino ASGI (api/aio) registra sus requests con request_started/request_finished, con
+  el mismo nombre de endpoint que la vista Flask equivalente.
+- Varios procesos worker: cada uno vuelca su estado cada METRICS_FLUSH_SECONDS a
+  METRICS_DIR/<pid>-<id>.json (un hilo daemon, fuera del camino del request) y /metrics
+  suma todos los archivos. Los procesos que murieron siguen sumando en contadores e
+  histogramas (no pueden bajar): sus archivos se pliegan en uno solo (finished.json) al
+  juntar (collect) o cuando gunicorn ve salir al worker (child_exit), así la cantidad de
+  archivos queda acotada a los procesos vivos + 1. "En curso" sólo cuenta archivos recientes.
+- METRICS_ENABLED=0 lo apaga; METRICS_TOKEN (opcional) exige `Authorization: Bearer <token>`.
+- Al reiniciar el servicio se puede vaciar el directorio con `flask metrics clear`.
+"""
+import contextlib
+import contextvars
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from flask import Response, request
+
+from api.db.db_config import add_query_observer, remove_query_observer
+
+PREFIX = "inventario"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+DB_TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+AGGREGATE = "finished.json"      # suma de los procesos que ya terminaron
+LOCK_STALE_SECONDS = 30          # un lock más viejo que esto es de un proceso que murió
+
+HISTOGRAMS = {
+    "http_request_duration_seconds": ("Latencia de los requests", LATENCY_BUCKETS),
+    "http_request_db_queries": ("Consultas a MySQL por request", QUERY_BUCKETS),
+    "http_request_db_seconds": ("Tiempo en MySQL por request", DB_TIME_BUCKETS),
+}
+
+
+def metrics_dir():
+    path = os.getenv("METRICS_DIR") or os.path.join(tempfile.gettempdir(), "inventario_metrics")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _flush_seconds():
+    return float(os.getenv("METRICS_FLUSH_SECONDS", 2))
+
+
+class _Registry:
+    """Estado de este proceso. Un solo lock; las actualizaciones son sumas sobre listas."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = None
+        self.path = None
+        self.reset()
+
+    def reset(self):
+        self.histograms = {name: {} for name in HISTOGRAMS}   # name -> {(endpoint, method): [buckets..., sum, count]}
+        self.responses = {}                                   # (endpoint, method, status) -> n
+        self.in_flight = 0
+
+    def observe(self, name, labels, value):
+        buckets = HISTOGRAMS[name][1]
+        series = self.histograms[name].get(labels)
+        if series is None:
+            series = self.histograms[name][labels] = [0] * (len(buckets) + 2)
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        series[-2] += value
+        series[-1] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "histograms": {name: [[*labels, *series] for labels, series in data.items()]
+                               for name, data in self.histograms.items()},
+                "responses": [[*labels, n] for labels, n in self.responses.items()],
+                "in_flight": self.in_flight,
+            }
+
+
+_registry = _Registry()
+_enabled = False
+
+
+def _ensure_process():
+    """Después de un fork (gunicorn) el worker arranca su propio estado y su hilo de volcado."""
+    pid = os.getpid()
+    if _registry.pid == pid:
+        return
+    with _registry.lock:
+        if _registry.pid == pid:
+            return
+        _registry.reset()
+        _registry.pid = pid
+        _registry.path = os.path.join(metrics_dir(), f"{pid}-{uuid.uuid4().hex[:8]}.json")
+    threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True).start()
+
+
+def flush():
+    """Vuelca el estado de este proceso a su archivo (escritura atómica)."""
+    if not _registry.path:
+        return
+    data = _registry.snapshot()
+    tmp = f"{_registry.path}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, _registry.path)
+
+
+def _flush_loop():
+    interval = _flush_seconds()
+    pid = os.getpid()
+    try:
+        # Un worker nuevo (p. ej. por max_requests) pliega los archivos de los que terminaron
+        read_process_files(metrics_dir(), _registry.path, _merge_snapshots)
+    except OSError:
+        pass
+    while _registry.pid == pid:
+        time.sleep(interval)
+        try:
+            flush()
+        except OSError:
+            pass
+
+
+# ---------- Hooks ----------
+# El estado del request va en un threading.local y no en flask.g: el observador corre en
+# cada consulta y los proxies de Flask cuestan más que la propia métrica. En el camino
+# ASGI todos los requests comparten el hilo del event loop: ahí va en un contextvar.
+
+_local = threading.local()
+_aio_stats = contextvars.ContextVar("metrics_aio_stats", default=None)
+
+
+def _on_query(statement, params, elapsed, error):
+    stats = getattr(_local, "stats", None)
+    if stats is None:
+        stats = _aio_stats.get()
+    if stats is not None:
+        stats[1] += 1
+        stats[2] += elapsed
+
+
+def _before_request():
+    if not _enabled:
+        return
+    _ensure_process()
+    req = request._get_current_object()
+    # inicio, consultas, segundos en DB, status, (endpoint, método)
+    _local.stats = [time.perf_counter(), 0, 0.0, None, (req.endpoint or "unmatched", req.method)]
+    with _registry.lock:
+        _registry.in_flight += 1
+
+
+def _after_request(response):
+    stats = getattr(_local, "stats", None)
+    if stats is not None:
+        stats[3] = response.status_code
+    return response
+
+
+def _teardown_request(exc):
+    stats = getattr(_local, "stats", None)
+    if stats is None:
+        return
+    _local.stats = None
+    _finish(stats)
+
+
+def request_started(endpoint, method):
+    """Abre un request del camino ASGI (api/aio); None si las métricas están apagadas."""
+    if not _enabled:
+        return None
+    _ensure_process()
+    stats = [time.perf_counter(), 0, 0.0, None, (endpoint, method)]
+    _aio_stats.set(stats)
+    with _registry.lock:
+        _registry.in_flight += 1
+    return stats
+
+
+def request_finished(stats, status):
+    """Cierra un request de request_started (al terminar de enviar, si es streaming)."""
+    if stats is None or stats[3] is not None:
+        return
+    stats[3] = status
+    _finish(stats)
+
+
+def _finish(stats):
+    elapsed = time.perf_counter() - stats[0]
+    status = stats[3] if stats[3] is not None else 500
+    labels = stats[4]
+    with _registry.lock:
+        _registry.in_flight -= 1
+        _registry.observe("http_request_duration_seconds", labels, elapsed)
+        _registry.observe("http_request_db_queries", labels, stats[1])
+        _registry.observe("http_request_db_seconds", labels, stats[2])
+        key = (*labels, str(status))
+        _registry.responses[key] = _registry.responses.get(key, 0) + 1
+
+
+def set_enabled(flag):
+    """Prende/apaga la recolección en este proceso (lo usa el benchmark de overhead)."""
+    global _enabled
+    _enabled = bool(flag)
+    if _enabled:
+        add_query_observer(_on_query)
+    else:
+        remove_query_observer(_on_query)
+
+
+# ---------- Exposición ----------
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _fmt(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# ---------- Archivos de los procesos ----------
+
+def _pid_alive(pid):
+    if os.name == "nt":
+        # os.kill(pid, 0) no pregunta por el proceso en Windows: ahí no se pliega nada
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+@contextlib.contextmanager
+def _dir_lock(directory, timeout=5.0):
+    """Lock entre procesos sobre `directory` (mkdir es atómico). Da False si no se consiguió."""
+    lock = os.path.join(directory, ".lock")
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            os.mkdir(lock)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock) > LOCK_STALE_SECONDS:
+                    os.rmdir(lock)
+                    continue
+            except OSError:
+                continue
+            if time.monotonic() >= deadline:
+                yield False
+                return
+            time.sleep(0.01)
+    try:
+        yield True
+    finally:
+        try:
+            os.rmdir(lock)
+        except OSError:
+            pass
+
+
+def _load_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(path, data):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def read_process_files(directory, own_path, merge, finished_pids=()):
+    """
+    Estado volcado por todos los procesos en `directory`: lista de (path, data, mtime).
+
+    Antes, con el lock del directorio, los archivos de procesos que terminaron (pid en
+    `finished_pids`, o sin volcar hace 3 intervalos y con el pid muerto) se suman con
+    merge(acumulado | None, data) en AGGREGATE y se borran. AGGREGATE anota qué archivos ya
+    sumó: si el proceso se corta antes de borrarlos no se cuentan dos veces.
+    """
+    finished_pids = {int(p) for p in finished_pids}
+    aggregate_path = os.path.join(directory, AGGREGATE)
+    with _dir_lock(directory) as locked:
+        try:
+            aggregate = _load_json(aggregate_path)
+        except (OSError, ValueError):
+            aggregate = {"data": None, "folded": []}
+        folded = set(aggregate.get("folded", []))
+        stale_before = time.time() - 3 * _flush_seconds()
+        files, finished = [], []
+        for path in glob.glob(os.path.join(directory, "*.json")):
+            name = os.path.basename(path)
+            if name == AGGREGATE:
+                continue
+            if name in folded:
+                if locked:
+                    _remove(path)
+                continue
+            try:
+                data = _load_json(path)
+                mtime = os.path.getmtime(path)
+            except (OSError, ValueError):
+                continue
+            try:
+                pid = int(name.split("-", 1)[0])
+            except ValueError:
+                pid = None
+            if (locked and pid is not None and path != own_path
+                    and (pid in finished_pids or (mtime < stale_before and not _pid_alive(pid)))):
+                finished.append((path, data))
+            else:
+                files.append((path, data, mtime))
+        if finished:
+            acc = aggregate.get("data")
+            for _path, data in finished:
+                acc = merge(acc, data)
+            names = [n for n in folded if os.path.exists(os.path.join(directory, n))]
+            aggregate = {"data": acc, "folded": names + [os.path.basename(p) for p, _ in finished]}
+            _write_json(aggregate_path, aggregate)
+            for path, _data in finished:
+                _remove(path)
+    if aggregate.get("data") is not None:
+        files.append((aggregate_path, aggregate["data"], 0))
+    return files
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _add_snapshot(histograms, responses, data):
+    for name, rows in data.get("histograms", {}).items():
+        if name not in histograms:
+            continue
+        for row in rows:
+            labels, series = tuple(row[:2]), row[2:]
+            acc = histograms[name].get(labels)
+            if acc is None or len(acc) != len(series):
+                histograms[name][labels] = list(series)
+            else:
+                for i, v in enumerate(series):
+                    acc[i] += v
+    for *labels, n in data.get("responses", []):
+        responses[tuple(labels)] = responses.get(tuple(labels), 0) + n
+
+
+def _merge_snapshots(acc, data):
+    histograms = {name: {} for name in HISTOGRAMS}
+    responses = {}
+    if acc is not None:
+        _add_snapshot(histograms, responses, acc)
+    _add_snapshot(histograms, responses, data)
+    return {
+        "histograms": {name: [[*labels, *series] for labels, series in rows.items()]
+                       for name, rows in histograms.items()},
+        "responses": [[*labels, n] for labels, n in responses.items()],
+        "in_flight": 0,
+    }
+
+
+def fold_finished(pid):
+    """Pliega en AGGREGATE los archivos del proceso `pid`, que ya terminó (gunicorn child_exit)."""
+    read_process_files(metrics_dir(), None, _merge_snapshots, finished_pids=(pid,))
+
+
+def collect():
+    """Suma los archivos de todos los procesos (incluido este, recién volcado)."""
+    _ensure_process()
+    flush()
+    histograms = {name: {} for name in HISTOGRAMS}
+    responses = {}
+    in_flight = 0
+    fresh_after = time.time() - 3 * _flush_seconds()
+    for path, data, mtime in read_process_files(metrics_dir(), _registry.path, _merge_snapshots):
+        _add_snapshot(histograms, responses, data)
+        if path == _registry.path or mtime >= fresh_after:
+            in_flight += data.get("in_flight", 0)
+    return histograms, responses, in_flight
+
+
+def render():
+    histograms, responses, in_flight = collect()
+    lines = []
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        full = f"{PREFIX}_{name}"
+        lines.append(f"# HELP {full} {help_text}")
+        lines.append(f"# TYPE {full} histogram")
+        for (endpoint, method), series in sorted(histograms[name].items()):
+            cumulative = 0
+            for bound, n in zip(buckets, series):
+                cumulative += n
+                lines.append(f"{full}_bucket{_labels(endpoint=endpoint, method=method, le=_fmt(float(bound)))} {cumulative}")
+            lines.append(f"{full}_bucket{_labels(endpoint=endpoint, method=method, le='+Inf')} {series[-1]}")
+            lines.append(f"{full}_sum{_labels(endpoint=endpoint, method=method)} {_fmt(series[-2])}")
+            lines.append(f"{full}_count{_labels(endpoint=endpoint, method=method)} {series[-1]}")
+
+    full = f"{PREFIX}_http_responses_total"
+    lines.append(f"# HELP {full} Respuestas por endpoint, método y status")
+    lines.append(f"# TYPE {full} counter")
+    for (endpoint, method, status), n in sorted(responses.items()):
+        lines.append(f"{full}{_labels(endpoint=endpoint, method=method, status=status)} {n}")
+
+    full = f"{PREFIX}_http_requests_in_progress"
+    lines.append(f"# HELP {full} Requests en curso (todos los procesos)")
+    lines.append(f"# TYPE {full} gauge")
+    lines.append(f"{full} {in_flight}")
+    return "\n".join(lines) + "\n"
+
+
+def clear():
+    """Borra los archivos de todos los procesos (al reiniciar el servicio)."""
+    removed = 0
+    for path in glob.glob(os.path.join(metrics_dir(), "*.json")):
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def init_app(app):
+    if os.getenv("METRICS_ENABLED", "1").strip().lower() in ("0", "false", "no", "off"):
+        return
+    set_enabled(True)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        token = os.getenv("METRICS_TOKEN")
+        if token and request.headers.get("Authorization") != f"Bearer {token}":
+            return Response("unauthorized\n", status=401, mimetype="text/plain")
+        return Response(render(), content_type="text/plain; version=0.0.4; charset=utf-8")
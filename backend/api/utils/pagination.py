@@ -0,0 +1,89 @@
+# api/utils/pagination.py
+from flask import request, jsonify
+from api.errors import ValidationError
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+def _truthy(value):
+    return (value or "").strip().lower() in ("1", "true", "yes", "si", "sí")
+
+def _args(args):
+    # Por defecto request.args; el camino async (api/aio) pasa su propio mapping
+    return request.args if args is None else args
+
+def arg_int(name, default=None, args=None):
+    """Lee un query param entero; ValidationError si viene con basura."""
+    raw = _args(args).get(name)
+    if raw is None or raw.strip() == "":
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        raise ValidationError(f"{name} debe ser entero", details={name: raw})
+
+def arg_float(name, default=None, args=None):
+    raw = _args(args).get(name)
+    if raw is None or raw.strip() == "":
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        raise ValidationError(f"{name} debe ser numérico", details={name: raw})
+
+def wants_all(args=None):
+    """?all=true -> respuesta completa sin paginar (compatibilidad con el frontend viejo)."""
+    return _truthy(_args(args).get("all"))
+
+def page_params(default_limit=DEFAULT_LIMIT, max_limit=MAX_LIMIT, args=None):
+    """
+    Devuelve (limit, after_id) para paginación por cursor (keyset).
+    Los listados van por id DESC: la página siguiente son los ids < after_id.
+    """
+    limit = arg_int("limit", default_limit, args)
+    if limit < 1:
+        raise ValidationError("limit debe ser >= 1")
+    limit = min(limit, max_limit)
+    after_id = arg_int("after_id", args=args)
+    return limit, after_id
+
+def add_range(where, params, column, low=None, high=None):
+    """Agrega `column BETWEEN` (abierto en cualquiera de los extremos) al WHERE."""
+    if low is not None:
+        where.append(f"{column} >= %s")
+        params.append(low)
+    if high is not None:
+        where.append(f"{column} <= %s")
+        params.append(high)
+
+def keyset_sql(sql, where, params, id_column, limit=None, after_id=None):
+    """
+    Completa un SELECT con WHERE + ORDER BY id DESC + LIMIT.
+    Pide limit+1 filas para saber si hay otra página sin un COUNT(*).
+    """
+    where = list(where)
+    params = list(params)
+    if after_id is not None:
+        where.append(f"{id_column} < %s")
+        params.append(after_id)
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += f" ORDER BY {id_column} DESC"
+    if limit is not None:
+        sql += " LIMIT %s"
+        params.append(limit + 1)
+    return sql, tuple(params)
+
+def split_page(rows, limit, id_key="id"):
+    """Recorta la fila extra y calcula next_cursor (None si no hay más)."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1][id_key]
+    return rows, None
+
+def page_payload(rows, limit, id_key="id"):
+    rows, next_cursor = split_page(rows, limit, id_key)
+    return {"ok": True, "data": rows, "next_cursor": next_cursor, "limit": limit}
+
+def page_response(rows, limit, id_key="id", status=200):
+    return jsonify(page_payload(rows, limit, id_key)), status
@@ -0,0 +1,267 @@
+# api/utils/pdf.py
+"""
+Motor de PDF de todas las exportaciones: tablas paginadas escritas en streaming.
+
+- iter_table(title, columns, rows) (y write_table(dest, ...)) consume `rows` de a una página
+  (típicamente las filas de un cursor sin buffer, leídas de a FETCH_BATCH): arma la tabla de
+  esa página, la entrega comprimida (un chunk por página) y la descarta. De cada página sólo
+  quedan los offsets de sus objetos (8 bytes c/u) para la tabla xref del final: la memoria
+  no depende de las filas.
+- El PDF se escribe directamente (Helvetica estándar, WinAnsiEncoding). xhtml2pdf y reportlab
+  arman el documento entero en memoria antes de guardarlo (y costaban ~0.7 s de import).
+- Los endpoints lo envían a medida que se genera y a la vez lo guardan en el cache de
+  exports (utils/export_cache.py); los jobs de /exports lo escriben a un archivo.
+Las celdas van en una sola línea: el texto que no entra en la columna se corta con "...".
+"""
+import unicodedata
+import zlib
+from array import array
+from datetime import datetime
+
+PAGE_WIDTH, PAGE_HEIGHT = 842, 595   # A4 apaisado, en puntos
+MARGIN = 28
+TITLE_SIZE = 13
+HEADER_SIZE = 9
+FONT_SIZE = 8
+ROW_HEIGHT = 14
+CELL_PADDING = 4
+PROGRESS_PAGES = 50                  # cada cuántas páginas se informa el avance
+
+# Ancho de cada carácter ASCII imprimible (32..126) en Helvetica, en milésimas del tamaño
+_ASCII_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+
+
+def _byte_widths():
+    """Ancho por byte de WinAnsi: las letras acentuadas miden lo mismo que su letra base."""
+    widths = [0] * 256
+    for b in range(256):
+        if 32 <= b <= 126:
+            widths[b] = _ASCII_WIDTHS[b - 32]
+        elif b >= 128:
+            base = unicodedata.normalize("NFD", bytes([b]).decode("cp1252", errors="ignore"))[:1]
+            widths[b] = _ASCII_WIDTHS[ord(base) - 32] if base and 32 <= ord(base) <= 126 else 556
+    return widths
+
+
+_WIDTHS = _byte_widths()
+_BOLD_FACTOR = 1.1                   # Helvetica-Bold es a lo sumo ~10 % más ancha
+_ELLIPSIS = b"..."
+_CONTROL = {c: " " for c in range(32)}
+
+
+def _encode(value):
+    if value is None:
+        return b""
+    return str(value).translate(_CONTROL).encode("cp1252", errors="replace")
+
+
+def _fit(value, max_width, size, factor=1.0):
+    """(bytes en WinAnsi, ancho en puntos) del texto, cortado con "..." si no entra."""
+    data = _encode(value)
+    scale = size * factor / 1000
+    width = sum(map(_WIDTHS.__getitem__, data)) * scale
+    if width <= max_width:
+        return data, width
+    limit = max_width - 3 * _WIDTHS[46] * scale
+    acc = 0.0
+    for i, b in enumerate(data):
+        acc += _WIDTHS[b] * scale
+        if acc > limit:
+            return data[:i] + _ELLIPSIS, acc - _WIDTHS[b] * scale + 3 * _WIDTHS[46] * scale
+    return data, width
+
+
+def _pdf_string(data):
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+class _Writer:
+    """
+    Objetos PDF escritos en orden; sólo se guardan los offsets (8 bytes c/u) para la xref.
+    Lo escrito se junta hasta take() (a lo sumo una página).
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.pos = 0
+        self.offsets = array("q")
+
+    def write(self, data):
+        self.parts.append(data)
+        self.pos += len(data)
+
+    def take(self):
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+    def start(self, num):
+        while len(self.offsets) <= num:
+            self.offsets.append(0)
+        self.offsets[num] = self.pos
+        self.write(b"%d 0 obj\n" % num)
+
+    def obj(self, num, body):
+        self.start(num)
+        self.write(body + b"\nendobj\n")
+
+    def stream(self, num, data):
+        data = zlib.compress(data, 6)
+        self.obj(num, b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(data), data))
+
+    def finish(self, root, info):
+        xref = self.pos
+        size = len(self.offsets)
+        self.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        entries = []
+        for num in range(1, size):
+            entries.append(b"%010d 00000 n \n" % self.offsets[num])
+            if len(entries) >= 1000:
+                self.write(b"".join(entries))
+                entries = []
+        self.write(b"".join(entries))
+        self.write(b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                   % (size, root, info, xref))
+
+
+# Objetos fijos; las páginas empiezan en FIRST_PAGE_OBJ (contenido, página, contenido, ...)
+_CATALOG, _PAGES, _FONT, _FONT_BOLD, _INFO = 1, 2, 3, 4, 5
+FIRST_PAGE_OBJ = 6
+
+
+class _Layout:
+    def __init__(self, columns, widths, align):
+        weights = list(widths or [1] * len(columns))
+        usable = PAGE_WIDTH - 2 * MARGIN
+        total = float(sum(weights))
+        self.widths = [usable * w / total for w in weights]
+        self.lefts = [MARGIN + sum(self.widths[:i]) for i in range(len(columns))]
+        self.align = list(align or "L" * len(columns))
+        self.table_top = PAGE_HEIGHT - MARGIN - TITLE_SIZE - 10
+        # Filas de datos por página (el encabezado se repite en cada una)
+        self.rows_per_page = int((self.table_top - MARGIN) // ROW_HEIGHT) - 1
+
+    def cells(self, values, size, factor=1.0):
+        """[(x, texto PDF)] de las celdas de una fila, según el ancho y la alineación de cada columna."""
+        out = []
+        for i, value in enumerate(values):
+            data, width = _fit(value, self.widths[i] - 2 * CELL_PADDING, size, factor)
+            if not data:
+                continue
+            if self.align[i] == "R":
+                x = self.lefts[i] + self.widths[i] - CELL_PADDING - width
+            else:
+                x = self.lefts[i] + CELL_PADDING
+            out.append((x, _pdf_string(data)))
+        return out
+
+
+def _page_content(layout, title, header, rows, number):
+    top = layout.table_top
+    bottom = top - ROW_HEIGHT * (len(rows) + 1)
+    right = PAGE_WIDTH - MARGIN
+    ops = []
+    # Fondos: encabezado gris y filas alternadas
+    ops.append(b"0.94 g %.2f %.2f %.2f %d re f" % (MARGIN, top - ROW_HEIGHT, right - MARGIN, ROW_HEIGHT))
+    ops.append(b"0.98 g")
+    for i in range(1, len(rows), 2):
+        ops.append(b"%.2f %.2f %.2f %d re f" % (MARGIN, top - ROW_HEIGHT * (i + 2), right - MARGIN, ROW_HEIGHT))
+    # Grilla
+    ops.append(b"0.67 G 0.25 w")
+    for i in range(len(rows) + 2):
+        y = top - ROW_HEIGHT * i
+        ops.append(b"%.2f %.2f m %.2f %.2f l" % (MARGIN, y, right, y))
+    for x in layout.lefts + [right]:
+        ops.append(b"%.2f %.2f m %.2f %.2f l" % (x, top, x, bottom))
+    ops.append(b"S 0 g BT")
+    # Título y número de página
+    ops.append(b"/F2 %d Tf 1 0 0 1 %d %.2f Tm %s Tj" % (TITLE_SIZE, MARGIN, PAGE_HEIGHT - MARGIN - TITLE_SIZE, title))
+    ops.append(b"/F1 %d Tf 1 0 0 1 %.2f %d Tm (P\xe1gina %d) Tj" % (FONT_SIZE, right - 50, MARGIN - 14, number))
+    baseline = (ROW_HEIGHT - FONT_SIZE) / 2 + 1
+    ops.append(b"/F2 %d Tf" % HEADER_SIZE)
+    y = top - ROW_HEIGHT + baseline
+    for x, text in header:
+        ops.append(b"1 0 0 1 %.2f %.2f Tm %s Tj" % (x, y, text))
+    ops.append(b"/F1 %d Tf" % FONT_SIZE)
+    for i, row in enumerate(rows):
+        y = top - ROW_HEIGHT * (i + 2) + baseline
+        for x, text in layout.cells(row, FONT_SIZE):
+            ops.append(b"1 0 0 1 %.2f %.2f Tm %s Tj" % (x, y, text))
+    ops.append(b"ET")
+    return b"\n".join(ops)
+
+
+def iter_table(title, columns, rows, widths=None, align=None, progress=None):
+    """
+    Genera el PDF de `title` y la tabla `columns` + `rows` en chunks de bytes: el encabezado
+    del documento, una página por chunk y la xref al final (para responder mientras se lee
+    el cursor). rows: iterable de filas (secuencias en el orden de columns), se lee de a una
+    página. widths: pesos relativos de cada columna (default iguales); align: "L"/"R" por
+    columna. progress(pct, mensaje) como en los jobs de /exports. Devuelve (StopIteration.value)
+    la cantidad de filas.
+    """
+    layout = _Layout(columns, widths, align)
+    header = layout.cells(columns, HEADER_SIZE, _BOLD_FACTOR)
+    title_pdf = _pdf_string(_encode(title))
+    out = _Writer()
+    out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    out.obj(_CATALOG, b"<< /Type /Catalog /Pages %d 0 R >>" % _PAGES)
+    for num, name in ((_FONT, b"Helvetica"), (_FONT_BOLD, b"Helvetica-Bold")):
+        out.obj(num, b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % name)
+    created = datetime.now().strftime("D:%Y%m%d%H%M%S").encode()
+    out.obj(_INFO, b"<< /Title %s /Producer (Inventario) /CreationDate (%s) >>" % (title_pdf, created))
+    resources = b"<< /Font << /F1 %d 0 R /F2 %d 0 R >> >>" % (_FONT, _FONT_BOLD)
+    yield out.take()
+
+    it = iter(rows)
+    pages, total_rows, num = 0, 0, FIRST_PAGE_OBJ
+    while True:
+        page_rows = []
+        for row in it:
+            page_rows.append(row)
+            if len(page_rows) >= layout.rows_per_page:
+                break
+        if not page_rows and pages:
+            break
+        pages += 1
+        out.stream(num, _page_content(layout, title_pdf, header, page_rows, pages))
+        out.obj(num + 1, b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R /Resources %s >>"
+                % (_PAGES, PAGE_WIDTH, PAGE_HEIGHT, num, resources))
+        yield out.take()
+        num += 2
+        total_rows += len(page_rows)
+        if progress and pages % PROGRESS_PAGES == 0:
+            progress(50, f"{total_rows} filas, {pages} páginas")
+        if len(page_rows) < layout.rows_per_page:
+            break
+
+    # Árbol de páginas al final: los objetos página son FIRST_PAGE_OBJ + 1, + 3, ...
+    out.start(_PAGES)
+    out.write(b"<< /Type /Pages /Count %d /Kids [" % pages)
+    for first in range(0, pages, 1000):
+        out.write(b"".join(b"%d 0 R " % (FIRST_PAGE_OBJ + 1 + 2 * i)
+                           for i in range(first, min(first + 1000, pages))))
+        yield out.take()
+    out.write(b"] >>\nendobj\n")
+    out.finish(_CATALOG, _INFO)
+    yield out.take()
+    if progress:
+        progress(95, f"{total_rows} filas, {pages} páginas")
+    return total_rows
+
+
+def write_table(dest, title, columns, rows, widths=None, align=None, progress=None):
+    """iter_table() escrito en `dest` (archivo binario). Devuelve la cantidad de filas."""
+    chunks = iter_table(title, columns, rows, widths=widths, align=align, progress=progress)
+    while True:
+        try:
+            dest.write(next(chunks))
+        except StopIteration as done:
+            return done.value
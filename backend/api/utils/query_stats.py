@@ -0,0 +1,301 @@
+# api/utils/query_stats.py
+"""
+Estadísticas por consulta y captura de consultas lentas.
+
+- Un observador de cursores (api.db.db_config) mide cada sentencia y la agrupa por
+  huella: el SQL normalizado (literales, números y %s -> ?, listas IN y VALUES colapsadas).
+- Si una sentencia tarda más de SLOW_QUERY_MS (200) se guardan la ruta que la llamó y,
+  a lo sumo una vez cada EXPLAIN_INTERVAL segundos por huella, su EXPLAIN FORMAT=JSON.
+  El EXPLAIN corre en un hilo aparte con otra conexión del pool: el request no lo espera.
+- Los parámetros nunca se guardan (pueden traer contraseñas); sólo se usan para el EXPLAIN.
+- Como las métricas, cada proceso vuelca su estado a <METRICS_DIR>/queries/ y
+  GET /dashboard/slow-queries suma todos los procesos; los archivos de los que terminaron
+  se pliegan en uno (metrics.read_process_files).
+- QUERY_STATS_ENABLED=0 lo apaga.
+"""
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from flask import has_request_context, request
+
+from api.db.db_config import add_query_observer, get_pool
+from api.utils.metrics import metrics_dir, read_process_files
+
+MAX_FINGERPRINTS = 2000
+_EXPLAINABLE = ("select", "insert", "update", "delete", "replace", "with")
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/|--[^\n]*", re.S)
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_SPACE_RE = re.compile(r"\s+")
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALUES_RE = re.compile(r"(\(\?\+?\))(?:\s*,\s*\(\?\+?\))+")
+
+
+def _slow_seconds():
+    return float(os.getenv("SLOW_QUERY_MS", 200)) / 1000.0
+
+
+def _explain_interval():
+    return float(os.getenv("EXPLAIN_INTERVAL", 300))
+
+
+def _flush_seconds():
+    return float(os.getenv("METRICS_FLUSH_SECONDS", 2))
+
+
+def stats_dir():
+    path = os.path.join(metrics_dir(), "queries")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def normalize(statement):
+    """SQL -> huella: mismo texto para la misma consulta con distintos valores."""
+    if isinstance(statement, (bytes, bytearray)):
+        statement = statement.decode("utf-8", "replace")
+    sql = _STRING_RE.sub("?", statement)
+    sql = _COMMENT_RE.sub(" ", sql)
+    sql = _PARAM_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _SPACE_RE.sub(" ", sql).strip().lower()
+    sql = _LIST_RE.sub("(?+)", sql)
+    sql = _VALUES_RE.sub(r"\1", sql)
+    return sql
+
+
+class _Stats:
+    """Estado de este proceso: huella -> contadores. Las sentencias ya vistas no se re-normalizan."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = None
+        self.path = None
+        self.executor = None
+        self.reset()
+
+    def reset(self):
+        self.by_id = {}          # id -> dict de la huella
+        self.ids = {}            # texto de la sentencia -> id (cache de normalize)
+        self.explained_at = {}   # id -> time.monotonic() del último EXPLAIN pedido
+
+
+_stats = _Stats()
+_local = threading.local()
+
+
+def _ensure_process():
+    pid = os.getpid()
+    if _stats.pid == pid:
+        return
+    with _stats.lock:
+        if _stats.pid == pid:
+            return
+        _stats.reset()
+        _stats.pid = pid
+        _stats.path = os.path.join(stats_dir(), f"{pid}-{uuid.uuid4().hex[:8]}.json")
+        _stats.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+    threading.Thread(target=_flush_loop, name="query-stats-flush", daemon=True).start()
+
+
+def _fingerprint_id(statement):
+    fid = _stats.ids.get(statement)
+    if fid is None:
+        text = normalize(statement)
+        fid = hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+        with _stats.lock:
+            if len(_stats.ids) > 4 * MAX_FINGERPRINTS:
+                _stats.ids.clear()   # SQL armado con valores inline: no crecer sin límite
+            _stats.ids[statement] = fid
+            if fid not in _stats.by_id and len(_stats.by_id) < MAX_FINGERPRINTS:
+                _stats.by_id[fid] = {"id": fid, "fingerprint": text, "count": 0, "total_s": 0.0,
+                                     "max_s": 0.0, "errors": 0, "slow": 0, "last_slow": None}
+    return fid
+
+
+def _route():
+    if not has_request_context():
+        return None
+    rule = request.url_rule.rule if request.url_rule is not None else request.path
+    return {"endpoint": request.endpoint, "method": request.method, "rule": rule}
+
+
+def _observe(statement, params, elapsed, error):
+    if getattr(_local, "explaining", False):
+        return
+    _ensure_process()
+    fid = _fingerprint_id(statement)
+    slow = elapsed >= _slow_seconds()
+    explain = False
+    with _stats.lock:
+        entry = _stats.by_id.get(fid)
+        if entry is None:
+            return
+        entry["count"] += 1
+        entry["total_s"] += elapsed
+        if elapsed > entry["max_s"]:
+            entry["max_s"] = elapsed
+        if error is not None:
+            entry["errors"] += 1
+        if slow:
+            entry["slow"] += 1
+            now = time.monotonic()
+            if now - _stats.explained_at.get(fid, -1e18) >= _explain_interval():
+                _stats.explained_at[fid] = now
+                explain = True
+    if not slow:
+        return
+    capture = {"at": datetime.now().isoformat(timespec="seconds"), "elapsed_ms": round(elapsed * 1000, 2),
+               "route": _route(), "error": str(error) if error is not None else None}
+    with _stats.lock:
+        previous = _stats.by_id[fid]["last_slow"] or {}
+        # El último EXPLAIN se conserva hasta que llegue uno nuevo
+        capture["explain"] = previous.get("explain")
+        _stats.by_id[fid]["last_slow"] = capture
+    if explain and _is_explainable(statement, params):
+        _stats.executor.submit(_run_explain, fid, statement, params)
+
+
+def _is_explainable(statement, params):
+    if isinstance(statement, (bytes, bytearray)):
+        return False
+    # executemany: params es una lista de filas; no hay una única sentencia que explicar
+    if isinstance(params, list) and params and isinstance(params[0], (tuple, list, dict)):
+        return False
+    head = statement.lstrip(" \t\r\n(").split(None, 1)
+    return bool(head) and head[0].lower() in _EXPLAINABLE
+
+
+def _run_explain(fid, statement, params):
+    _local.explaining = True
+    conn = None
+    try:
+        conn = get_pool().acquire()
+        cur = conn.cursor()
+        cur.execute(f"EXPLAIN FORMAT=JSON {statement}", params)
+        row = cur.fetchone()
+        cur.close()
+        plan = json.loads(row[0]) if row and row[0] else None
+    except Exception as e:
+        plan = {"error": str(e)}
+    finally:
+        if conn is not None:
+            conn.release()
+        _local.explaining = False
+    with _stats.lock:
+        entry = _stats.by_id.get(fid)
+        if entry is not None and entry["last_slow"] is not None:
+            entry["last_slow"]["explain"] = plan
+
+
+# ---------- Volcado y agregación entre procesos ----------
+
+def flush():
+    if not _stats.path:
+        return
+    with _stats.lock:
+        data = json.dumps(list(_stats.by_id.values()), separators=(",", ":"))
+    tmp = f"{_stats.path}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp, _stats.path)
+
+
+def _flush_loop():
+    interval = _flush_seconds()
+    pid = os.getpid()
+    try:
+        read_process_files(stats_dir(), _stats.path, _merge_entries)
+    except OSError:
+        pass
+    while _stats.pid == pid:
+        time.sleep(interval)
+        try:
+            flush()
+        except OSError:
+            pass
+
+
+def _add_entries(merged, entries):
+    for e in entries:
+        acc = merged.get(e["id"])
+        if acc is None:
+            merged[e["id"]] = dict(e)
+            continue
+        for k in ("count", "total_s", "errors", "slow"):
+            acc[k] += e[k]
+        acc["max_s"] = max(acc["max_s"], e["max_s"])
+        last = e.get("last_slow")
+        if last and (not acc["last_slow"] or last["at"] > acc["last_slow"]["at"]
+                     or (last.get("explain") and not acc["last_slow"].get("explain"))):
+            acc["last_slow"] = last
+
+
+def _merge_entries(acc, entries):
+    """Suma de procesos terminados: a lo sumo MAX_FINGERPRINTS huellas (las de más tiempo total)."""
+    merged = {}
+    _add_entries(merged, acc or [])
+    _add_entries(merged, entries)
+    rows = sorted(merged.values(), key=lambda e: e["total_s"], reverse=True)
+    return rows[:MAX_FINGERPRINTS]
+
+
+def fold_finished(pid):
+    """Pliega los archivos del proceso `pid`, que ya terminó (gunicorn child_exit)."""
+    read_process_files(stats_dir(), None, _merge_entries, finished_pids=(pid,))
+
+
+def top(limit=20, sort="total"):
+    """Huellas de todos los procesos ordenadas por total | max | count | slow | avg."""
+    _ensure_process()
+    flush()
+    merged = {}
+    for _path, entries, _mtime in read_process_files(stats_dir(), _stats.path, _merge_entries):
+        _add_entries(merged, entries)
+
+    rows = []
+    for e in merged.values():
+        rows.append({
+            "id": e["id"],
+            "fingerprint": e["fingerprint"],
+            "count": e["count"],
+            "total_ms": round(e["total_s"] * 1000, 2),
+            "avg_ms": round(e["total_s"] * 1000 / e["count"], 3) if e["count"] else 0.0,
+            "max_ms": round(e["max_s"] * 1000, 2),
+            "errors": e["errors"],
+            "slow": e["slow"],
+            "last_slow": e["last_slow"],
+        })
+    key = {"total": "total_ms", "max": "max_ms", "count": "count", "slow": "slow", "avg": "avg_ms"}[sort]
+    rows.sort(key=lambda r: r[key], reverse=True)
+    return rows[:limit], len(rows)
+
+
+def clear():
+    removed = 0
+    for path in glob.glob(os.path.join(stats_dir(), "*.json")):
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+    with _stats.lock:
+        _stats.by_id.clear()
+        _stats.ids.clear()
+        _stats.explained_at.clear()
+    return removed
+
+
+def init_app(app):
+    if os.getenv("QUERY_STATS_ENABLED", "1").strip().lower() in ("0", "false", "no", "off"):
+        return
+    add_query_observer(_observe)
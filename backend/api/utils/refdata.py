@@ -0,0 +1,83 @@
+# api/utils/refdata.py
+"""
+Datos de referencia en memoria: categorías y proveedores (tablas chicas que casi no cambian).
+
+- Cada tabla se carga entera la primera vez que se usa (un SELECT) como mapa id -> fila, en
+  el orden de los listados (id descendente). Las validaciones de existencia (alta/edición de
+  productos, alta masiva, borrado de categorías) y los desplegables (?all=1) salen de acá.
+- Entre procesos: la copia guarda el token de versión del recurso (utils/versions.py) con el
+  que se cargó y se compara en cada uso; invalidate("categories"/"suppliers") lo renueva y
+  cada worker recarga en su próxima consulta. En el mismo proceso se descarta en el acto
+  (on_invalidate).
+- Se carga con la conexión del request (get_db_connection), sin ocupar otra del pool. Con
+  réplicas, antes se pide una que ya vio el último bump del recurso (read_after): nunca queda
+  guardada con el token nuevo la copia de una réplica atrasada. Si la conexión ya tenía una
+  transacción abierta (un snapshot que puede ser anterior al token), lo leído sirve para ese
+  request pero no se guarda.
+"""
+import threading
+
+from api.db.db_config import DBError, get_db_connection, read_after
+from api.utils import versions
+from api.utils.cache import on_invalidate
+
+
+class RefTable:
+    def __init__(self, resource, sql):
+        self.resource = resource
+        self.sql = sql
+        self._data = None               # (token, {id: fila}); se reemplaza entero, nunca se modifica
+        self._lock = threading.Lock()
+        self.loads = 0
+        on_invalidate(resource, self.clear)
+
+    def _load(self):
+        """(token, filas, se puede guardar)."""
+        # El token se lee antes del SELECT: si cambia en el medio, el próximo uso recarga
+        token = versions.current(self.resource)
+        read_after(versions.bumped_at(self.resource))
+        conn = get_db_connection()
+        try:
+            shareable = not conn.in_transaction
+            cur = conn.cursor(dictionary=True)
+            try:
+                cur.execute(self.sql)
+                rows = {row["id"]: row for row in cur.fetchall()}
+            finally:
+                cur.close()
+        except DBError:
+            raise
+        except Exception as e:
+            raise DBError(str(e))
+        finally:
+            conn.close()
+        return token, rows, shareable
+
+    def rows(self):
+        """Mapa id -> fila vigente (no modificarlo: es compartido por todos los hilos)."""
+        data = self._data
+        if data is not None and data[0] == versions.current(self.resource):
+            return data[1]
+        with self._lock:
+            # Un solo hilo recarga; los demás usan lo que cargó
+            data = self._data
+            if data is None or data[0] != versions.current(self.resource):
+                token, rows, shareable = self._load()
+                self.loads += 1
+                if not shareable:
+                    return rows
+                data = self._data = (token, rows)
+            return data[1]
+
+    def exists(self, item_id):
+        return item_id in self.rows()
+
+    def list(self):
+        return list(self.rows().values())
+
+    def clear(self):
+        self._data = None
+
+
+categories = RefTable("categories", "SELECT id, name FROM categories ORDER BY id DESC")
+suppliers = RefTable("suppliers", "SELECT id, name, email, phone, contact FROM suppliers ORDER BY id DESC")
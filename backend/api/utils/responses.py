@@ -0,0 +1,154 @@
+# api/utils/responses.py
+"""
+Capa de respuestas JSON que usan los helpers ok()/err() de cada blueprint.
+
+- FastJSONProvider (app.json, también lo usa jsonify): orjson, que serializa datetime/date
+  en ISO 8601 sin pasar por Python; Decimal sale como string, igual que antes. Sin orjson
+  instalado se usa el json de la stdlib con las mismas reglas.
+- json_ok(data): si data es una lista/dict arma el JSON de una vez; si es un cursor (o un
+  iterador de filas) envía {"ok":true,"data":[...]} en streaming, de a FETCH_BATCH filas,
+  sin materializar la lista.
+"""
+import dataclasses
+import decimal
+import json
+from collections.abc import Iterator
+from datetime import date, datetime, time
+
+from flask import Response, current_app, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+
+from api.utils.streaming import FETCH_BATCH, iter_batches
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    orjson = None
+    HAS_ORJSON = False
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if HAS_ORJSON else 0
+
+
+def _default(o):
+    """Lo que el encoder no resuelve solo."""
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def dumps(obj, indent=False):
+    """JSON en bytes (UTF-8), compacto salvo indent=True."""
+    if HAS_ORJSON:
+        option = _ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=_default, option=option)
+    return json.dumps(obj, default=_default, ensure_ascii=False, indent=2 if indent else None,
+                      separators=None if indent else (",", ":")).encode("utf-8")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Provider JSON de la app. Las claves salen en el orden del dict, como pedía
+    JSON_SORT_KEYS=False (Flask 2.3 ya no lee esa config).
+    """
+    default = staticmethod(_default)
+    sort_keys = False
+
+    def _indent(self):
+        return self.compact is False or (self.compact is None and self._app.debug)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            kwargs.setdefault("default", self.default)
+            return json.dumps(obj, **kwargs)
+        return dumps(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if HAS_ORJSON and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj, self._indent()) + b"\n", mimetype=self.mimetype)
+
+
+def _is_stream(data):
+    return hasattr(data, "fetchmany") or isinstance(data, Iterator)
+
+
+def _chunked(rows, size=FETCH_BATCH):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_json_ok(batches, extra=None):
+    """
+    Chunks de {"ok":true,"data":[...], **extra}: un chunk por lote de filas.
+    batches: iterable de listas de filas (p. ej. iter_batches(cursor)).
+    """
+    yield b'{"ok":true,"data":['
+    sep = b""
+    for batch in batches:
+        if batch:
+            # Un solo dumps por lote: "[a,b,c]" -> "a,b,c"
+            yield sep + dumps(batch)[1:-1]
+            sep = b","
+    yield _json_tail(extra)
+
+
+async def aiter_json_ok(batches, extra=None):
+    """Igual que iter_json_ok para un iterable async de lotes (api/aio: db.stream)."""
+    yield b'{"ok":true,"data":['
+    sep = b""
+    async for batch in batches:
+        if batch:
+            yield sep + dumps(batch)[1:-1]
+            sep = b","
+    yield _json_tail(extra)
+
+
+def _json_tail(extra):
+    tail = b"]"
+    for key, value in (extra or {}).items():
+        tail += b"," + dumps(str(key)) + b":" + dumps(value)
+    return tail + b"}\n"
+
+
+def stream_json_ok(data, status=200, extra=None):
+    """
+    Respuesta en streaming desde un cursor (se cierra al terminar) o un iterador de filas.
+    La consulta ya se ejecutó en el handler: los errores de SQL salen antes del primer byte.
+    """
+    batches = iter_batches(data) if hasattr(data, "fetchmany") else _chunked(data)
+    return Response(stream_with_context(iter_json_ok(batches, extra)), status=status,
+                    mimetype=current_app.json.mimetype)
+
+
+def json_ok(data=None, status=200):
+    if data is not None and _is_stream(data):
+        return stream_json_ok(data, status)
+    payload = {"ok": True}
+    if data is not None:
+        payload["data"] = data
+    resp = current_app.json.response(payload)
+    resp.status_code = status
+    return resp
+
+
+def json_err(message="Error interno del servidor", code="INTERNAL_ERROR", status=500, details=None):
+    resp = current_app.json.response({"ok": False, "error": message, "code": code, "details": details or {}})
+    resp.status_code = status
+    return resp
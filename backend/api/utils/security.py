@@ -11,19 +11,20 @@ from datetime import timedelta
 def _err(message="No autorizado", code="AUTH_ERROR", status=401, details=None):
     return jsonify({"ok": False, "error": message, "code": code, "details": details or {}}), status
 
+def parse_identity(ident):
+    """(user_id, role) desde la identity del JWT; ValueError si no tiene el formato esperado."""
+    # Soportar identity como dict {"id":..., "role":...} o "id:role"
+    if isinstance(ident, dict):
+        return ident.get("id"), ident.get("role")
+    user_id_str, role = (ident or "").split(":")
+    return int(user_id_str), role
+
 def token_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         try:
             verify_jwt_in_request()
-            ident = get_jwt_identity()
-            # Soportar identity como dict {"id":..., "role":...} o "id:role"
-            if isinstance(ident, dict):
-                user_id = ident.get("id")
-                role = ident.get("role")
-            else:
-                user_id_str, role = (ident or "").split(":")
-                user_id = int(user_id_str)
+            user_id, role = parse_identity(get_jwt_identity())
             kwargs["user_id"] = user_id
             kwargs["role"] = role
             return fn(*args, **kwargs)
@@ -0,0 +1,154 @@
+# api/utils/streaming.py
+import codecs
+import csv
+import io
+import json
+from flask import Response, stream_with_context
+
+FETCH_BATCH = 1000
+
+def iter_batches(cur, batch_size=FETCH_BATCH):
+    """
+    Lee un cursor SIN buffer de a `batch_size` filas (fetchmany).
+    La memoria queda acotada al lote, sin importar cuántas filas devuelva la consulta.
+    Cierra el cursor al terminar (o si el cliente corta la descarga).
+    """
+    try:
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cur.close()
+
+def iter_rows(cur, batch_size=FETCH_BATCH):
+    """Igual que iter_batches pero fila por fila."""
+    for batch in iter_batches(cur, batch_size):
+        yield from batch
+
+def write_chunks(dest, chunks, encoding="utf-8"):
+    """Vuelca a un archivo binario los chunks (str o bytes) de csv_lines / csv_writer_chunks."""
+    for chunk in chunks:
+        dest.write(chunk.encode(encoding) if isinstance(chunk, str) else chunk)
+
+def stream_response(chunks, content_type, filename=None, disposition="attachment", headers=None):
+    """
+    Response en streaming: el generador corre con el contexto del request activo
+    (la conexión del request se libera recién al terminar de enviar).
+    """
+    hdrs = dict(headers or {})
+    if filename:
+        hdrs.setdefault("Content-Disposition", f'{disposition}; filename="{filename}"')
+    return Response(stream_with_context(chunks), content_type=content_type, headers=hdrs)
+
+def csv_lines(header, batches, format_row):
+    """
+    Genera el CSV por lotes: "header" y luego "\\n" + línea por fila (mismo formato
+    que el "\\n".join anterior). Un chunk por lote para no escribir fila a fila.
+    """
+    yield header
+    for batch in batches:
+        yield "".join("\n" + format_row(r) for r in batch)
+
+def csv_writer_chunks(header, rows, keymap, batch_size=FETCH_BATCH):
+    """CSV con csv.writer (filas dict -> columnas según keymap), volcado cada `batch_size` filas."""
+    sio = io.StringIO()
+    writer = csv.writer(sio)
+    writer.writerow(header)
+    n = 0
+    for r in rows:
+        writer.writerow([r.get(k, "") for k in keymap])
+        n += 1
+        if n % batch_size == 0:
+            yield sio.getvalue()
+            sio.seek(0)
+            sio.truncate()
+    yield sio.getvalue()
+
+
+# ---------- Lectura en streaming del body (imports masivos) ----------
+READ_CHUNK = 64 * 1024
+
+def iter_csv_dicts(stream, encoding="utf-8-sig"):
+    """Filas de un CSV con encabezado (dict por fila), leyendo el body de a líneas."""
+    text = io.TextIOWrapper(stream, encoding=encoding, newline="")
+    yield from csv.DictReader(text)
+
+# Tamaño máximo de un elemento del array (en caracteres; un producto ocupa ~100)
+MAX_JSON_ITEM = 1024 * 1024
+
+def iter_json_array(stream, chunk_size=READ_CHUNK, max_item=MAX_JSON_ITEM):
+    """
+    Elementos de un array JSON (`[ {...}, {...} ]`) a medida que llegan, sin cargar
+    el body entero: raw_decode elemento por elemento sobre un buffer que se corre. Si un
+    elemento quedó cortado en el borde de lo leído, se lee más y se vuelve a decodificar.
+    ValueError si el body no es un array JSON válido o si un elemento supera `max_item`
+    caracteres (un elemento inválido nunca hace leer más de `max_item` del body).
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8-sig")()
+    buf, pos, eof = "", 0, False
+    state = "start"  # start -> first/item -> sep -> ... -> end
+
+    def more():
+        nonlocal buf, pos, eof
+        data = stream.read(chunk_size)
+        eof = not data
+        buf = buf[pos:] + utf8.decode(data or b"", final=eof)
+        pos = 0
+
+    while True:
+        while pos < len(buf) and buf[pos].isspace():
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                if state == "end":
+                    return
+                raise ValueError("JSON incompleto: el array no termina")
+            more()
+            continue
+
+        ch = buf[pos]
+        if state == "start":
+            if ch != "[":
+                raise ValueError("El body JSON debe ser un array")
+            pos += 1
+            state = "first"
+        elif state in ("first", "item"):
+            if state == "first" and ch == "]":
+                pos += 1
+                state = "end"
+                continue
+            if ch in ",:]}":
+                raise ValueError("JSON inválido: se esperaba un elemento del array")
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                end = None
+            # Un número cortado en el borde ("-1.5e|-07") decodifica igual: un escalar
+            # sólo está completo si después viene un separador (o ya no viene nada)
+            complete = end is not None and (eof or ch in '{["' or (
+                end < len(buf) and (buf[end] in ",]" or buf[end].isspace())))
+            if not complete:
+                if eof:
+                    raise ValueError("JSON inválido en el array")
+                if len(buf) - pos > max_item:
+                    raise ValueError(f"Elemento del array inválido o de más de {max_item} caracteres")
+                more()
+                continue
+            if end - pos > max_item:
+                raise ValueError(f"Elemento del array de más de {max_item} caracteres")
+            pos = end
+            state = "sep"
+            yield value
+        elif state == "sep":
+            if ch == ",":
+                state = "item"
+            elif ch == "]":
+                state = "end"
+            else:
+                raise ValueError("JSON inválido: se esperaba ',' o ']'")
+            pos += 1
+        else:
+            raise ValueError("JSON inválido: datos después del array")
@@ -0,0 +1,100 @@
+# api/utils/versions.py
+"""
+Tokens de versión por recurso ("products", "categories", ...) y GET condicional.
+
+- Cada recurso tiene un token en VERSIONS_DIR/<recurso>.ver; invalidate() (utils/cache.py)
+  lo renueva después de cada commit. Al estar en disco lo ven todos los procesos worker.
+  Sólo las escrituras crean o renuevan archivos: un recurso todavía sin archivo tiene el
+  token fijo INITIAL_TOKEN, el mismo en todos los workers.
+- conditional_get(*recursos) arma un ETag con los tokens + la URL y responde 304 si el
+  cliente ya lo tiene, sin abrir conexión a MySQL.
+- Si se modifica la base por fuera de la API: `flask versions bump`.
+- Con réplicas (DB_REPLICAS) el cuerpo de un ETag nuevo se lee de una réplica que ya
+  aplicó el último bump (bumped_at) o del primario: nunca queda un ETag nuevo con datos viejos.
+"""
+import hashlib
+import os
+import re
+import tempfile
+import uuid
+from datetime import date
+from functools import wraps
+from flask import request, make_response
+
+from api.db.db_config import read_after
+
+RESOURCES = ("products", "categories", "suppliers", "orders", "users")
+_NAME_RE = re.compile(r"^[a-z_]+$")
+
+# Token de un recurso que nunca se renovó (no hay archivo)
+INITIAL_TOKEN = "0"
+
+def versions_dir():
+    return os.getenv("VERSIONS_DIR") or os.path.join(tempfile.gettempdir(), "inventario_versions")
+
+def _path(resource):
+    if not _NAME_RE.match(resource):
+        raise ValueError(f"Recurso inválido: {resource}")
+    return os.path.join(versions_dir(), f"{resource}.ver")
+
+def bump(*resources):
+    """Nuevo token para cada recurso (escritura atómica con os.replace)."""
+    for resource in resources:
+        path = _path(resource)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="ascii") as f:
+            f.write(uuid.uuid4().hex)
+        os.replace(tmp, path)
+
+def current(resource):
+    """Token actual; INITIAL_TOKEN si el recurso nunca se renovó (no escribe nada)."""
+    path = _path(resource)
+    try:
+        with open(path, encoding="ascii") as f:
+            return f.read().strip() or INITIAL_TOKEN
+    except FileNotFoundError:
+        return INITIAL_TOKEN
+
+def bumped_at(*resources):
+    """time.time() del último bump de los recursos (mtime de sus tokens); 0 si no tienen token."""
+    latest = 0.0
+    for resource in resources:
+        try:
+            latest = max(latest, os.path.getmtime(_path(resource)))
+        except OSError:
+            pass
+    return latest
+
+def etag_for(resources, full_path=None):
+    """
+    ETag = hash(tokens + ruta con query string + día, por los reportes relativos a hoy).
+    full_path: request.full_path por defecto (el camino async pasa el suyo, mismo formato).
+    """
+    parts = [f"{r}={current(r)}" for r in resources]
+    parts.append(request.full_path if full_path is None else full_path)
+    parts.append(date.today().isoformat())
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+def conditional_get(*resources):
+    """
+    Decorador para GET de listados/reportes. Va debajo del decorador de auth,
+    así un 304 nunca se devuelve sin validar el token.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            etag = etag_for(resources)
+            if request.if_none_match.contains_weak(etag):
+                resp = make_response("", 304)
+            else:
+                read_after(bumped_at(*resources))
+                resp = make_response(fn(*args, **kwargs))
+                if resp.status_code != 200:
+                    return resp
+            resp.set_etag(etag, weak=True)
+            # private: la respuesta depende del token; no-cache: revalidar siempre
+            resp.headers["Cache-Control"] = "private, no-cache"
+            return resp
+        return wrapper
+    return decorator
@@ -0,0 +1,6 @@
+# asgi.py
+# Entrada ASGI: lecturas async (api/aio) + la app Flask para todo lo demás.
+#   uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 4
+from api.aio import create_asgi_app
+
+app = create_asgi_app()
@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+"""Benchmarks de rutas y modelos contra una base MySQL local (ver __main__.py)."""
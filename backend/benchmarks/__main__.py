@@ -0,0 +1,332 @@
+# benchmarks/__main__.py
+"""
+Uso (desde backend/, con MySQL local y las variables DB_* del .env):
+
+    python -m benchmarks seed --size 100k
+    python -m benchmarks run --out results.json [--baseline baseline.json] [--only products]
+    python -m benchmarks compare results.json baseline.json [--threshold 0.2]
+    python -m benchmarks overhead [--max 0.02]
+    python -m benchmarks loadtest [--mode dev --mode gunicorn --mode asgi] [--concurrency 32] [--duration 20]
+    python -m benchmarks startup [--runs 5] [--budget-ms 1000]
+    python -m benchmarks pdf [--rows 10000 --rows 100000] [--max-mb 8]
+
+`run` y `seed` usan la base BENCH_DB_NAME (default mi_inventario_bench), nunca la de desarrollo.
+"""
+import argparse
+import json
+import os
+import sys
+
+from dotenv import load_dotenv
+
+DEFAULT_THRESHOLD = 0.20   # +20% en p95 se marca como regresión
+NOISE_FLOOR_MS = 1.0       # diferencias menores a 1 ms se ignoran
+COMPARED_METRICS = ("p95_ms", "p99_ms", "queries_per_op")
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compara dos documentos de resultados. Devuelve [(operación, métrica, antes, ahora, cambio)]
+    para lo que empeoró más de `threshold` (latencias además por encima de NOISE_FLOOR_MS;
+    cualquier consulta extra por operación cuenta).
+    """
+    regressions = []
+    base_results = baseline.get("results", {})
+    for name, cur in current.get("results", {}).items():
+        base = base_results.get(name)
+        if not base:
+            continue
+        for metric in COMPARED_METRICS:
+            before, after = base.get(metric), cur.get(metric)
+            if before is None or after is None:
+                continue
+            if metric == "queries_per_op":
+                worse = after > before
+            else:
+                worse = after > before * (1 + threshold) and after - before > NOISE_FLOOR_MS
+            if worse:
+                change = (after - before) / before if before else float("inf")
+                regressions.append((name, metric, before, after, change))
+        if cur.get("errors") and not base.get("errors"):
+            regressions.append((name, "errors", base.get("errors", 0), cur["errors"], float("inf")))
+    return regressions
+
+
+def _print_regressions(regressions):
+    if not regressions:
+        print("Sin regresiones contra el baseline.")
+        return
+    print(f"{len(regressions)} regresión(es):")
+    for name, metric, before, after, change in regressions:
+        pct = "nuevo" if change == float("inf") else f"{change:+.0%}"
+        print(f"  {name:45s} {metric:15s} {before} -> {after} ({pct})")
+
+
+def _use_bench_db():
+    load_dotenv()
+    from benchmarks.seed import bench_db_name
+    os.environ["DB_NAME"] = bench_db_name()
+    # Cada corrida mide con versiones de ETag propias (no comparte 304 con el server de desarrollo)
+    os.environ.setdefault("VERSIONS_DIR", os.path.join(os.getcwd(), ".bench_versions"))
+    os.environ.setdefault("EXPORT_CACHE_DIR", os.path.join(os.getcwd(), ".bench_export_cache"))
+
+
+def cmd_seed(args):
+    _use_bench_db()
+    from benchmarks.seed import PRESETS, seed
+    volumes = dict(PRESETS[args.size]) if args.size else {"products": 10_000, "orders": 10_000}
+    if args.products is not None:
+        volumes["products"] = args.products
+    if args.orders is not None:
+        volumes["orders"] = args.orders
+    seed(volumes["products"], volumes["orders"], categories=args.categories, suppliers=args.suppliers)
+
+
+def cmd_run(args):
+    _use_bench_db()
+    from api import create_app
+    from benchmarks.operations import BenchContext, all_operations
+    from benchmarks.runner import run_all
+    from benchmarks.seed import volumes
+
+    vols = volumes()
+    print(f"Base {os.environ['DB_NAME']}: {vols}")
+    app = create_app()
+    ctx = BenchContext(app, vols)
+    ctx.cleanup()
+
+    ops = all_operations(ctx)
+    if args.only:
+        ops = [op for op in ops if any(f in op.name for f in args.only)]
+    if args.skip_heavy:
+        ops = [op for op in ops if not op.heavy]
+
+    try:
+        doc = run_all(ops, iterations=args.iterations, warmup=args.warmup,
+                      heavy_iterations=args.heavy_iterations)
+    finally:
+        ctx.cleanup()
+    doc["meta"]["volumes"] = vols
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2, ensure_ascii=False)
+    print(f"Resultados en {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("volumes") != vols:
+            print("Aviso: el baseline se midió con otros volúmenes de datos.")
+        regressions = compare(doc, baseline, args.threshold)
+        _print_regressions(regressions)
+        return 1 if regressions else 0
+    return 0
+
+
+def cmd_overhead(args):
+    """
+    Costo de las métricas (/metrics): mide las rutas livianas con la recolección apagada y
+    prendida, alternando el orden en cada ronda. Exit 1 si el overhead total supera --max.
+    """
+    _use_bench_db()
+    os.environ["METRICS_ENABLED"] = "1"
+    os.environ.setdefault("METRICS_DIR", os.path.join(os.getcwd(), ".bench_metrics"))
+    from api import create_app
+    from api.utils import metrics
+    from benchmarks.operations import BenchContext, http_operations
+    from benchmarks.runner import QueryCounter, measure
+    from benchmarks.seed import volumes
+
+    app = create_app()
+    ctx = BenchContext(app, volumes())
+    ctx.cleanup()
+    ops = [op for op in http_operations(ctx) if not op.heavy]
+    if args.only:
+        ops = [op for op in ops if any(f in op.name for f in args.only)]
+
+    # Sin registrar el contador: con las métricas apagadas los cursores no se envuelven,
+    # igual que en producción con METRICS_ENABLED=0.
+    counter = QueryCounter()
+    totals = {op.name: {False: 0.0, True: 0.0} for op in ops}
+    try:
+        for rnd in range(args.rounds):
+            for enabled in ((False, True) if rnd % 2 == 0 else (True, False)):
+                metrics.set_enabled(enabled)
+                for op in ops:
+                    r = measure(op, args.iterations, args.warmup, counter)
+                    totals[op.name][enabled] += r["mean_ms"]
+    finally:
+        metrics.set_enabled(True)
+        ctx.cleanup()
+
+    for name, t in totals.items():
+        change = t[True] / t[False] - 1 if t[False] else 0.0
+        print(f"{name:45s} off {t[False] / args.rounds:9.3f} ms  on {t[True] / args.rounds:9.3f} ms  {change:+.1%}")
+    off = sum(t[False] for t in totals.values())
+    on = sum(t[True] for t in totals.values())
+    overhead = on / off - 1 if off else 0.0
+    print(f"Overhead total de las métricas: {overhead:+.2%} (máximo {args.max:.0%})")
+    return 1 if overhead > args.max else 0
+
+
+def cmd_loadtest(args):
+    """Misma carga contra cada modo de servidor (dev, gunicorn, asgi) y tabla comparativa."""
+    _use_bench_db()
+    from flask_jwt_extended import create_access_token
+    from api import create_app
+    from benchmarks.loadtest import DEFAULT_PATHS, MODES, free_port, run_load, start_server, stop_server
+
+    with create_app().app_context():
+        headers = {"Authorization": f"Bearer {create_access_token(identity='1:admin')}"}
+    paths = args.path or DEFAULT_PATHS
+
+    doc = {"meta": {"concurrency": args.concurrency, "duration_s": args.duration, "paths": list(paths),
+                    "web_workers": os.getenv("WEB_WORKERS"), "web_threads": os.getenv("WEB_THREADS")},
+           "results": {}}
+    for mode in args.mode or MODES:
+        port = free_port()
+        print(f"[{mode}] arrancando en el puerto {port}...")
+        proc = start_server(mode, port)
+        try:
+            run_load(f"http://127.0.0.1:{port}", paths, headers, concurrency=args.concurrency,
+                     duration=min(3.0, args.duration), processes=args.client_processes)   # calentamiento
+            r = run_load(f"http://127.0.0.1:{port}", paths, headers, concurrency=args.concurrency,
+                         duration=args.duration, processes=args.client_processes)
+        finally:
+            stop_server(proc)
+        doc["results"][mode] = r
+        print(f"[{mode}] {r['throughput_rps']} req/s  p50 {r['p50_ms']} ms  p95 {r['p95_ms']} ms  "
+              f"p99 {r['p99_ms']} ms  errores {r['errors']}  status {r['statuses']}")
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2, ensure_ascii=False)
+    print(f"Resultados en {args.out}")
+    return 0
+
+
+def cmd_startup(args):
+    """
+    import + create_app() en subprocesos nuevos. Exit 1 si la mediana supera --budget-ms o si
+    quedó importado algún backend que debería cargarse a demanda (PDF).
+    """
+    load_dotenv()
+    from benchmarks.startup import measure, top_imports
+
+    r = measure(args.runs)
+    print(f"Arranque ({r['runs']} corridas): import {r['import_ms']} ms + create_app {r['create_app_ms']} ms "
+          f"= {r['total_ms']} ms (peor {r['max_total_ms']} ms), {r['modules']} módulos")
+    print("Imports más caros:")
+    for module, ms in top_imports(args.top):
+        print(f"  {module:45s} {ms:9.1f} ms")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(r, f, indent=2)
+
+    failed = False
+    if r["loaded_lazy"]:
+        print(f"Importados al arrancar (deberían ser a demanda): {', '.join(r['loaded_lazy'])}")
+        failed = True
+    if r["total_ms"] > args.budget_ms:
+        print(f"Arranque por encima del presupuesto: {r['total_ms']} ms > {args.budget_ms} ms")
+        failed = True
+    else:
+        print(f"Dentro del presupuesto ({args.budget_ms} ms).")
+    return 1 if failed else 0
+
+
+def cmd_pdf(args):
+    """Motor de PDF con filas sintéticas. Exit 1 si el pico de memoria supera --max-mb."""
+    from benchmarks.pdf import measure
+
+    results = []
+    for rows in args.rows or (10_000, 100_000):
+        r = measure(rows)
+        results.append(r)
+        print(f"{r['rows']:>9} filas  {r['pages']:>6} páginas  {r['seconds']:7.2f} s  "
+              f"{r['rows_per_s']} filas/s  {r['file_mb']:6.2f} MB  pico {r['peak_mb']:.2f} MB")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    peak = max(r["peak_mb"] for r in results)
+    if peak > args.max_mb:
+        print(f"Pico de memoria por encima del máximo: {peak} MB > {args.max_mb} MB")
+        return 1
+    return 0
+
+
+def cmd_compare(args):
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(current, baseline, args.threshold)
+    _print_regressions(regressions)
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks del inventario")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("seed", help="Recrea y llena la base de benchmark")
+    p.add_argument("--size", choices=("10k", "100k", "1m"))
+    p.add_argument("--products", type=int)
+    p.add_argument("--orders", type=int)
+    p.add_argument("--categories", type=int, default=50)
+    p.add_argument("--suppliers", type=int, default=200)
+    p.set_defaults(func=cmd_seed)
+
+    p = sub.add_parser("run", help="Mide todas las operaciones y guarda el JSON")
+    p.add_argument("--out", default="benchmark_results.json")
+    p.add_argument("--baseline", help="JSON previo para detectar regresiones (exit 1 si hay)")
+    p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    p.add_argument("--iterations", type=int, default=50)
+    p.add_argument("--warmup", type=int, default=5)
+    p.add_argument("--heavy-iterations", type=int, default=3)
+    p.add_argument("--skip-heavy", action="store_true", help="Omite listados completos y exportaciones")
+    p.add_argument("--only", action="append", help="Filtra por subcadena del nombre (repetible)")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("overhead", help="Costo de las métricas de /metrics (apagadas vs. prendidas)")
+    p.add_argument("--rounds", type=int, default=4)
+    p.add_argument("--iterations", type=int, default=50)
+    p.add_argument("--warmup", type=int, default=3)
+    p.add_argument("--max", type=float, default=0.02, help="Overhead máximo aceptado (default 2%%)")
+    p.add_argument("--only", action="append", help="Filtra por subcadena del nombre (repetible)")
+    p.set_defaults(func=cmd_overhead)
+
+    p = sub.add_parser("loadtest", help="Carga HTTP real: servidor de desarrollo vs. gunicorn vs. ASGI")
+    p.add_argument("--mode", action="append", choices=("dev", "gunicorn", "asgi"), help="Default: todos")
+    p.add_argument("--concurrency", type=int, default=32)
+    p.add_argument("--duration", type=float, default=20.0, help="Segundos por modo")
+    p.add_argument("--client-processes", type=int, default=4)
+    p.add_argument("--path", action="append", help="Rutas GET a pedir (repetible; default: lecturas comunes)")
+    p.add_argument("--out", default="loadtest_results.json")
+    p.set_defaults(func=cmd_loadtest)
+
+    p = sub.add_parser("startup", help="Tiempo de import + create_app() contra un presupuesto")
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", 1000)),
+                   help="Mediana máxima aceptada (default STARTUP_BUDGET_MS o 1000)")
+    p.add_argument("--top", type=int, default=10, help="Cuántos imports caros listar")
+    p.add_argument("--out", help="Guarda el resultado en JSON")
+    p.set_defaults(func=cmd_startup)
+
+    p = sub.add_parser("pdf", help="Motor de PDF: tiempo y memoria con N filas sintéticas")
+    p.add_argument("--rows", type=int, action="append", help="Filas por corrida (repetible; default 10k y 100k)")
+    p.add_argument("--max-mb", type=float, default=8.0, help="Pico de memoria máximo aceptado (default 8)")
+    p.add_argument("--out", help="Guarda los resultados en JSON")
+    p.set_defaults(func=cmd_pdf)
+
+    p = sub.add_parser("compare", help="Compara dos JSON de resultados")
+    p.add_argument("current")
+    p.add_argument("baseline")
+    p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    p.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
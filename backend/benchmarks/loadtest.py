@@ -0,0 +1,165 @@
+# benchmarks/loadtest.py
+"""
+Prueba de carga HTTP real: levanta el servidor en cada modo y le pega con clientes concurrentes.
+
+- dev: `python main.py` (servidor de Werkzeug con DEBUG=true, como se venía usando).
+- gunicorn: `python main.py serve` (gunicorn.conf.py; WEB_WORKERS/WEB_THREADS del entorno).
+- asgi: `python main.py asgi` (uvicorn + api/aio: lecturas con aiomysql, el resto en Flask).
+Los clientes corren en varios procesos (cada uno con hilos y conexiones keep-alive) para que
+el GIL del generador de carga no sea el cuello de botella.
+"""
+import http.client
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from benchmarks.runner import percentile
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+
+MODES = {
+    "dev": ([sys.executable, "main.py"], {"DEBUG": "true"}),
+    "gunicorn": ([sys.executable, "main.py", "serve"], {}),
+    "asgi": ([sys.executable, "main.py", "asgi"], {}),
+}
+
+DEFAULT_PATHS = (
+    "/products?limit=50",
+    "/products/search?q=caf&limit=10",
+    "/categories?limit=50",
+    "/suppliers?limit=50",
+    "/orders?status=pending&limit=50",
+    "/dashboard/metrics",
+    "/reports/stock-by-category",
+    "/reports/low-stock?threshold=5",
+    "/health",
+)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode, port, env=None, ready_timeout=30):
+    cmd, mode_env = MODES[mode]
+    full_env = {**os.environ, **(env or {}), **mode_env, "HOST": "127.0.0.1", "PORT": str(port)}
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=full_env, start_new_session=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + ready_timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"El servidor '{mode}' terminó al arrancar (exit {proc.returncode})")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    stop_server(proc)
+    raise RuntimeError(f"El servidor '{mode}' no respondió en {ready_timeout}s")
+
+
+def stop_server(proc, timeout=30):
+    """SIGTERM al grupo (gunicorn drena los requests en curso; el reloader de dev tiene hijos)."""
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait(timeout=timeout)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+def _client_process(base_url, paths, headers, threads, duration, seed):
+    """Un proceso cliente: `threads` hilos pidiendo rutas al azar durante `duration` segundos."""
+    parts = urlsplit(base_url)
+    deadline = time.monotonic() + duration
+    latencies, statuses, errors = [], {}, [0]
+    lock = threading.Lock()
+
+    def worker(n):
+        rnd = random.Random(f"{seed}:{n}")
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+        local_lat, local_status, local_err = [], {}, 0
+        reused = False
+        while time.monotonic() < deadline:
+            path = rnd.choice(paths)
+            start = time.perf_counter()
+            for attempt in (1, 2):
+                try:
+                    conn.request("GET", path, headers=headers)
+                    resp = conn.getresponse()
+                    resp.read()
+                    local_lat.append(time.perf_counter() - start)
+                    local_status[resp.status] = local_status.get(resp.status, 0) + 1
+                    reused = True
+                    if resp.getheader("Connection", "").lower() == "close":
+                        conn.close()
+                        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+                        reused = False
+                    break
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+                    # Conexión keep-alive cerrada por el server (p. ej. un worker que reinicia por
+                    # max_requests): se reintenta una vez, como haría un navegador.
+                    if attempt == 1 and reused:
+                        reused = False
+                        continue
+                    local_err += 1
+                    break
+        conn.close()
+        with lock:
+            latencies.extend(local_lat)
+            for k, v in local_status.items():
+                statuses[k] = statuses.get(k, 0) + v
+            errors[0] += local_err
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return latencies, statuses, errors[0]
+
+
+def run_load(base_url, paths, headers, concurrency=32, duration=20.0, processes=4):
+    """Carga con `concurrency` conexiones simultáneas repartidas en `processes` procesos."""
+    processes = max(1, min(processes, concurrency))
+    per_proc = [concurrency // processes + (1 if i < concurrency % processes else 0) for i in range(processes)]
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(processes) as pool:
+        parts = pool.starmap(_client_process, [
+            (base_url, list(paths), headers, n, duration, i) for i, n in enumerate(per_proc)
+        ])
+
+    latencies, statuses, errors = [], {}, 0
+    for lat, st, err in parts:
+        latencies.extend(lat)
+        for k, v in st.items():
+            statuses[str(k)] = statuses.get(str(k), 0) + v
+        errors += err
+    ms = sorted(x * 1000 for x in latencies)
+    return {
+        "requests": len(ms),
+        "errors": errors,
+        "statuses": statuses,
+        # Cada cliente corre `duration` segundos desde que arranca (el spawn no cuenta)
+        "throughput_rps": round(len(ms) / duration, 1),
+        "p50_ms": round(percentile(ms, 50), 2) if ms else None,
+        "p95_ms": round(percentile(ms, 95), 2) if ms else None,
+        "p99_ms": round(percentile(ms, 99), 2) if ms else None,
+        "max_ms": round(ms[-1], 2) if ms else None,
+    }
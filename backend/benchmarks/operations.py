@@ -0,0 +1,282 @@
+# benchmarks/operations.py
+"""
+Catálogo de operaciones a medir.
+
+- http.*: cada ruta de los blueprints a través del test client de Flask (con JWT de admin).
+- model.*: métodos de api/models llamados directo, sin HTTP.
+Las escrituras preparan y limpian sus filas en setup/teardown (fuera del tiempo medido),
+así la base queda igual que antes de correr.
+"""
+import io
+import json
+import random
+from datetime import date, timedelta
+
+from benchmarks.runner import Operation
+
+TMP_PREFIX = "bench-tmp"
+
+
+class BenchContext:
+    """App, cliente, token y acceso directo a la base para preparar datos."""
+
+    def __init__(self, app, volumes, seed_value=7):
+        from flask_jwt_extended import create_access_token
+        self.app = app
+        self.client = app.test_client()
+        self.volumes = volumes
+        self.rnd = random.Random(seed_value)
+        with app.app_context():
+            self.headers = {"Authorization": f"Bearer {create_access_token(identity='1:admin')}"}
+
+    # ---------- SQL directo (setup/teardown) ----------
+
+    def sql(self, statement, params=(), fetch=False):
+        from api.db.db_config import get_pool
+        conn = get_pool().acquire()
+        try:
+            cur = conn.cursor()
+            cur.execute(statement, params)
+            rows = cur.fetchall() if fetch else None
+            last_id = cur.lastrowid
+            conn.commit()
+            cur.close()
+            return rows if fetch else last_id
+        finally:
+            conn.release()
+
+    def random_id(self, table):
+        return self.rnd.randint(1, max(1, self.volumes.get(table, 1)))
+
+    def temp_product(self, category_id=1):
+        return self.sql(
+            "INSERT INTO products (name, price, stock, category_id) VALUES (%s, 1, 1, %s)",
+            (f"{TMP_PREFIX} {self.rnd.random()}", category_id),
+        )
+
+    def cleanup(self):
+        """Borra restos de corridas interrumpidas."""
+        self.sql("DELETE o FROM orders o JOIN products p ON p.id = o.product_id WHERE p.name LIKE %s",
+                 (f"{TMP_PREFIX}%",))
+        self.sql("DELETE FROM products WHERE name LIKE %s", (f"{TMP_PREFIX}%",))
+        self.sql("DELETE FROM categories WHERE name LIKE %s", (f"{TMP_PREFIX}%",))
+        self.sql("DELETE FROM suppliers WHERE name LIKE %s", (f"{TMP_PREFIX}%",))
+        self.sql("DELETE FROM users WHERE username LIKE %s", (f"{TMP_PREFIX}%",))
+
+    # ---------- HTTP ----------
+
+    def request(self, method, path, expected=(200,), **kwargs):
+        headers = {**self.headers, **kwargs.pop("headers", {})}
+        resp = self.client.open(path, method=method, headers=headers, **kwargs)
+        body = resp.get_data()  # consume el stream completo (exports)
+        if resp.status_code not in expected:
+            raise RuntimeError(f"{method} {path} -> {resp.status_code}: {body[:200]!r}")
+        return resp
+
+
+def _get(ctx, name, path, heavy=False, setup=None, **kwargs):
+    """GET medido; `path` puede ser una función (p. ej. para ids al azar en cada iteración)."""
+    resolve = path if callable(path) else (lambda: path)
+    return Operation(f"http.GET {name}", lambda _: ctx.request("GET", resolve(), **kwargs),
+                     setup=setup, heavy=heavy)
+
+
+def _cold_export():
+    """Vacía el cache de exports: la iteración mide la generación completa del archivo."""
+    from api.utils import export_cache
+    export_cache.clear()
+
+
+def _crud_ops(ctx, table, path, name_col, payload):
+    """POST / PUT / DELETE de una tabla simple (categories, suppliers, users)."""
+    def cleanup(_=None):
+        ctx.sql(f"DELETE FROM {table} WHERE {name_col} LIKE %s", (f"{TMP_PREFIX}%",))
+
+    def create_row():
+        data = payload()
+        cols = list(data)
+        return ctx.sql(f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join(['%s'] * len(cols))})",
+                       tuple(data[k] for k in cols))
+
+    return [
+        Operation(f"http.POST {path}", teardown=cleanup,
+                  run=lambda _: ctx.request("POST", path, expected=(201,), json=payload())),
+        Operation(f"http.PUT {path}/<id>", setup=create_row, teardown=cleanup,
+                  run=lambda row_id: ctx.request("PUT", f"{path}/{row_id}", json=payload())),
+        Operation(f"http.DELETE {path}/<id>", setup=create_row,
+                  run=lambda row_id: ctx.request("DELETE", f"{path}/{row_id}")),
+    ]
+
+
+def http_operations(ctx):
+    today = date.today()
+    year_ago = (today - timedelta(days=365)).isoformat()
+    rid = ctx.random_id
+    ops = [
+        # ---- lecturas ----
+        _get(ctx, "/products (page)", "/products?limit=50"),
+        _get(ctx, "/products (page, filtered)", "/products?limit=50&min_price=100&max_price=500&category_id=3"),
+        _get(ctx, "/products (deep cursor)", lambda: f"/products?limit=50&after_id={rid('products') // 2}"),
+        _get(ctx, "/products?all", "/products?all=1", heavy=True),
+        _get(ctx, "/products/search (prefix)", "/products/search?q=caf&limit=10"),
+        _get(ctx, "/products/search (tokens)", "/products/search?q=premium%20mouse&limit=10"),
+        _get(ctx, "/categories", "/categories?limit=50"),
+        _get(ctx, "/suppliers", "/suppliers?limit=50"),
+        _get(ctx, "/users", "/users?limit=50"),
+        _get(ctx, "/orders", "/orders", heavy=True),
+        _get(ctx, "/orders (filtered)", lambda: f"/orders?status=pending&product_id={rid('products')}"),
+        _get(ctx, "/orders/<id>", lambda: f"/orders/{rid('orders')}"),
+        _get(ctx, "/dashboard/metrics", "/dashboard/metrics"),
+        _get(ctx, "/reports/stock-by-category", "/reports/stock-by-category"),
+        _get(ctx, "/reports/orders-history", "/reports/orders-history"),
+        _get(ctx, "/reports/orders-history (day)", f"/reports/orders-history?granularity=day&from={year_ago}"),
+        _get(ctx, "/reports/low-stock", "/reports/low-stock?threshold=5"),
+        _get(ctx, "/auth/validate", "/auth/validate"),
+        # ---- exportaciones (respuesta completa, generando el archivo en cada iteración) ----
+        _get(ctx, "/products/export/csv", "/products/export/csv", heavy=True, setup=_cold_export),
+        _get(ctx, "/categories/export/csv", "/categories/export/csv", setup=_cold_export),
+        _get(ctx, "/suppliers/export/csv", "/suppliers/export/csv", setup=_cold_export),
+        _get(ctx, "/reports/stock-by-category/export/csv", "/reports/stock-by-category/export/csv",
+             setup=_cold_export),
+        _get(ctx, "/reports/orders-history/export/csv", "/reports/orders-history/export/csv",
+             setup=_cold_export),
+        _get(ctx, "/products/export/pdf", "/products/export/pdf", heavy=True, setup=_cold_export),
+        _get(ctx, "/categories/export/pdf", "/categories/export/pdf", heavy=True, setup=_cold_export),
+        _get(ctx, "/suppliers/export/pdf", "/suppliers/export/pdf", heavy=True, setup=_cold_export),
+        _get(ctx, "/reports/stock-by-category/export/pdf", "/reports/stock-by-category/export/pdf",
+             heavy=True, setup=_cold_export),
+        _get(ctx, "/reports/orders-history/export/pdf", "/reports/orders-history/export/pdf",
+             heavy=True, setup=_cold_export),
+        # ---- exportaciones servidas desde el cache (utils/export_cache.py) ----
+        _get(ctx, "/products/export/csv (cache)", "/products/export/csv"),
+        _get(ctx, "/products/export/pdf (cache)", "/products/export/pdf"),
+        _get(ctx, "/products/export/pdf (cache, Range)", "/products/export/pdf",
+             expected=(206,), headers={"Range": "bytes=0-65535"}),
+    ]
+
+    # ---- auth ----
+    ops.append(Operation("http.POST /auth/login", lambda _: ctx.request(
+        "POST", "/auth/login", json={"username": "user2", "password": "bench"})))
+
+    # ---- products ----
+    ops.append(Operation(
+        "http.POST /products",
+        run=lambda _: ctx.request("POST", "/products", expected=(201,), json={
+            "name": f"{TMP_PREFIX} {ctx.rnd.random()}", "price": 10, "stock": 5, "category_id": 1}),
+        teardown=lambda _: ctx.sql("DELETE FROM products WHERE name LIKE %s", (f"{TMP_PREFIX}%",)),
+    ))
+    ops.append(Operation(
+        "http.PUT /products/<id>",
+        setup=lambda: ctx.temp_product(),
+        run=lambda pid: ctx.request("PUT", f"/products/{pid}", json={
+            "name": f"{TMP_PREFIX} upd {pid}", "price": 12, "stock": 7, "category_id": 2}),
+        teardown=lambda pid: ctx.sql("DELETE FROM products WHERE id = %s", (pid,)),
+    ))
+    ops.append(Operation(
+        "http.DELETE /products/<id>",
+        setup=lambda: ctx.temp_product(),
+        run=lambda pid: ctx.request("DELETE", f"/products/{pid}"),
+    ))
+
+    def bulk_body():
+        rows = [{"name": f"{TMP_PREFIX} bulk {i}", "price": 1.5, "stock": i % 50,
+                 "category_id": 1 + i % 5} for i in range(1000)]
+        return json.dumps(rows).encode("utf-8")
+    ops.append(Operation(
+        "http.POST /products/bulk (1000 rows)",
+        setup=bulk_body,
+        run=lambda body: ctx.request("POST", "/products/bulk", expected=(201,), data=io.BytesIO(body),
+                                     headers={"Content-Type": "application/json"}),
+        teardown=lambda _: ctx.sql("DELETE FROM products WHERE name LIKE %s", (f"{TMP_PREFIX} bulk%",)),
+    ))
+
+    # ---- categories / suppliers / users ----
+    ops += _crud_ops(ctx, "categories", "/categories", "name",
+                     lambda: {"name": f"{TMP_PREFIX} {ctx.rnd.random()}"})
+    ops += _crud_ops(ctx, "suppliers", "/suppliers", "name",
+                     lambda: {"name": f"{TMP_PREFIX} {ctx.rnd.random()}", "contact": "bench"})
+    ops += _crud_ops(ctx, "users", "/users", "username",
+                     lambda: {"username": f"{TMP_PREFIX}{ctx.rnd.randint(0, 10**9)}",
+                              "password": "bench", "role": "general"})
+
+    # ---- orders ----
+    def temp_order():
+        pid = ctx.temp_product()
+        oid = ctx.sql("INSERT INTO orders (product_id, quantity, status, user_id) VALUES (%s, 3, 'pending', 1)", (pid,))
+        return pid, oid
+
+    def drop_order(ids):
+        pid, oid = ids
+        ctx.sql("DELETE FROM orders WHERE id = %s", (oid,))
+        ctx.sql("DELETE FROM products WHERE id = %s", (pid,))
+
+    ops.append(Operation(
+        "http.POST /orders",
+        setup=lambda: ctx.temp_product(),
+        run=lambda pid: ctx.request("POST", "/orders", expected=(201,), json={"product_id": pid, "quantity": 2}),
+        teardown=lambda pid: (ctx.sql("DELETE FROM orders WHERE product_id = %s", (pid,)),
+                              ctx.sql("DELETE FROM products WHERE id = %s", (pid,))),
+    ))
+    ops.append(Operation(
+        "http.PUT /orders/<id> (receive)",
+        setup=temp_order,
+        run=lambda ids: ctx.request("PUT", f"/orders/{ids[1]}", json={"status": "received"}),
+        teardown=drop_order,
+    ))
+    ops.append(Operation(
+        "http.DELETE /orders/<id>",
+        setup=temp_order,
+        run=lambda ids: ctx.request("DELETE", f"/orders/{ids[1]}"),
+        teardown=lambda ids: ctx.sql("DELETE FROM products WHERE id = %s", (ids[0],)),
+    ))
+
+    # ---- exports asíncronos (sólo el encolado y la consulta de estado) ----
+    ops.append(Operation(
+        "http.POST /exports",
+        run=lambda _: ctx.request("POST", "/exports", expected=(202, 429), json={"kind": "stock_by_category_pdf"}),
+        heavy=True,
+    ))
+    return ops
+
+
+def model_operations(ctx):
+    from api.models.product import Product
+    from api.models.category import Category
+    from api.models.category_stock import CategoryStock
+    from api.models.order import Order
+    from api.models.order_rollup import OrderRollup, default_range
+    from api.models.reports import Report
+    from api.models.supplier import Supplier
+
+    def category_with_products(n=100):
+        cid = ctx.sql("INSERT INTO categories (name) VALUES (%s)", (f"{TMP_PREFIX} {ctx.rnd.random()}",))
+        for _ in range(n):
+            ctx.temp_product(category_id=cid)
+        return cid
+
+    d_from, d_to = default_range()
+    return [
+        Operation("model.Product.get_all_with_category_supplier",
+                  lambda _: Product.get_all_with_category_supplier(), heavy=True),
+        Operation("model.Product.get_by_id_with_category_supplier",
+                  lambda _: Product.get_by_id_with_category_supplier(ctx.random_id("products"))),
+        Operation("model.Product.get_products_by_user",
+                  lambda _: Product.get_products_by_user(ctx.random_id("users")), heavy=True),
+        Operation("model.Category.get_all", lambda _: Category.get_all()),
+        Operation("model.Category.delete (reassign 100)",
+                  setup=category_with_products,
+                  run=lambda cid: Category.delete(cid, reassign_to=1),
+                  teardown=lambda _: ctx.sql("DELETE FROM products WHERE name LIKE %s", (f"{TMP_PREFIX}%",))),
+        Operation("model.CategoryStock.get_all", lambda _: CategoryStock.get_all()),
+        Operation("model.Supplier.get_all", lambda _: Supplier.get_all()),
+        Operation("model.Order.get_all_orders", lambda _: Order.get_all_orders(), heavy=True),
+        Operation("model.OrderRollup.history (month)", lambda _: OrderRollup.history(d_from, d_to, "month")),
+        Operation("model.OrderRollup.history (day)", lambda _: OrderRollup.history(d_from, d_to, "day")),
+        Operation("model.Report.low_stock", lambda _: Report.low_stock(5), heavy=True),
+        Operation("model.Report.orders_history", lambda _: Report.orders_history(), heavy=True),
+        Operation("model.Report.current_inventory", lambda _: Report.current_inventory(), heavy=True),
+    ]
+
+
+def all_operations(ctx):
+    return http_operations(ctx) + model_operations(ctx)
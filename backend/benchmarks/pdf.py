@@ -0,0 +1,54 @@
+# benchmarks/pdf.py
+"""
+Motor de PDF (api/utils/pdf.py) con filas sintéticas, sin base de datos: tiempo, páginas,
+tamaño y pico de memoria por cantidad de filas. El pico tiene que ser el mismo con 10k que
+con 100k filas (sólo se arma una página a la vez).
+
+El tiempo se mide en una pasada y la memoria (tracemalloc, que hace más lento todo) en otra.
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+
+from api.utils import pdf
+
+COLUMNS = ["ID", "Nombre", "Precio", "Stock", "Categoría"]
+WIDTHS = (1, 5, 1.5, 1, 3)
+
+
+def synthetic_rows(n):
+    """Filas como las del PDF de productos (nombres de largo variable, algunos cortados)."""
+    for i in range(1, n + 1):
+        name = f"Producto {i:06d} " + "ñandú extra " * (i % 7)
+        yield (i, name, "%.2f" % (i * 1.37 % 5000), i % 500, f"Categoría {i % 50}")
+
+
+def _render(rows, dest):
+    return pdf.write_table(dest, "Productos", COLUMNS, synthetic_rows(rows), widths=WIDTHS, align="LLRRL")
+
+
+def measure(rows):
+    with tempfile.TemporaryFile() as f:
+        start = time.perf_counter()
+        _render(rows, f)
+        elapsed = time.perf_counter() - start
+        size = f.tell()
+
+    tracemalloc.start()
+    try:
+        with open(os.devnull, "wb") as f:
+            _render(rows, f)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    per_page = pdf._Layout(COLUMNS, WIDTHS, None).rows_per_page
+    return {
+        "rows": rows,
+        "pages": max(1, -(-rows // per_page)),
+        "seconds": round(elapsed, 2),
+        "rows_per_s": round(rows / elapsed) if elapsed else None,
+        "file_mb": round(size / 1e6, 2),
+        "peak_mb": round(peak / 1e6, 2),
+    }
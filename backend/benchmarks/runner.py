@@ -0,0 +1,161 @@
+# benchmarks/runner.py
+"""
+Mide cada operación (rutas vía test client de Flask y métodos de modelos llamados
+directo) y devuelve p50/p95/p99, throughput, RSS pico y consultas por iteración.
+"""
+import gc
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+@dataclass
+class Operation:
+    """
+    name: identificador estable (clave en el JSON de resultados)
+    run: la parte medida; recibe lo que devolvió setup (o None)
+    setup/teardown: preparan/limpian cada iteración, fuera del tiempo medido
+    heavy: exportaciones completas; corren con menos iteraciones (o se saltean)
+    """
+    name: str
+    run: Callable
+    setup: Optional[Callable] = None
+    teardown: Optional[Callable] = None
+    heavy: bool = False
+
+
+def peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # macOS informa bytes
+
+
+def percentile(sorted_values, pct):
+    """Percentil con interpolación lineal (valores ya ordenados)."""
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class QueryCounter:
+    """Observador de consultas (api.db.db_config): cuenta y acumula tiempo."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, statement, params, elapsed, error):
+        self.count += 1
+        self.seconds += elapsed
+
+    def reset(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+def measure(op, iterations, warmup, counter):
+    """Corre `op` y devuelve el dict de métricas."""
+    first_error = None
+    for _ in range(warmup):
+        ctx = op.setup() if op.setup else None
+        try:
+            op.run(ctx)
+        except Exception as e:
+            first_error = first_error or repr(e)
+        finally:
+            if op.teardown:
+                op.teardown(ctx)
+
+    gc.collect()
+    rss_before = peak_rss_kb()
+    latencies, queries, query_seconds, errors = [], 0, 0.0, 0
+    for _ in range(iterations):
+        ctx = op.setup() if op.setup else None
+        counter.reset()
+        start = time.perf_counter()
+        try:
+            op.run(ctx)
+        except Exception as e:
+            errors += 1
+            first_error = first_error or repr(e)
+        latencies.append(time.perf_counter() - start)
+        queries += counter.count
+        query_seconds += counter.seconds
+        if op.teardown:
+            op.teardown(ctx)
+    rss_after = peak_rss_kb()
+
+    ms = sorted(x * 1000 for x in latencies)
+    total = sum(latencies)
+    out = {
+        "iterations": iterations,
+        "errors": errors,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "max_ms": round(ms[-1], 3),
+        "throughput_ops_s": round(iterations / total, 2) if total else None,
+        "queries_per_op": round(queries / iterations, 2),
+        "db_ms_per_op": round(query_seconds * 1000 / iterations, 3),
+        "peak_rss_kb": rss_after,
+        "rss_growth_kb": (rss_after - rss_before) if rss_after is not None else None,
+    }
+    if first_error:
+        out["first_error"] = first_error[:300]
+    return out
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run_all(operations, iterations=50, warmup=5, heavy_iterations=3, echo=print):
+    """Mide todas las operaciones; devuelve el documento JSON completo (sin volúmenes)."""
+    from api.db.db_config import add_query_observer, remove_query_observer
+
+    counter = add_query_observer(QueryCounter())
+    results = {}
+    try:
+        for op in operations:
+            n = heavy_iterations if op.heavy else iterations
+            w = min(1, warmup) if op.heavy else warmup
+            results[op.name] = measure(op, n, w, counter)
+            r = results[op.name]
+            echo(f"{op.name:45s} p50 {r['p50_ms']:9.2f} ms  p95 {r['p95_ms']:9.2f} ms  "
+                 f"p99 {r['p99_ms']:9.2f} ms  {r['queries_per_op']:6.1f} q/op"
+                 + (f"  ERRORES {r['errors']}" if r["errors"] else ""))
+    finally:
+        remove_query_observer(counter)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pid": os.getpid(),
+            "iterations": iterations,
+            "warmup": warmup,
+        },
+        "results": results,
+    }
@@ -0,0 +1,43 @@
+# benchmarks/seed.py
+"""
+Carga la base de benchmark con volúmenes configurables.
+
+Usa el generador de datagen/ (esquema real + datos reproducibles) sobre otra base
+(BENCH_DB_NAME, default mi_inventario_bench) para no tocar los datos de desarrollo.
+"""
+import os
+
+import mysql.connector
+
+from datagen.loader import generate, server_config
+
+PRESETS = {
+    "10k":  {"products": 10_000,    "orders": 10_000},
+    "100k": {"products": 100_000,   "orders": 100_000},
+    "1m":   {"products": 1_000_000, "orders": 1_000_000},
+}
+BENCH_PASSWORD = "bench"   # la usa la operación http.auth.login
+
+
+def bench_db_name():
+    return os.getenv("BENCH_DB_NAME", "mi_inventario_bench")
+
+
+def seed(products, orders, categories=50, suppliers=200, users=20, seed_value=42, echo=print):
+    """Recrea la base de benchmark y la llena. Devuelve los conteos cargados."""
+    return generate(bench_db_name(), products, orders, categories=categories, suppliers=suppliers,
+                    users=users, seed=seed_value, password=BENCH_PASSWORD,
+                    admin_password=BENCH_PASSWORD, echo=echo)
+
+
+def volumes():
+    """Conteos actuales de la base de benchmark (van en los resultados)."""
+    conn = mysql.connector.connect(**server_config(bench_db_name()))
+    cur = conn.cursor()
+    out = {}
+    for table in ("products", "orders", "categories", "suppliers", "users"):
+        cur.execute(f"SELECT COUNT(*) FROM {table}")
+        out[table] = cur.fetchone()[0]
+    cur.close()
+    conn.close()
+    return out
@@ -0,0 +1,74 @@
+# benchmarks/startup.py
+"""
+Tiempo de arranque: `import api` + `create_app()` en intérpretes nuevos (lo que paga cada
+worker de gunicorn/uvicorn, cada comando `flask ...` y cada script).
+
+Cada corrida es un subproceso limpio; se informa la mediana y el peor caso, los módulos más
+caros según `python -X importtime` y si quedó importada alguna librería pesada de PDF (las
+exportaciones usan el motor propio de api/utils/pdf.py; ninguna tiene que cargarse al arrancar).
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+
+from benchmarks.runner import percentile
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+
+# No deberían estar en sys.modules después de create_app()
+LAZY_MODULES = ("xhtml2pdf", "reportlab", "pyhanko")
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import api
+t1 = time.perf_counter()
+api.create_app()
+t2 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "create_app_ms": (t2 - t1) * 1000,
+    "modules": len(sys.modules),
+    "loaded_lazy": sorted({m.split(".")[0] for m in sys.modules} & set(%r)),
+}))
+""" % (LAZY_MODULES,)
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _run(args, env=None):
+    return subprocess.run([sys.executable, *args], cwd=BACKEND_DIR, capture_output=True, text=True,
+                          env={**os.environ, **(env or {})}, check=True)
+
+
+def measure_once():
+    return json.loads(_run(["-c", _PROBE]).stdout.strip().splitlines()[-1])
+
+
+def top_imports(limit=10):
+    """[(módulo, ms acumulados)] de los imports de primer nivel más caros."""
+    stderr = _run(["-X", "importtime", "-c", "import api; api.create_app()"]).stderr
+    top = []
+    for line in stderr.splitlines():
+        m = _IMPORTTIME_RE.match(line)
+        # Sólo los imports directos (sin sangría): su tiempo acumulado ya incluye a los hijos
+        if m and len(m.group(3)) == 1:
+            top.append((m.group(4), int(m.group(2)) / 1000))
+    top.sort(key=lambda item: item[1], reverse=True)
+    return top[:limit]
+
+
+def measure(runs=5):
+    samples = [measure_once() for _ in range(runs)]
+    totals = sorted(s["import_ms"] + s["create_app_ms"] for s in samples)
+    return {
+        "runs": runs,
+        "import_ms": round(percentile(sorted(s["import_ms"] for s in samples), 50), 1),
+        "create_app_ms": round(percentile(sorted(s["create_app_ms"] for s in samples), 50), 1),
+        "total_ms": round(percentile(totals, 50), 1),
+        "max_total_ms": round(totals[-1], 1),
+        "modules": samples[-1]["modules"],
+        "loaded_lazy": sorted({m for s in samples for m in s["loaded_lazy"]}),
+    }
@@ -0,0 +1,2 @@
+# datagen/__init__.py
+"""Generador de datos sintéticos a escala de producción (ver __main__.py)."""
@@ -0,0 +1,61 @@
+# datagen/__main__.py
+"""
+Uso (desde backend/, con las variables DB_* del .env):
+
+    python -m datagen --size medium --yes
+    python -m datagen --products 200000 --orders 5000000 --years 5 --seed 7 --database otra_base --yes
+
+Borra y recrea la base indicada (default DB_NAME) con el esquema de api/settings y la llena
+con datos reproducibles: misma semilla y volúmenes => mismos datos.
+"""
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+PRESETS = {
+    "small":  {"products": 1_000,   "orders": 20_000,    "suppliers": 50},
+    "medium": {"products": 50_000,  "orders": 1_000_000, "suppliers": 500},
+    "large":  {"products": 200_000, "orders": 5_000_000, "suppliers": 2_000},
+}
+
+
+def main(argv=None):
+    load_dotenv()
+    parser = argparse.ArgumentParser(prog="python -m datagen", description="Datos sintéticos del inventario")
+    parser.add_argument("--size", choices=tuple(PRESETS), default="small")
+    parser.add_argument("--products", type=int)
+    parser.add_argument("--orders", type=int)
+    parser.add_argument("--suppliers", type=int)
+    parser.add_argument("--categories", type=int, default=40)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--years", type=int, default=3, help="Años de historial de órdenes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--method", choices=("auto", "infile", "insert"), default="auto",
+                        help="infile = LOAD DATA LOCAL INFILE; insert = INSERT multi-fila")
+    parser.add_argument("--database", default=os.getenv("DB_NAME", "mi_inventario"))
+    parser.add_argument("--yes", action="store_true", help="Confirma que se borra y recrea la base")
+    args = parser.parse_args(argv)
+
+    volumes = dict(PRESETS[args.size])
+    for key in ("products", "orders", "suppliers"):
+        if getattr(args, key) is not None:
+            volumes[key] = getattr(args, key)
+
+    if not args.yes:
+        print(f"Esto borra y recrea la base '{args.database}'. Repetí el comando con --yes para continuar.")
+        return 2
+
+    from datagen.loader import generate
+    generate(args.database, volumes["products"], volumes["orders"], categories=args.categories,
+             suppliers=volumes["suppliers"], users=args.users, years=args.years, seed=args.seed,
+             method=args.method)
+    # Los navegadores pueden tener ETag de los datos anteriores: invalidarlos
+    from api.utils import versions
+    versions.bump(*versions.RESOURCES)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+# datagen/generator.py
+"""
+Filas sintéticas reproducibles para todas las tablas del esquema.
+
+Cada tabla usa su propio random.Random derivado de la semilla (p. ej. "42:orders"):
+con la misma semilla y los mismos volúmenes la salida es idéntica, y cambiar la
+cantidad de órdenes no altera los productos generados.
+
+Los generadores devuelven tuplas en el orden de columnas de COLUMNS y datetimes
+como texto 'YYYY-MM-DD HH:MM:SS', que sirve tanto para LOAD DATA como para INSERT.
+"""
+import math
+import random
+from datetime import date, timedelta
+from itertools import accumulate
+
+COLUMNS = {
+    "users": ("username", "password", "role"),
+    "categories": ("name", "description"),
+    "suppliers": ("name", "contact", "email", "phone"),
+    "products": ("name", "description", "price", "stock", "category_id", "user_id", "supplier_id"),
+    "product_suppliers": ("product_id", "supplier_id"),
+    "orders": ("product_id", "quantity", "order_date", "receipt_date", "status", "user_id"),
+}
+
+# Rubro -> (artículos, precio típico). Las categorías generadas recorren estos rubros.
+_CATALOG = {
+    "Electrónica": (("Notebook", "Monitor", "Teclado", "Mouse", "Auriculares", "Parlante", "Tablet",
+                     "Cargador", "Cable HDMI", "Disco SSD", "Router", "Webcam"), 120.0),
+    "Hogar": (("Silla", "Mesa", "Lámpara", "Almohada", "Sábana", "Cortina", "Alfombra", "Espejo",
+               "Perchero", "Estante"), 45.0),
+    "Jardinería": (("Maceta", "Manguera", "Tijera de podar", "Semillas", "Cortadora de césped",
+                    "Regadera", "Tierra fértil", "Guantes de jardín", "Rastrillo"), 25.0),
+    "Deportes": (("Pelota", "Raqueta", "Bicicleta", "Casco", "Guantes", "Colchoneta", "Mancuerna",
+                  "Botella térmica", "Zapatillas"), 40.0),
+    "Almacén": (("Café", "Yerba", "Azúcar", "Harina", "Aceite", "Arroz", "Fideos", "Té", "Galletitas",
+                 "Mermelada"), 3.5),
+    "Ferretería": (("Tornillos", "Martillo", "Destornillador", "Taladro", "Cinta métrica", "Llave inglesa",
+                    "Pinza", "Serrucho", "Nivel", "Candado"), 15.0),
+    "Librería": (("Cuaderno", "Lapicera", "Resma A4", "Carpeta", "Marcador", "Agenda", "Calculadora",
+                  "Abrochadora"), 6.0),
+    "Limpieza": (("Detergente", "Lavandina", "Esponja", "Trapo de piso", "Escoba", "Desinfectante",
+                  "Jabón en polvo", "Bolsas de residuos"), 4.0),
+    "Pinturería": (("Pintura látex", "Pincel", "Rodillo", "Enduido", "Lija", "Barniz", "Cinta de papel",
+                    "Diluyente"), 18.0),
+    "Juguetería": (("Rompecabezas", "Muñeca", "Auto a control", "Bloques", "Pelota infantil",
+                    "Juego de mesa", "Peluche"), 22.0),
+}
+_RUBROS = tuple(_CATALOG)
+_BRANDS = ("Acme", "Nova", "Andina", "Pampa", "Delta", "Austral", "Orbis", "Fénix", "Cóndor", "Litoral",
+           "Patagonia", "Sur", "Vértice", "Quantum", "Tandil", "Prisma")
+_VARIANTS = ("clásico", "pro", "eco", "mini", "max", "plus", "premium", "x2", "familiar", "compacto",
+             "rojo", "azul", "negro", "blanco")
+_SURNAMES = ("García", "Fernández", "González", "Rodríguez", "López", "Martínez", "Pérez", "Gómez",
+             "Sánchez", "Díaz", "Romero", "Sosa", "Álvarez", "Torres", "Ruiz", "Ramírez", "Benítez",
+             "Acosta", "Medina", "Herrera")
+_FIRST_NAMES = ("Ana", "Juan", "María", "Carlos", "Lucía", "Diego", "Sofía", "Martín", "Paula",
+                "Jorge", "Valeria", "Pablo", "Camila", "Andrés", "Laura")
+_COMPANY_KINDS = ("Distribuidora", "Mayorista", "Importadora", "Comercial", "Industrias", "Logística")
+_COMPANY_SUFFIXES = ("S.A.", "S.R.L.", "e Hijos", "Hnos.", "SAS")
+
+# Estacionalidad (ene..dic), día de semana (lun..dom) y franja horaria de las órdenes
+_MONTH_FACTOR = (0.80, 0.75, 0.95, 1.00, 1.00, 0.95, 1.05, 1.00, 1.00, 1.05, 1.20, 1.50)
+_WEEKDAY_FACTOR = (1.10, 1.10, 1.05, 1.05, 1.10, 0.60, 0.40)
+_HOUR_CUM = tuple(accumulate(
+    (0.1, 0.05, 0.05, 0.05, 0.05, 0.1, 0.3, 0.8, 1.5, 2.2, 2.5, 2.4,
+     1.8, 1.9, 2.2, 2.3, 2.1, 1.8, 1.3, 1.0, 0.8, 0.6, 0.4, 0.2)))
+
+ADMIN_USERNAME = "admin"
+
+
+def rng(seed, stream):
+    """Random independiente por tabla; str como semilla es determinístico (sha512)."""
+    return random.Random(f"{seed}:{stream}")
+
+
+def zipf_cum_weights(n, exponent):
+    """Pesos acumulados 1/k^s para k=1..n (popularidad sesgada: pocos concentran mucho)."""
+    return list(accumulate(1.0 / (k ** exponent) for k in range(1, n + 1)))
+
+
+def popularity(n, exponent, rnd):
+    """
+    (ids, cum_weights) para rnd.choices: el ranking de popularidad se baraja para que
+    los ids más vendidos no sean siempre los primeros.
+    """
+    ids = list(range(1, n + 1))
+    rnd.shuffle(ids)
+    return ids, zipf_cum_weights(n, exponent)
+
+
+def users(n, password_hash, admin_password_hash=None):
+    """'admin' (id 1) + user1..user{n-1}; la misma contraseña hasheada para todos los generales."""
+    yield (ADMIN_USERNAME, admin_password_hash or password_hash, "admin")
+    for i in range(1, n):
+        yield (f"user{i}", password_hash, "general")
+
+
+def category_rubro(category_id):
+    return _RUBROS[(category_id - 1) % len(_RUBROS)]
+
+
+def categories(n):
+    """Los rubros base primero; después líneas numeradas de cada rubro (el nombre es UNIQUE)."""
+    for i in range(1, n + 1):
+        rubro = category_rubro(i)
+        line = (i - 1) // len(_RUBROS)
+        name = rubro if line == 0 else f"{rubro} - línea {line + 1}"
+        yield (name, f"Artículos de {rubro.lower()}")
+
+
+def suppliers(n, seed):
+    rnd = rng(seed, "suppliers")
+    seen = set()
+    for i in range(1, n + 1):
+        name = f"{rnd.choice(_COMPANY_KINDS)} {rnd.choice(_SURNAMES)} {rnd.choice(_COMPANY_SUFFIXES)}"
+        if name in seen:
+            name = f"{name} ({i})"
+        seen.add(name)
+        person = f"{rnd.choice(_FIRST_NAMES)} {rnd.choice(_SURNAMES)}"
+        phone = f"+54 11 {rnd.randint(4000, 6999)}-{rnd.randint(0, 9999):04d}" if rnd.random() < 0.8 else None
+        yield (name, person, f"ventas{i}@proveedor{i}.example.com", phone)
+
+
+def products(n, n_categories, n_suppliers, n_users, seed, category_skew=0.8, supplier_skew=1.1):
+    """
+    Devuelve tuplas (fila_de_products, [filas_de_product_suppliers]).
+
+    Las categorías y los proveedores también tienen popularidad sesgada. supplier_id es el
+    proveedor principal (10% sin proveedor) y product_suppliers lo incluye junto con 0-2
+    proveedores alternativos.
+    """
+    rnd = rng(seed, "products")
+    cat_ids, cat_cum = popularity(n_categories, category_skew, rnd)
+    sup_ids, sup_cum = popularity(n_suppliers, supplier_skew, rnd)
+    batch = 10_000
+    for start in range(1, n + 1, batch):
+        k = min(batch, n - start + 1)
+        cats = rnd.choices(cat_ids, cum_weights=cat_cum, k=k)
+        sups = rnd.choices(sup_ids, cum_weights=sup_cum, k=k)
+        for offset in range(k):
+            product_id = start + offset
+            category_id = cats[offset]
+            items, base_price = _CATALOG[category_rubro(category_id)]
+            name = f"{rnd.choice(items)} {rnd.choice(_BRANDS)} {rnd.choice(_VARIANTS)} {rnd.randint(100, 9999)}"
+            price = min(round(rnd.lognormvariate(math.log(base_price), 0.6), 2), 99_999_999.99)
+            stock = 0 if rnd.random() < 0.05 else int(rnd.expovariate(1 / 60))
+            primary = None if rnd.random() < 0.10 else sups[offset]
+            links = []
+            if primary is not None:
+                links.append((product_id, primary))
+                for _ in range(rnd.choice((0, 0, 1, 2))):
+                    alt = rnd.randint(1, n_suppliers)
+                    if all(alt != s for _, s in links):
+                        links.append((product_id, alt))
+            row = (name, None, f"{max(price, 0.5):.2f}", stock, category_id,
+                   rnd.randint(1, n_users), primary)
+            yield row, links
+
+
+def _daily_counts(total, weights, rnd):
+    """Reparte `total` órdenes entre los días según sus pesos (suma exacta)."""
+    scale = total / sum(weights)
+    counts = [int(w * scale) for w in weights]
+    missing = total - sum(counts)
+    if missing:
+        for idx in rnd.choices(range(len(weights)), weights=weights, k=missing):
+            counts[idx] += 1
+    return counts
+
+
+def _status(age_days, rnd):
+    r = rnd.random()
+    if age_days > 30:
+        return "completed" if r < 0.70 else "received" if r < 0.90 else "cancelled"
+    if age_days > 7:
+        return "received" if r < 0.50 else "completed" if r < 0.70 else "pending" if r < 0.90 else "cancelled"
+    return "pending" if r < 0.70 else "received" if r < 0.90 else "cancelled"
+
+
+def orders(n, n_products, n_users, seed, years=3, today=None, product_skew=1.05, yearly_growth=0.25):
+    """
+    Historial de `years` años hasta `today`, en orden cronológico (los ids crecen con la fecha).
+
+    - Volumen diario con crecimiento anual, estacionalidad mensual y menos ventas el fin de semana.
+    - Productos con popularidad tipo Zipf: una fracción chica del catálogo concentra las ventas.
+    - Estado según antigüedad (lo viejo está completado/recibido, lo reciente pendiente) y
+      receipt_date 1-14 días después para received/completed, nunca en el futuro.
+    """
+    rnd = rng(seed, "orders")
+    today = today or date.today()
+    first = today - timedelta(days=int(365.25 * years) - 1)
+    n_days = (today - first).days + 1
+    days = [first + timedelta(days=i) for i in range(n_days)]
+    day_text = [d.isoformat() for d in days]
+    weights = [
+        (1 + yearly_growth) ** (i / 365.25) * _MONTH_FACTOR[d.month - 1] * _WEEKDAY_FACTOR[d.weekday()]
+        for i, d in enumerate(days)
+    ]
+    counts = _daily_counts(n, weights, rnd)
+    product_ids, product_cum = popularity(n_products, product_skew, rnd)
+
+    for day_idx, count in enumerate(counts):
+        if not count:
+            continue
+        age = n_days - 1 - day_idx
+        prods = rnd.choices(product_ids, cum_weights=product_cum, k=count)
+        hours = rnd.choices(range(24), cum_weights=_HOUR_CUM, k=count)
+        seconds = sorted(h * 3600 + rnd.randrange(3600) for h in hours)
+        for product_id, sec in zip(prods, seconds):
+            status = _status(age, rnd)
+            receipt = None
+            if status in ("received", "completed"):
+                receipt_idx = min(day_idx + rnd.randint(1, 14), n_days - 1)
+                if receipt_idx == day_idx:
+                    receipt_sec = min(sec + rnd.randint(600, 7200), 86_399)
+                else:
+                    receipt_sec = rnd.randint(8 * 3600, 19 * 3600)
+                receipt = f"{day_text[receipt_idx]} {_clock(receipt_sec)}"
+            quantity = 1 + int(rnd.expovariate(1 / 3)) if rnd.random() < 0.97 else rnd.randint(50, 500)
+            yield (product_id, quantity, f"{day_text[day_idx]} {_clock(sec)}", receipt, status,
+                   rnd.randint(1, n_users))
+
+
+def _clock(seconds):
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
@@ -0,0 +1,242 @@
+# datagen/loader.py
+"""
+Recrea el esquema en una base y la llena con las filas de generator.py.
+
+Dos formas de carga:
+- "infile": escribe archivos TSV temporales por tramos y usa LOAD DATA LOCAL INFILE
+  (requiere local_infile=ON en el servidor). Es la más rápida.
+- "insert": INSERT multi-fila; executemany de mysql-connector arma un único
+  INSERT ... VALUES (...), (...) por lote.
+Se carga sin triggers ni verificaciones de FK/unique y al final se crean los triggers
+de summaries.sql y se regeneran las tablas resumen de una sola vez.
+"""
+import os
+import re
+import tempfile
+import time
+
+import mysql.connector
+
+from datagen import generator
+
+SETTINGS_DIR = os.path.join(os.path.dirname(__file__), "..", "api", "settings")
+SCHEMA_DB = "mi_inventario"
+INSERT_BATCH = 5_000
+INFILE_CHUNK = 500_000
+METHODS = ("auto", "infile", "insert")
+
+
+def server_config(database=None, local_infile=False):
+    cfg = {
+        "host": os.getenv("DB_HOST", "localhost"),
+        "port": int(os.getenv("DB_PORT", 3306)),
+        "user": os.getenv("DB_USER", "root"),
+        "password": os.getenv("DB_PASSWORD", ""),
+    }
+    if database:
+        cfg["database"] = database
+    if local_infile:
+        cfg["allow_local_infile"] = True
+    return cfg
+
+
+def split_sql(script):
+    """Sentencias de un script .sql respetando DELIMITER (triggers) y comentarios '--'."""
+    delimiter = ";"
+    statements, buf = [], []
+    for line in script.splitlines():
+        stripped = line.strip()
+        if stripped.upper().startswith("DELIMITER "):
+            delimiter = stripped.split()[1]
+            continue
+        if not buf and (not stripped or stripped.startswith("--")):
+            continue
+        buf.append(line)
+        if stripped.endswith(delimiter):
+            stmt = "\n".join(buf).rstrip()[: -len(delimiter)].strip()
+            if stmt:
+                statements.append(stmt)
+            buf = []
+    return statements
+
+
+def run_script(cur, filename, database):
+    """Ejecuta un script de api/settings apuntando a `database` en vez de mi_inventario."""
+    with open(os.path.join(SETTINGS_DIR, filename), encoding="utf-8") as f:
+        script = f.read()
+    script = re.sub(rf"\b{SCHEMA_DB}\b", database, script)
+    for stmt in split_sql(script):
+        cur.execute(stmt)
+
+
+def _tsv_value(value):
+    if value is None:
+        return r"\N"
+    text = str(value)
+    if "\\" in text or "\t" in text or "\n" in text:
+        text = text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+    return text
+
+
+class TableLoader:
+    """Carga filas en una tabla por tramos; commit por tramo y progreso por `echo`."""
+
+    def __init__(self, conn, table, method, tmpdir, echo=print):
+        self.conn = conn
+        self.table = table
+        self.columns = generator.COLUMNS[table]
+        self.method = method
+        self.tmpdir = tmpdir
+        self.echo = echo
+        self.count = 0
+        self._buf = []
+        self._limit = INFILE_CHUNK if method == "infile" else INSERT_BATCH
+        self._started = time.perf_counter()
+        self._last_report = 0
+
+    def add(self, row):
+        self._buf.append(row)
+        if len(self._buf) >= self._limit:
+            self.flush()
+
+    def extend(self, rows):
+        for row in rows:
+            self.add(row)
+
+    def flush(self):
+        if not self._buf:
+            return
+        cur = self.conn.cursor()
+        try:
+            if self.method == "infile":
+                self._load_infile(cur)
+            else:
+                cols = ", ".join(self.columns)
+                marks = ", ".join(["%s"] * len(self.columns))
+                cur.executemany(f"INSERT INTO {self.table} ({cols}) VALUES ({marks})", self._buf)
+            self.conn.commit()
+        finally:
+            cur.close()
+        self.count += len(self._buf)
+        self._buf = []
+        if self.count - self._last_report >= 250_000:
+            self._last_report = self.count
+            self._progress()
+
+    def _load_infile(self, cur):
+        path = os.path.join(self.tmpdir, f"{self.table}.tsv")
+        with open(path, "w", encoding="utf-8", newline="\n") as f:
+            for row in self._buf:
+                f.write("\t".join(_tsv_value(v) for v in row))
+                f.write("\n")
+        quoted = path.replace("\\", "\\\\").replace("'", "\\'")
+        cur.execute(
+            f"LOAD DATA LOCAL INFILE '{quoted}' INTO TABLE {self.table} CHARACTER SET utf8mb4 "
+            f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+            f"({', '.join(self.columns)})"
+        )
+        os.remove(path)
+
+    def _progress(self):
+        elapsed = time.perf_counter() - self._started
+        rate = self.count / elapsed if elapsed else 0
+        self.echo(f"  {self.table}: {self.count:,} filas ({rate:,.0f}/s)")
+
+    def close(self):
+        self.flush()
+        self._progress()
+        return self.count
+
+
+def resolve_method(cur, method):
+    """'auto' usa LOAD DATA si el servidor lo permite (local_infile=ON); si no, INSERT."""
+    if method != "auto":
+        return method
+    cur.execute("SHOW GLOBAL VARIABLES LIKE 'local_infile'")
+    row = cur.fetchone()
+    return "infile" if row and str(row[1]).upper() in ("ON", "1") else "insert"
+
+
+def rebuild_summaries(cur, database):
+    """Triggers de summaries.sql y contenido inicial de las tablas resumen."""
+    run_script(cur, "summaries.sql", database)
+    cur.execute(f"USE {database}")
+    cur.execute("""
+        INSERT INTO category_stock (category_id, total_stock, product_count)
+        SELECT c.id, COALESCE(SUM(p.stock), 0), COUNT(p.id)
+        FROM categories c LEFT JOIN products p ON p.category_id = c.id
+        GROUP BY c.id
+    """)
+    cur.execute("""
+        INSERT INTO order_rollup_daily (day, status, orders, quantity)
+        SELECT DATE(order_date), status, COUNT(*), SUM(quantity)
+        FROM orders GROUP BY DATE(order_date), status
+    """)
+    cur.execute("ANALYZE TABLE products, orders, categories, suppliers, product_suppliers")
+    cur.fetchall()
+
+
+def generate(database, products, orders, categories=40, suppliers=500, users=50, years=3,
+             seed=42, method="auto", password="user123", admin_password="adminpassword", echo=print):
+    """
+    Recrea `database` con el esquema de la app y la llena. Devuelve conteos y segundos.
+    Los usuarios son 'admin' (id 1) y user1..user{n-1}, como en test_seeder.sql, con
+    contraseñas hasheadas con scrypt (igual que las que crea la API).
+    """
+    from werkzeug.security import generate_password_hash
+
+    if method not in METHODS:
+        raise ValueError(f"method debe ser uno de {METHODS}")
+    users = max(users, 1)
+    categories = max(categories, 1)
+    suppliers = max(suppliers, 1)
+    started = time.perf_counter()
+
+    conn = mysql.connector.connect(**server_config(local_infile=method in ("auto", "infile")))
+    conn.autocommit = True
+    cur = conn.cursor()
+    method = resolve_method(cur, method)
+    run_script(cur, "create_db.sql", database)
+    echo(f"Esquema creado en {database} (carga con {method})")
+
+    conn.autocommit = False
+    cur.execute("SET FOREIGN_KEY_CHECKS = 0")
+    cur.execute("SET unique_checks = 0")
+
+    with tempfile.TemporaryDirectory(prefix="datagen-") as tmpdir:
+        def loader(table):
+            return TableLoader(conn, table, method, tmpdir, echo)
+
+        pwd_hash = generate_password_hash(password, method="scrypt")
+        admin_hash = generate_password_hash(admin_password, method="scrypt")
+        counts = {}
+        for table, rows in (
+            ("users", generator.users(users, pwd_hash, admin_hash)),
+            ("categories", generator.categories(categories)),
+            ("suppliers", generator.suppliers(suppliers, seed)),
+        ):
+            t = loader(table)
+            t.extend(rows)
+            counts[table] = t.close()
+
+        products_loader, links_loader = loader("products"), loader("product_suppliers")
+        for row, links in generator.products(products, categories, suppliers, users, seed):
+            products_loader.add(row)
+            links_loader.extend(links)
+        counts["products"] = products_loader.close()
+        counts["product_suppliers"] = links_loader.close()
+
+        t = loader("orders")
+        t.extend(generator.orders(orders, max(products, 1), users, seed, years=years) if products else ())
+        counts["orders"] = t.close()
+
+    cur.execute("SET unique_checks = 1")
+    cur.execute("SET FOREIGN_KEY_CHECKS = 1")
+    conn.autocommit = True
+    rebuild_summaries(cur, database)
+    cur.close()
+    conn.close()
+
+    counts["seconds"] = round(time.perf_counter() - started, 1)
+    echo(f"Resúmenes regenerados. Carga total: {counts['seconds']}s")
+    return counts
@@ -0,0 +1,64 @@
+# gunicorn.conf.py
+"""
+Modo producción: `python main.py serve` (o `gunicorn -c gunicorn.conf.py main:app`).
+
+Variables (.env):
+  HOST / PORT                   dirección de escucha (0.0.0.0:5000)
+  WEB_WORKERS                   procesos (default 2 * CPUs + 1)
+  WEB_THREADS                   hilos por proceso (default 4; con >1 se usa el worker gthread)
+  WEB_MAX_REQUESTS              reinicio ordenado de cada worker tras N requests (1000; 0 = nunca)
+  WEB_MAX_REQUESTS_JITTER       azar sumado a N para que no reinicien todos juntos (100)
+  WEB_TIMEOUT                   segundos sin respuesta antes de matar un worker (60)
+  WEB_GRACEFUL_TIMEOUT          segundos para terminar los requests en curso al recibir SIGTERM (30)
+  EXPORT_WARMUP                 cada worker levanta su pool de exportación al arrancar (false)
+"""
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{int(os.getenv('PORT', 5000))}"
+workers = int(os.getenv("WEB_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("WEB_THREADS", 4))
+worker_class = "gthread" if threads > 1 else "sync"
+
+# La app se carga una vez en el master y los workers la heredan por fork (memoria compartida
+# copy-on-write). El pool de MySQL, las métricas y las exportaciones se crean por proceso.
+preload_app = True
+
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.getenv("WEB_MAX_REQUESTS_JITTER", 100))
+timeout = int(os.getenv("WEB_TIMEOUT", 60))
+# SIGTERM: el master deja de aceptar conexiones y espera a que los workers terminen lo que tienen
+graceful_timeout = int(os.getenv("WEB_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+
+accesslog = os.getenv("WEB_ACCESS_LOG") or None
+errorlog = "-"
+loglevel = os.getenv("WEB_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    # Los contadores de /metrics arrancan de cero con cada despliegue
+    from api.utils import metrics, query_stats
+    metrics.clear()
+    query_stats.clear()
+
+
+def child_exit(server, worker):
+    # Los archivos de métricas del worker que salió se pliegan en uno (no se acumulan)
+    from api.utils import metrics, query_stats
+    for module in (metrics, query_stats):
+        try:
+            module.fold_finished(worker.pid)
+        except OSError as e:
+            server.log.warning("No se pudieron plegar las métricas del worker %s: %s", worker.pid, e)
+
+
+def post_worker_init(worker):
+    # El pool de exportación es por proceso: se levanta en cada worker, no en el master
+    from api.utils import export_jobs
+    if export_jobs.warmup_enabled():
+        export_jobs.warm_up()
@@ -1,13 +1,58 @@
 # main.py
 from api import create_app
 import os
+import sys
 
 app = create_app()
 
+
+def serve():
+    """Servidor de producción: gunicorn con la configuración de gunicorn.conf.py (usa esta misma app)."""
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        sys.exit("Falta gunicorn (pip install -r requirements.txt). En Windows usá WSL o un contenedor Linux.")
+    import runpy
+
+    class Server(BaseApplication):
+        def load_config(self):
+            conf = runpy.run_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), "gunicorn.conf.py"))
+            for key, value in conf.items():
+                if key in self.cfg.settings and value is not None:
+                    self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    print(f"Sirviendo con gunicorn en {os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', 5000)}...")
+    Server().run()
+
+
+def serve_asgi():
+    """Lecturas async + Flask montada (asgi.py) con uvicorn; un event loop por worker."""
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit("Falta uvicorn (pip install -r requirements.txt).")
+    host = os.environ.get("HOST", "0.0.0.0")
+    port = int(os.environ.get("PORT", 5000))
+    workers = int(os.environ.get("WEB_WORKERS", os.cpu_count() or 1))
+    print(f"Sirviendo con uvicorn (ASGI) en {host}:{port} con {workers} workers...")
+    uvicorn.run("asgi:app", host=host, port=port, workers=workers, access_log=False)
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        serve()
+        sys.exit(0)
+    if len(sys.argv) > 1 and sys.argv[1] == "asgi":
+        serve_asgi()
+        sys.exit(0)
+
     host = os.environ.get("HOST", "0.0.0.0")
     port = int(os.environ.get("PORT", 5000))
-    debug = os.environ.get("DEBUG", "true").lower() == "true"
+    # Servidor de desarrollo (un proceso). El debugger sólo con DEBUG=true explícito.
+    debug = os.environ.get("DEBUG", "false").lower() == "true"
 
     print(f"Iniciando el sistema de gestión en http://{host}:{port}...")
     # Si querés evitar doble arranque/log en modo debug:
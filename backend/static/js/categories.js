@@ -66,7 +66,7 @@ function rowHTML(c){
 }
 
 async function loadCategories(){
-  const r = await fetch(API_CATEGORIES, { headers:{ Authorization:`Bearer ${token()}` }});
+  const r = await fetch(`${API_CATEGORIES}?all=1`, { headers:{ Authorization:`Bearer ${token()}` }});
   const items = await unwrap(r);
   $tbody.innerHTML = items.map(rowHTML).join("");
   // si tenés un empty state opcional:
@@ -102,7 +102,7 @@ $tbody?.addEventListener("click", async (ev) => {
     if(!IS_ADMIN){ showAlert("No tenés permisos para editar categorías","danger",3000); return; }
     try{
       // No hay GET /categories/<id> en el backend; usamos la lista y buscamos
-      const r = await fetch(API_CATEGORIES, { headers:{ Authorization:`Bearer ${token()}` }});
+      const r = await fetch(`${API_CATEGORIES}?all=1`, { headers:{ Authorization:`Bearer ${token()}` }});
       const list = await unwrap(r);
       const c = list.find(x => String(x.id) === String(id));
       if(!c){ showAlert("Categoría no encontrada","warning",2500); return; }
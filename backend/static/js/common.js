@@ -4,8 +4,31 @@ export const API_URL = ""; // mismo origen; si tu API está aparte, ej: "http://
 
 // ========== TOKEN ==========
 export const getToken   = () => localStorage.getItem("token") || "";
-export const setToken   = (t) => localStorage.setItem("token", t || "");
-export const clearToken = () => localStorage.removeItem("token");
+export const setToken   = (t) => { localStorage.setItem("token", t || ""); clearValidators(); };
+export const clearToken = () => { localStorage.removeItem("token"); clearValidators(); };
+
+// ========== GET CONDICIONAL (ETag) ==========
+// Se guarda la última respuesta de cada GET con su ETag; en la próxima visita se manda
+// If-None-Match y, si el backend responde 304, se reutiliza el payload guardado.
+const ETAG_PREFIX = "etag:";
+
+function readValidator(url) {
+  try { return JSON.parse(sessionStorage.getItem(ETAG_PREFIX + url) || "null"); }
+  catch { return null; }
+}
+
+function saveValidator(url, etag, payload) {
+  try { sessionStorage.setItem(ETAG_PREFIX + url, JSON.stringify({ etag, payload })); }
+  catch { /* cuota llena: se sigue sin cache */ }
+}
+
+export function clearValidators() {
+  try {
+    Object.keys(sessionStorage)
+      .filter(k => k.startsWith(ETAG_PREFIX))
+      .forEach(k => sessionStorage.removeItem(k));
+  } catch { /* sessionStorage no disponible */ }
+}
 
 // ========== FETCH UNIFICADO ==========
 function buildHeaders(options) {
@@ -29,10 +52,13 @@ function withTimeout(promise, ms = 20000) {
 export async function apiFetch(path, options = {}) {
   const url = `${API_URL}${path}`;
   const headers = buildHeaders(options);
+  const isGet = (options.method || "GET").toUpperCase() === "GET";
+  const cached = isGet ? readValidator(url) : null;
+  if (cached?.etag) headers["If-None-Match"] = cached.etag;
 
   let res;
   try {
-    res = await withTimeout(fetch(url, { ...options, headers }));
+    res = await withTimeout(fetch(url, { ...options, headers, cache: isGet ? "no-store" : options.cache }));
   } catch (e) {
     // Error de red / timeout
     throw new Error(e?.message || "Fallo de red");
@@ -49,9 +75,15 @@ export async function apiFetch(path, options = {}) {
   if (res.status === 204) return null; // No Content
 
   let payload = null;
-  try { payload = await res.json(); } catch { /* respuesta vacía o no JSON */ }
+  if (res.status === 304 && cached) {
+    payload = cached.payload;             // sin cambios desde la última vez
+  } else {
+    try { payload = await res.json(); } catch { /* respuesta vacía o no JSON */ }
+    const etag = res.headers.get("ETag");
+    if (isGet && res.ok && etag) saveValidator(url, etag, payload);
+  }
 
-  if (!res.ok) {
+  if (!res.ok && res.status !== 304) {
     const msg = payload?.error || payload?.message || `${res.status} ${res.statusText}`;
     throw new Error(msg);
   }
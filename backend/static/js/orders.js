@@ -12,6 +12,7 @@ const $alert   = document.getElementById("alertBox");
 
 const $orderId   = document.getElementById("orderId");
 const $productId = document.getElementById("productId");
+const $productSearch = document.getElementById("productSearch");
 const $quantity  = document.getElementById("quantity");
 const $status    = document.getElementById("status");
 
@@ -70,12 +71,24 @@ function badgeStatus(s) {
   return `<span class="badge badge-${cls}">${s}</span>`;
 }
 
-async function loadProducts() {
-  const res = await fetch(API_PRODUCTS, { headers: { Authorization: `Bearer ${getToken()}` } });
-  const items = await unwrapResponse(res);
+// Typeahead: /products/search en vez de bajar el listado completo.
+// `selected` ({id, name}) se agrega si no vino en los resultados (edición de una orden).
+async function loadProducts(q = "", selected = null) {
+  const qs = new URLSearchParams({ q, limit: 20 });
+  const res = await fetch(`${API_PRODUCTS}/search?${qs}`, { headers: { Authorization: `Bearer ${getToken()}` } });
+  let items = await unwrapResponse(res);
+  if (selected && !items.some(p => p.id === selected.id)) items = [selected, ...items];
   $productId.innerHTML = items.map(p => `<option value="${p.id}">${p.name}</option>`).join("");
 }
 
+let searchTimer = null;
+$productSearch?.addEventListener("input", () => {
+  clearTimeout(searchTimer);
+  searchTimer = setTimeout(() => {
+    loadProducts($productSearch.value.trim()).catch(e => showAlert(e.message, "danger", 3000));
+  }, 200);
+});
+
 function actionsHTML(oId){
   if (!IS_ADMIN) return `<span class="text-muted">—</span>`;
   return `
@@ -119,6 +132,7 @@ function openModal(editing=false) {
 // ---------- eventos ----------
 $btnNew?.addEventListener("click", async () => {
   resetForm();
+  if ($productSearch) $productSearch.value = "";
   await loadProducts();
   openModal(false);
 });
@@ -135,7 +149,8 @@ $tbody?.addEventListener("click", async (ev) => {
     try {
       const res = await fetch(`${API_ORDERS}/${id}`, { headers: { Authorization: `Bearer ${getToken()}` } });
       const o = await unwrapResponse(res);
-      await loadProducts();
+      if ($productSearch) $productSearch.value = "";
+      await loadProducts("", { id: o.product_id, name: o.product_name });
       $orderId.value = o.id;
       $quantity.value = o.quantity;
       $status.value   = (o.status || "pending").toLowerCase();
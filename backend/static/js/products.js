@@ -7,6 +7,8 @@ const $tbody      = document.getElementById("products-tbody");
 const $alert      = document.getElementById("alertBox");
 const $btnNew     = document.getElementById("btnNewProduct");
 const $emptyState = document.getElementById("emptyState");
+const $btnMore    = document.getElementById("btnLoadMore");
+const $search     = document.getElementById("productSearch");
 
 // Modal / Form
 const $form        = document.getElementById("productForm");
@@ -20,6 +22,9 @@ const $price       = document.getElementById("price");
 const $stock       = document.getElementById("stock");
 
 let IS_ADMIN = false;
+const PAGE_SIZE = 50;
+let ITEMS = [];          // productos ya cargados (páginas acumuladas)
+let NEXT_CURSOR = null;  // next_cursor del backend (null = no hay más)
 
 // -------- Helpers base --------
 function token(){ return localStorage.getItem("token"); }
@@ -79,7 +84,7 @@ function rowHTML(p){
 
 // -------- Cargas iniciales --------
 async function loadCategories(){
-  const r = await fetch(API_CATEGORIES, { headers:{ Authorization:`Bearer ${token()}` }});
+  const r = await fetch(`${API_CATEGORIES}?all=1`, { headers:{ Authorization:`Bearer ${token()}` }});
   const items = await unwrap(r);
   if($categoryId){
     $categoryId.innerHTML = items.map(c=>`<option value="${c.id}">${c.name}</option>`).join("");
@@ -89,7 +94,7 @@ async function loadCategories(){
 // ✅ Cargar proveedores para el select del formulario
 async function loadSuppliersForSelect(selectedId=null){
   try{
-    const resp = await fetch(API_SUPPLIERS, { headers:{ Authorization:`Bearer ${token()}` }});
+    const resp = await fetch(`${API_SUPPLIERS}?all=1`, { headers:{ Authorization:`Bearer ${token()}` }});
     const list = await unwrap(resp);
     if($supplierId){
       const opts = ['<option value="">— Sin proveedor —</option>']
@@ -104,11 +109,36 @@ async function loadSuppliersForSelect(selectedId=null){
   }
 }
 
-async function loadProducts(){
-  const r = await fetch(API_PRODUCTS, { headers:{ Authorization:`Bearer ${token()}` }});
-  const items = await unwrap(r);
-  if($tbody) $tbody.innerHTML = items.map(rowHTML).join("");
-  if($emptyState) $emptyState.style.display = items.length ? "none" : "block";
+// Con texto en el buscador: resultados de /products/search (sin paginado)
+async function searchProducts(q){
+  const qs = new URLSearchParams({ q, limit: 50 });
+  const r = await fetch(`${API_PRODUCTS}/search?${qs}`, { headers:{ Authorization:`Bearer ${token()}` }});
+  ITEMS = await unwrap(r);
+  NEXT_CURSOR = null;
+  if($tbody) $tbody.innerHTML = ITEMS.map(rowHTML).join("");
+  if($emptyState) $emptyState.style.display = ITEMS.length ? "none" : "block";
+  if($btnMore) $btnMore.classList.add("d-none");
+}
+
+// Paginado por cursor: reset=true vuelve a la primera página
+async function loadProducts(reset=true){
+  const q = ($search?.value || "").trim();
+  if(q) return searchProducts(q);
+  if(reset){ ITEMS = []; NEXT_CURSOR = null; }
+  const qs = new URLSearchParams({ limit: PAGE_SIZE });
+  if(NEXT_CURSOR !== null) qs.set("after_id", NEXT_CURSOR);
+  const r = await fetch(`${API_PRODUCTS}?${qs}`, { headers:{ Authorization:`Bearer ${token()}` }});
+  let j=null; try{ j=await r.json(); }catch{}
+  if(!r.ok) throw new Error(j?.error || `HTTP ${r.status}`);
+  const page = j?.data || [];
+  NEXT_CURSOR = j?.next_cursor ?? null;
+  ITEMS = ITEMS.concat(page);
+  if($tbody){
+    if(reset) $tbody.innerHTML = page.map(rowHTML).join("");
+    else $tbody.insertAdjacentHTML("beforeend", page.map(rowHTML).join(""));
+  }
+  if($emptyState) $emptyState.style.display = ITEMS.length ? "none" : "block";
+  if($btnMore) $btnMore.classList.toggle("d-none", NEXT_CURSOR === null);
 }
 
 // -------- Modal / Form --------
@@ -145,10 +175,8 @@ $tbody?.addEventListener("click", async (ev)=>{
   if(btn.dataset.edit){
     if(!IS_ADMIN){ showAlert("No tenés permisos para editar","danger",3000); return; }
     try{
-      // Podrías optimizar trayendo sólo el producto por id si tenés endpoint específico
-      const r = await fetch(API_PRODUCTS, { headers:{ Authorization:`Bearer ${token()}` }});
-      const list = await unwrap(r);
-      const p = list.find(x=>String(x.id)===String(id));
+      // El producto ya está entre las páginas cargadas
+      const p = ITEMS.find(x=>String(x.id)===String(id));
       if(!p) return;
 
       await Promise.all([
@@ -216,6 +244,21 @@ $form?.addEventListener("submit", async (ev)=>{
   }
 });
 
+$btnMore?.addEventListener("click", async ()=>{
+  $btnMore.disabled = true;
+  try{ await loadProducts(false); }
+  catch(e){ showAlert(e.message || "No se pudieron cargar más productos", "danger", 3000); }
+  finally{ $btnMore.disabled = false; }
+});
+
+let searchTimer = null;
+$search?.addEventListener("input", ()=>{
+  clearTimeout(searchTimer);
+  searchTimer = setTimeout(()=>{
+    loadProducts().catch(e=>showAlert(e.message || "No se pudo buscar", "danger", 3000));
+  }, 200);
+});
+
 // -------- Init --------
 (async function init(){
   await me();
@@ -65,7 +65,7 @@ async function loadLowStock(th=5){
     paintLowStock(data);
     return data;
   }catch{
-    const rp = await fetch("/products",{headers:{Authorization:`Bearer ${token()}`}});
+    const rp = await fetch("/products?all=1",{headers:{Authorization:`Bearer ${token()}`}});
     const items = await unwrap(rp);
     const data = items.filter(p => Number(p.stock||0) <= th).map(p => ({
       id:p.id, name:p.name, category:p.category_name||p.category_id, stock:p.stock
@@ -30,7 +30,7 @@ function rowHTML(s){ return `
   </tr>`; }
 
 async function loadList(){
-  const r = await fetch(API_SUP,{headers:{Authorization:`Bearer ${token()}`}});
+  const r = await fetch(`${API_SUP}?all=1`,{headers:{Authorization:`Bearer ${token()}`}});
   const items = await unwrap(r);
   $tbody.innerHTML = items.map(rowHTML).join("");
   document.getElementById("emptyState")?.style.setProperty("display", items.length?"none":"block");
@@ -50,7 +50,7 @@ $tbody?.addEventListener("click", async (ev)=>{
 
   if(btn.dataset.edit){
     if(!IS_ADMIN){ showAlert("No autorizado para editar","danger",3000); return; }
-    const r = await fetch(API_SUP,{headers:{Authorization:`Bearer ${token()}`}});
+    const r = await fetch(`${API_SUP}?all=1`,{headers:{Authorization:`Bearer ${token()}`}});
     const list = await unwrap(r);
     const s = list.find(x=>String(x.id)===String(id)); if(!s) return;
     $id.value=s.id; $name.value=s.name; $email.value=s.email||""; $phone.value=s.phone||"";
@@ -47,7 +47,7 @@ function rowHTML(u){
 }
 
 async function loadUsers(){
-  const r = await fetch(API_USERS,{headers:{Authorization:`Bearer ${token()}`}});
+  const r = await fetch(`${API_USERS}?all=1`,{headers:{Authorization:`Bearer ${token()}`}});
   const items = await unwrap(r);
   $tbody.innerHTML = items.map(rowHTML).join("");
   document.getElementById("emptyState")?.style.setProperty("display", items.length?"none":"block");
@@ -63,7 +63,7 @@ $tbody?.addEventListener("click", async (ev)=>{
   const rowId = btn.dataset.edit || btn.dataset.del || ev.target.closest("tr")?.dataset.id;
 
   if(btn.dataset.edit){
-    const r = await fetch(API_USERS,{headers:{Authorization:`Bearer ${token()}`}});
+    const r = await fetch(`${API_USERS}?all=1`,{headers:{Authorization:`Bearer ${token()}`}});
     const list = await unwrap(r);
     const u = list.find(x=>String(x.id)===String(rowId)); if(!u) return;
     $id.value=u.id; $username.value=u.username; $role.value=u.role; $password.value="";
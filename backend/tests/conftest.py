@@ -0,0 +1,68 @@
+# tests/conftest.py
+"""
+Tests de los helpers puros (sin MySQL): `python -m pytest -q` desde backend/.
+Las conexiones son de mentira (FakeRaw) y la app Flask es mínima (sólo el provider JSON).
+"""
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.utils.responses import FastJSONProvider  # noqa: E402
+
+
+class FakeRaw:
+    """Conexión física de mentira: lo que ConnectionPool usa de mysql.connector."""
+
+    def __init__(self, **config):
+        self.config = config
+        self.in_transaction = False
+        self.connected = True
+        self.ping_ok = True
+        self.rollbacks = 0
+
+    def ping(self, reconnect=False):
+        if not self.ping_ok:
+            raise OSError("ping falló")
+
+    def is_connected(self):
+        return self.connected
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def commit(self):
+        self.in_transaction = False
+
+    def close(self):
+        self.connected = False
+
+    def cursor(self, *args, **kwargs):
+        raise AssertionError("los tests del pool no ejecutan SQL")
+
+
+@pytest.fixture
+def fake_connect(monkeypatch):
+    """Reemplaza mysql.connector.connect; devuelve la lista de conexiones abiertas."""
+    import mysql.connector
+
+    opened = []
+
+    def connect(**config):
+        raw = FakeRaw(**config)
+        opened.append(raw)
+        return raw
+
+    monkeypatch.setattr(mysql.connector, "connect", connect)
+    return opened
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    return app
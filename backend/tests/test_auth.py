@@ -0,0 +1,35 @@
+# tests/test_auth.py
+import pytest
+from flask import Flask
+
+from api.routes import auth
+from api.utils.responses import FastJSONProvider
+
+
+@pytest.fixture
+def client(monkeypatch):
+    bumped = []
+    monkeypatch.setattr(auth, "invalidate", lambda *resources: bumped.extend(resources))
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.register_blueprint(auth.auth_bp, url_prefix="/auth")
+    client = app.test_client()
+    client.bumped = bumped
+    return client
+
+
+def test_register_invalidates_users(client, monkeypatch):
+    monkeypatch.setattr(auth.User, "register", classmethod(lambda cls, data: {"message": "ok"}))
+    resp = client.post("/auth/register", json={"username": "ana", "password": "x", "role": "user"})
+    assert resp.status_code == 201
+    assert client.bumped == ["users"]
+
+
+def test_failed_register_keeps_users_version(client, monkeypatch):
+    def fail(cls, data):
+        raise auth.DBError("Duplicate entry")
+
+    monkeypatch.setattr(auth.User, "register", classmethod(fail))
+    resp = client.post("/auth/register", json={"username": "ana", "password": "x", "role": "user"})
+    assert resp.status_code == 400
+    assert client.bumped == []
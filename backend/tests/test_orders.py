@@ -0,0 +1,241 @@
+# tests/test_orders.py
+import copy
+import re
+
+import pytest
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+
+from api.routes import orders
+from api.utils.responses import FastJSONProvider
+
+
+class FakeDB:
+    """Filas confirmadas de orders/products; on_write simula a otro escritor que gana la carrera."""
+
+    def __init__(self):
+        self.tables = {
+            "orders": {1: {"id": 1, "product_id": 7, "status": "pending", "quantity": 5,
+                           "order_date": None, "receipt_date": None, "user_id": 1}},
+            "products": {7: {"id": 7, "name": "Tornillo", "stock": 10}},
+        }
+        self.on_write = None
+
+    def order(self):
+        return self.tables["orders"].get(1)
+
+    def product(self):
+        return self.tables["products"][7]
+
+
+class FakeConnection:
+    """
+    Lo mínimo de REPEATABLE READ que usan las rutas: los SELECT comunes leen el snapshot
+    tomado en la primera lectura de la transacción; UPDATE/DELETE y FOR UPDATE ven lo
+    confirmado. Las escrituras quedan pendientes hasta commit().
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.snapshot = None
+        self.pending = None
+        self.commits = 0
+
+    def read(self):
+        if self.snapshot is None:
+            self.snapshot = copy.deepcopy(self.db.tables)
+        return self.snapshot
+
+    def current(self):
+        return self.pending if self.pending is not None else self.db.tables
+
+    def race(self):
+        """El otro escritor confirma justo antes de la primera escritura de esta transacción."""
+        if self.db.on_write:
+            other, self.db.on_write = self.db.on_write, None
+            other(self.db)
+
+    def write(self):
+        if self.pending is None:
+            self.pending = copy.deepcopy(self.db.tables)
+        return self.pending
+
+    def commit(self):
+        if self.pending is not None:
+            self.db.tables = self.pending
+            self.commits += 1
+        self.snapshot = self.pending = None
+
+    def rollback(self):
+        self.snapshot = self.pending = None
+
+    def close(self):
+        pass
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self)
+
+
+def _row(tables, columns):
+    order = tables["orders"].get(1)
+    if order is None:
+        return None
+    joined = dict(order, product_name=tables["products"][order["product_id"]]["name"],
+                  stock=tables["products"][order["product_id"]]["stock"])
+    return {c: joined[c] for c in columns}
+
+
+class FakeCursor:
+    """Interpreta sólo las sentencias que emiten las rutas de /orders (order_id = 1)."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+        self.rowcount = -1
+
+    def execute(self, sql, params=()):
+        sql = " ".join(sql.split())
+        params = list(params)
+        self.rows, self.rowcount = [], 0
+        if sql.startswith("SELECT"):
+            tables = self.conn.current() if sql.endswith("FOR UPDATE") else self.conn.read()
+            if "FROM products" in sql:
+                self.rows = [{"stock": tables["products"][params[0]]["stock"]}]
+                return
+            select = sql[len("SELECT "):sql.index(" FROM")]
+            columns = [c.split(" AS ")[-1].split(".")[-1].strip() for c in select.split(",")]
+            row = _row(tables, columns)
+            self.rows = [row] if row else []
+            return
+        self.conn.race()
+        if sql.startswith("UPDATE orders"):
+            self._update_order(sql, params)
+        elif sql.startswith("UPDATE products"):
+            delta, product_id, guard = params
+            product = self.conn.current()["products"][product_id]
+            if product["stock"] + guard >= 0:
+                self.conn.write()["products"][product_id]["stock"] += delta
+                self.rowcount = 1
+        elif sql.startswith("DELETE FROM orders"):
+            if self.conn.current()["orders"].get(params[0]):
+                del self.conn.write()["orders"][params[0]]
+                self.rowcount = 1
+        else:
+            raise AssertionError(f"SQL inesperado: {sql}")
+
+    def _update_order(self, sql, params):
+        sets = re.search(r" SET (.*) WHERE ", sql).group(1).split(", ")
+        values = params[:sum(s.count("%s") for s in sets)]
+        guard = params[len(values):]
+        current = self.conn.current()
+        order = current["orders"][guard[0]]
+        if (order["status"], order["quantity"]) != (guard[1], guard[2]):
+            return
+        if len(guard) > 3 and current["products"][order["product_id"]]["stock"] + guard[3] < 0:
+            return
+        tables = self.conn.write()
+        order = tables["orders"][guard[0]]
+        values = iter(values)
+        for assignment in sets:
+            column, expr = assignment.split(" = ")
+            table, column = column.split(".")
+            target = order if table == "o" else tables["products"][order["product_id"]]
+            if expr == "p.stock + %s":
+                target["stock"] += next(values)
+            elif expr == "%s":
+                target[column] = next(values)
+            else:
+                target[column] = expr
+        self.rowcount = 1
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeDB()
+    monkeypatch.setattr(orders, "get_db_connection", lambda: FakeConnection(db))
+    monkeypatch.setattr(orders, "invalidate", lambda *resources: None)
+    return db
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.config["JWT_SECRET_KEY"] = "clave-de-tests-de-al-menos-32-bytes"
+    app.json = FastJSONProvider(app)
+    JWTManager(app)
+    app.register_blueprint(orders.orders_bp, url_prefix="/orders")
+    with app.app_context():
+        token = create_access_token(identity="1:admin")
+    client = app.test_client()
+    client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    return client
+
+
+def test_receiving_an_order_adds_its_quantity_to_stock(db, client):
+    resp = client.put("/orders/1", json={"status": "received"})
+    assert resp.status_code == 200
+    assert resp.get_json()["data"]["status"] == "received"
+    assert db.product()["stock"] == 15
+
+
+def test_lost_race_returns_conflict_and_keeps_the_other_write(db, client):
+    def other_writer(db):
+        db.order()["status"] = "cancelled"
+
+    db.on_write = other_writer
+    resp = client.put("/orders/1", json={"status": "received"})
+    assert resp.status_code == 409
+    assert resp.get_json()["code"] == "CONFLICT"
+    assert db.order()["status"] == "cancelled"
+    assert db.product()["stock"] == 10
+
+
+def test_lost_race_on_stock_reports_current_stock(db, client):
+    db.order()["status"] = "received"
+
+    def other_writer(db):
+        db.product()["stock"] = 3
+
+    db.on_write = other_writer
+    resp = client.put("/orders/1", json={"status": "cancelled"})
+    assert resp.status_code == 409
+    body = resp.get_json()
+    assert body["code"] == "INSUFFICIENT_STOCK"
+    assert body["details"] == {"stock": 3, "delta": -5}
+    assert db.order()["status"] == "received"
+
+
+def test_deleting_a_received_order_removes_its_stock(db, client):
+    db.order()["status"] = "received"
+    db.product()["stock"] = 15
+    resp = client.delete("/orders/1")
+    assert resp.status_code == 200
+    assert db.order() is None
+    assert db.product()["stock"] == 10
+
+
+def test_deleting_a_pending_order_keeps_stock(db, client):
+    assert client.delete("/orders/1").status_code == 200
+    assert db.order() is None
+    assert db.product()["stock"] == 10
+
+
+def test_delete_is_rejected_when_stock_cannot_be_reverted(db, client):
+    db.order()["status"] = "completed"
+    db.product()["stock"] = 2
+    resp = client.delete("/orders/1")
+    assert resp.status_code == 409
+    assert resp.get_json()["details"] == {"stock": 2, "delta": -5}
+    assert db.order() is not None
+    assert db.product()["stock"] == 2
+
+
+def test_delete_missing_order(db, client):
+    del db.tables["orders"][1]
+    assert client.delete("/orders/1").status_code == 404
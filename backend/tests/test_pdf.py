@@ -0,0 +1,137 @@
+# tests/test_pdf.py
+import io
+import zlib
+
+import pytest
+
+from api.utils import pdf
+
+pypdf = pytest.importorskip("pypdf")
+
+COLUMNS = ["ID", "Nombre"]
+
+
+def render(rows, title="Productos", columns=COLUMNS):
+    dest = io.BytesIO()
+    count = pdf.write_table(dest, title, columns, rows)
+    return dest.getvalue(), count
+
+
+def read(data):
+    # strict: offsets de la xref, /Length de los streams y árbol de páginas exactos
+    return pypdf.PdfReader(io.BytesIO(data), strict=True)
+
+
+def page_streams(data):
+    """Contenido (descomprimido) de cada página, en orden."""
+    reader = read(data)
+    return [page.get_contents().get_data() for page in reader.pages]
+
+
+def rows_per_page(columns=COLUMNS):
+    return pdf._Layout(columns, None, None).rows_per_page
+
+
+def test_empty_table_is_one_page_with_header():
+    data, count = render([])
+    assert count == 0
+    reader = read(data)
+    assert len(reader.pages) == 1
+    text = reader.pages[0].extract_text()
+    assert "Productos" in text and "Nombre" in text
+
+
+def test_iter_table_matches_write_table():
+    rows = [(i, f"Producto {i}") for i in range(50)]
+    chunks = list(pdf.iter_table("Productos", COLUMNS, iter(rows)))
+    data, _ = render(rows)
+    # Sólo cambia la fecha de creación entre las dos corridas
+    strip = lambda b: b[:b.index(b"/CreationDate")] + b[b.index(b">>", b.index(b"/CreationDate")):]
+    assert strip(b"".join(chunks)) == strip(data)
+    # encabezado, un chunk por página, árbol de páginas, xref
+    assert len(chunks) == 1 + len(read(data).pages) + 2
+
+
+def test_chars_outside_cp1252_become_question_marks():
+    data, _ = render([(1, "Café ☃ 😀 ñandú")])
+    content = page_streams(data)[0]
+    assert b"(Caf\xe9 ? ? \xf1and\xfa) Tj" in content
+
+
+def test_control_characters_become_spaces():
+    data, _ = render([(1, "a\tb\nc")])
+    assert b"(a b c) Tj" in page_streams(data)[0]
+
+
+def test_parentheses_and_backslash_are_escaped():
+    data, _ = render([(1, r"a(b)c\d")], title="Título (v2)")
+    content = page_streams(data)[0]
+    assert b"(a\\(b\\)c\\\\d) Tj" in content
+    assert b"(T\xedtulo \\(v2\\)) Tj" in content
+    assert r"a(b)c\d" in read(data).pages[0].extract_text()
+
+
+def test_none_cells_are_empty():
+    data, _ = render([(1, None)])
+    content = page_streams(data)[0]
+    assert b"(1) Tj" in content
+    assert b"(None)" not in content
+
+
+def test_long_text_is_cut_with_ellipsis():
+    data, _ = render([(1, "x" * 500)], columns=["ID", "Nombre"])
+    content = page_streams(data)[0]
+    assert b"...) Tj" in content
+    assert b"x" * 500 not in content
+
+
+@pytest.mark.parametrize("extra, pages", [(0, 1), (1, 2), (-1, 1)])
+def test_page_boundaries(extra, pages):
+    n = rows_per_page() + extra
+    rows = [(i, f"Fila {i}") for i in range(n)]
+    data, count = render(iter(rows))
+    assert count == n
+    streams = page_streams(data)
+    assert len(streams) == pages
+    assert b"(Fila %d) Tj" % (n - 1) in streams[-1]
+    if pages == 2:
+        assert b"(Fila %d) Tj" % (n - 2) in streams[0]
+        assert b"(Fila %d) Tj" % (n - 2) not in streams[1]
+
+
+def test_exact_multiple_of_page_size_has_no_blank_page():
+    per_page = rows_per_page()
+    data, count = render((i, "x") for i in range(3 * per_page))
+    assert count == 3 * per_page
+    assert len(read(data).pages) == 3
+
+
+def test_rows_are_read_one_page_at_a_time():
+    per_page = rows_per_page()
+    consumed = []
+
+    def rows():
+        for i in range(5 * per_page):
+            consumed.append(i)
+            yield (i, "x")
+
+    chunks = pdf.iter_table("Productos", COLUMNS, rows())
+    next(chunks)            # encabezado del documento
+    next(chunks)            # primera página
+    assert len(consumed) == per_page
+
+
+def test_page_streams_are_compressed():
+    data, _ = render([(i, "Producto repetido") for i in range(100)])
+    assert b"/Filter /FlateDecode" in data
+    # Ninguna página va sin comprimir
+    assert b"(Producto repetido) Tj" not in data
+    start = data.index(b"stream\n") + len(b"stream\n")
+    assert b"(Producto repetido) Tj" in zlib.decompress(data[start:data.index(b"\nendstream", start)])
+
+
+def test_progress_is_reported_at_the_end():
+    calls = []
+    pdf.write_table(io.BytesIO(), "Productos", COLUMNS, [(1, "a")],
+                    progress=lambda pct, msg: calls.append((pct, msg)))
+    assert calls[-1] == (95, "1 filas, 1 páginas")
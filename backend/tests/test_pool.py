@@ -0,0 +1,140 @@
+# tests/test_pool.py
+import gc
+import logging
+
+import pytest
+
+from api.db import db_config
+from api.db.db_config import ConnectionPool, DBError
+
+
+def make_pool(**kwargs):
+    kwargs.setdefault("size", 2)
+    kwargs.setdefault("timeout", 0.05)
+    return ConnectionPool({"host": "fake"}, **kwargs)
+
+
+def test_released_connection_is_reused(fake_connect):
+    pool = make_pool()
+    conn = pool.acquire()
+    raw = conn._raw
+    conn.close()
+    again = pool.acquire()
+    assert again._raw is raw
+    assert len(fake_connect) == 1
+    assert pool.status() == {"size": 2, "open": 1, "idle": 0, "in_use": 1, "leaks": 0}
+
+
+def test_idle_connections_are_lifo(fake_connect):
+    pool = make_pool()
+    a, b = pool.acquire(), pool.acquire()
+    a.close()
+    b.close()
+    assert pool.acquire()._raw is b._raw
+
+
+def test_exhausted_pool_waits_then_fails(fake_connect):
+    pool = make_pool(size=1)
+    held = pool.acquire()  # noqa: F841 (sin referencia volvería al pool por __del__)
+    with pytest.raises(DBError, match="agotado"):
+        pool.acquire()
+    assert len(fake_connect) == 1
+
+
+def test_failed_ping_replaces_connection(fake_connect):
+    pool = make_pool()
+    conn = pool.acquire()
+    conn._raw.ping_ok = False
+    conn.close()
+    fresh = pool.acquire()
+    assert fresh._raw is not fake_connect[0]
+    assert not fake_connect[0].connected
+    assert pool.status()["open"] == 1
+
+
+def test_recycled_connection_is_reopened(fake_connect, monkeypatch):
+    pool = make_pool(recycle=10)
+    conn = pool.acquire()
+    conn.close()
+    now = db_config.time.monotonic()
+    monkeypatch.setattr(db_config.time, "monotonic", lambda: now + 11)
+    assert pool.acquire()._raw is not fake_connect[0]
+
+
+def test_open_transaction_is_rolled_back_on_release(fake_connect):
+    pool = make_pool()
+    conn = pool.acquire()
+    conn._raw.in_transaction = True
+    conn.close()
+    assert fake_connect[0].rollbacks == 1
+    assert pool.status()["idle"] == 1
+
+
+def test_disconnected_connection_is_dropped(fake_connect):
+    pool = make_pool()
+    conn = pool.acquire()
+    conn._raw.connected = False
+    conn.close()
+    assert pool.status()["open"] == 0
+
+
+def test_failed_connect_frees_the_slot(monkeypatch):
+    import mysql.connector
+
+    def refuse(**config):
+        raise mysql.connector.Error("sin servidor")
+
+    monkeypatch.setattr(mysql.connector, "connect", refuse)
+    pool = make_pool(size=1)
+    for _ in range(2):
+        with pytest.raises(DBError, match="conectando"):
+            pool.acquire()
+    assert pool.status()["open"] == 0
+
+
+def test_scoped_connection_ignores_close(fake_connect):
+    pool = make_pool()
+    conn = pool.acquire(scoped=True)
+    conn.close()
+    assert pool.status()["in_use"] == 1
+    conn.release()
+    conn.release()
+    assert pool.status() == {"size": 2, "open": 1, "idle": 1, "in_use": 0, "leaks": 0}
+
+
+def borrow(pool):
+    """Como get_db_connection(): el stack de la fuga arranca en quien llamó al wrapper."""
+    return pool.acquire()
+
+
+def test_leaks_lists_connections_held_too_long(fake_connect):
+    pool = make_pool(leak_timeout=60)
+    conn = borrow(pool)
+    assert pool.leaks() == []
+    [leak] = pool.leaks(older_than=0)
+    assert leak["thread"] and "test_leaks_lists" in leak["stack"]
+    conn.close()
+    assert pool.leaks(older_than=0) == []
+
+
+def test_lost_connection_is_reported_and_returned(fake_connect, caplog):
+    pool = make_pool()
+    with caplog.at_level(logging.WARNING, logger=db_config.logger.name):
+        pool.acquire()
+        gc.collect()
+    assert "nunca devuelta" in caplog.text
+    assert pool.status()["idle"] == 1
+
+
+def test_request_gets_one_connection_released_on_teardown(app, fake_connect, monkeypatch):
+    pool = make_pool()
+    monkeypatch.setattr(db_config, "get_pool", lambda: pool)
+    monkeypatch.setattr(db_config, "get_replicas", lambda: [])
+    db_config.init_app(app)
+    with app.test_request_context("/"):
+        first = db_config.get_db_connection()
+        first.close()
+        assert db_config.get_db_connection() is first
+        assert pool.status()["in_use"] == 1
+    assert pool.status()["in_use"] == 0
+    assert pool.status()["idle"] == 1
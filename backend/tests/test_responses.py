@@ -0,0 +1,98 @@
+# tests/test_responses.py
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from api.utils import responses
+from api.utils.responses import dumps, iter_json_ok, json_ok
+
+ROW = {"id": 1, "price": Decimal("12.50"), "order_date": datetime(2024, 5, 1, 13, 30), "day": date(2024, 5, 1),
+       "name": "Café"}
+EXPECTED = {"id": 1, "price": "12.50", "order_date": "2024-05-01T13:30:00", "day": "2024-05-01", "name": "Café"}
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    """Las dos ramas de dumps(): orjson (si está instalado) y el json de la stdlib."""
+    if request.param == "orjson":
+        if not responses.HAS_ORJSON:
+            pytest.skip("orjson no instalado")
+    else:
+        monkeypatch.setattr(responses, "HAS_ORJSON", False)
+    return request.param
+
+
+def test_dumps_decimal_and_dates(encoder):
+    assert json.loads(dumps(ROW)) == EXPECTED
+
+
+def test_dumps_is_compact_utf8_in_dict_order(encoder):
+    out = dumps({"b": 1, "a": "ñ"})
+    assert out == '{"b":1,"a":"ñ"}'.encode("utf-8")
+
+
+def test_dumps_rejects_unknown_types(encoder):
+    with pytest.raises(TypeError):
+        dumps({"x": object()})
+
+
+def chunks_to_json(chunks):
+    return json.loads(b"".join(chunks))
+
+
+def test_iter_json_ok_one_chunk_per_batch():
+    batches = [[{"id": 1}, {"id": 2}], [], [{"id": 3}]]
+    chunks = list(iter_json_ok(iter(batches)))
+    # apertura, dos lotes con filas y cierre
+    assert len(chunks) == 4
+    assert chunks_to_json(chunks) == {"ok": True, "data": [{"id": 1}, {"id": 2}, {"id": 3}]}
+
+
+def test_iter_json_ok_empty_and_extra():
+    chunks = list(iter_json_ok(iter([]), extra={"next_cursor": None, "count": 0}))
+    assert chunks_to_json(chunks) == {"ok": True, "data": [], "next_cursor": None, "count": 0}
+
+
+def test_json_ok_list_is_built_at_once(app):
+    with app.test_request_context("/"):
+        resp = json_ok([ROW])
+    assert not resp.is_streamed
+    assert resp.get_json() == {"ok": True, "data": [EXPECTED]}
+
+
+def test_json_ok_iterator_is_streamed_in_batches(app, monkeypatch):
+    rows = ({"id": i, "price": Decimal(i)} for i in range(2500))
+    with app.test_request_context("/"):
+        resp = json_ok(rows)
+        assert resp.is_streamed
+        assert resp.mimetype == "application/json"
+        chunks = list(resp.response)
+    # apertura + 3 lotes de FETCH_BATCH (1000, 1000, 500) + cierre
+    assert len(chunks) == 5
+    body = chunks_to_json(chunks)
+    assert len(body["data"]) == 2500
+    assert body["data"][-1] == {"id": 2499, "price": "2499"}
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.closed = False
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+    def close(self):
+        self.closed = True
+
+
+def test_json_ok_cursor_is_streamed_and_closed(app):
+    cur = FakeCursor({"id": i} for i in range(3))
+    with app.test_request_context("/"):
+        resp = json_ok(cur)
+        body = chunks_to_json(resp.response)
+    assert body == {"ok": True, "data": [{"id": 0}, {"id": 1}, {"id": 2}]}
+    assert cur.closed
@@ -0,0 +1,126 @@
+# tests/test_streaming.py
+import io
+import json
+import random
+
+import pytest
+
+from api.utils.streaming import iter_json_array
+
+
+class Body(io.BytesIO):
+    """Body del request que cuenta las lecturas."""
+
+    reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+
+def parse(data, chunk_size=7, **kwargs):
+    return list(iter_json_array(Body(data), chunk_size=chunk_size, **kwargs))
+
+
+def random_value(rnd, depth=0):
+    kind = rnd.randint(0, 6 if depth < 3 else 3)
+    if kind == 0:
+        return rnd.randint(-10 ** 6, 10 ** 6)
+    if kind == 1:
+        return rnd.choice([rnd.random() * 1e5, -1.5e-7, 0.0])
+    if kind == 2:
+        return rnd.choice([None, True, False])
+    if kind == 3:
+        return "".join(rnd.choice('ab"\\\n/é😀{}[], ') for _ in range(rnd.randint(0, 12)))
+    if kind == 4:
+        return [random_value(rnd, depth + 1) for _ in range(rnd.randint(0, 3))]
+    return {str(rnd.random()): random_value(rnd, depth + 1) for _ in range(rnd.randint(0, 3))}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 65536])
+def test_round_trip_any_chunk_size(chunk_size):
+    rnd = random.Random(chunk_size)
+    for _ in range(100):
+        items = [random_value(rnd) for _ in range(rnd.randint(0, 6))]
+        text = json.dumps(items, ensure_ascii=rnd.random() < 0.5, indent=rnd.choice([None, 1]))
+        assert parse(text.encode("utf-8"), chunk_size) == items
+
+
+def test_utf8_bom_and_multibyte_split():
+    data = "﻿[\"ñandú\", {\"x\": \"😀\"}]".encode("utf-8")
+    assert parse(data, chunk_size=1) == ["ñandú", {"x": "😀"}]
+
+
+def test_number_split_at_chunk_boundary():
+    data = b"[-1.5e-07, 12345]"
+    for size in range(1, len(data)):
+        assert parse(data, chunk_size=size) == [-1.5e-07, 12345]
+
+
+def test_items_are_yielded_as_they_arrive():
+    body = Body(b'[{"a": 1}, {"a": 2}' + b" " * 100_000 + b"]")
+    items = iter_json_array(body, chunk_size=64)
+    assert next(items) == {"a": 1}
+    assert body.reads == 1
+
+
+@pytest.mark.parametrize("data", [
+    b'{"a": 1}', b"[1 2]", b'[{"a": 1} x]', b"[1,]", b"[,1]", b"[tru]", b"[1x]", b'["a"b]',
+    b'[{"a": 1]', b'[{"a": }]', b"[1]x", b"", b"[1", b'["abc', b'[{"a": [1, 2}',
+])
+@pytest.mark.parametrize("chunk_size", [1, 3, 64])
+def test_invalid_json_raises_value_error(data, chunk_size):
+    with pytest.raises(ValueError):
+        parse(data, chunk_size)
+
+
+def test_truncated_string_raises():
+    with pytest.raises(ValueError, match="inválido"):
+        parse(b'[{"a": 1}, {"name": "Caf', chunk_size=4)
+
+
+def test_trailing_comma_raises_after_the_valid_items():
+    items = iter_json_array(Body(b'[{"a": 1}, {"a": 2},]'), chunk_size=4)
+    assert next(items) == {"a": 1}
+    assert next(items) == {"a": 2}
+    with pytest.raises(ValueError, match="se esperaba un elemento"):
+        next(items)
+
+
+@pytest.mark.parametrize("cut", range(1, 30))
+def test_nested_array_straddling_a_chunk_boundary(cut):
+    data = b'[{"tags": [[1, 2], ["x", {"y": [3]}]]}, [[], [4]]]'
+    body = Body(data)
+    body.read = lambda size=-1, read=body.read: read(cut if body.reads == 0 else size)
+    assert list(iter_json_array(body, chunk_size=7)) == [
+        {"tags": [[1, 2], ["x", {"y": [3]}]]}, [[], [4]]]
+
+
+@pytest.mark.parametrize("data", [
+    b'[{"a": x, "b": "' + b"y" * 100 + b'"}',     # valor inválido
+    b'[{"a": 1} y',                                # basura donde termina un valor
+    b"[" + b'{"a": 1},' * 5000 + b'{"a": nul}',    # error a mitad del body
+    b'[{"a": 1},,',                                # separador de más
+])
+def test_errors_never_read_more_than_max_item(data):
+    body = Body(data + b" " * 5_000_000 + b"]")
+    with pytest.raises(ValueError):
+        list(iter_json_array(body, chunk_size=256, max_item=1000))
+    assert body.reads * 256 <= len(data) + 1000 + 2 * 256
+
+
+def test_item_size_is_capped():
+    body = Body(b'[{"a": "' + b"x" * 200_000 + b'"}]')
+    with pytest.raises(ValueError, match="más de 1000"):
+        list(iter_json_array(body, chunk_size=4096, max_item=1000))
+    assert body.reads <= 2
+
+
+def test_complete_item_over_the_cap_is_rejected():
+    with pytest.raises(ValueError, match="más de 1000"):
+        parse(b'[{"a": "' + b"x" * 1500 + b'"}]', chunk_size=65536, max_item=1000)
+
+
+def test_items_under_the_cap_pass():
+    item = {"a": "x" * 5000}
+    assert parse(json.dumps([item, item]).encode(), chunk_size=512, max_item=6000) == [item, item]
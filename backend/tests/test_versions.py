@@ -0,0 +1,41 @@
+# tests/test_versions.py
+import os
+
+import pytest
+
+from api.utils import versions
+
+
+@pytest.fixture
+def vdir(tmp_path, monkeypatch):
+    path = tmp_path / "versions"
+    monkeypatch.setenv("VERSIONS_DIR", str(path))
+    return path
+
+
+def test_missing_token_is_fixed_and_not_written(vdir):
+    assert versions.current("products") == versions.INITIAL_TOKEN
+    assert versions.current("products") == versions.INITIAL_TOKEN
+    assert not vdir.exists()
+    assert versions.bumped_at("products") == 0
+
+
+def test_bump_creates_and_renews_the_token(vdir):
+    versions.bump("products")
+    first = versions.current("products")
+    assert first != versions.INITIAL_TOKEN
+    versions.bump("products")
+    assert versions.current("products") not in (first, versions.INITIAL_TOKEN)
+    assert versions.current("orders") == versions.INITIAL_TOKEN
+    assert sorted(os.listdir(vdir)) == ["products.ver"]
+
+
+def test_empty_token_file_reads_as_initial(vdir):
+    vdir.mkdir()
+    (vdir / "users.ver").write_text("")
+    assert versions.current("users") == versions.INITIAL_TOKEN
+
+
+def test_invalid_resource_name(vdir):
+    with pytest.raises(ValueError):
+        versions.current("../etc")